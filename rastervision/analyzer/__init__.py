@@ -4,3 +4,5 @@ from rastervision.analyzer.analyzer import *
 from rastervision.analyzer.analyzer_config import *
 from rastervision.analyzer.stats_analyzer import *
 from rastervision.analyzer.stats_analyzer_config import *
+from rastervision.analyzer.histogram_analyzer import *
+from rastervision.analyzer.histogram_analyzer_config import *
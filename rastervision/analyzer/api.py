@@ -5,5 +5,6 @@
 ANALYZER = 'ANALYZER'
 
 STATS_ANALYZER = 'STATS_ANALYZER'
+HISTOGRAM_ANALYZER = 'HISTOGRAM_ANALYZER'
 
 from rastervision.analyzer.analyzer_config import AnalyzerConfig
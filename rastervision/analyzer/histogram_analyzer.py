@@ -0,0 +1,30 @@
+from rastervision.analyzer import Analyzer
+from rastervision.core.raster_histogram import RasterHistogram
+from rastervision.core.raster_stats import RANDOM_SAMPLE
+
+
+class HistogramAnalyzer(Analyzer):
+    """Computes a RasterHistogram against the entire scene set.
+    """
+
+    def __init__(self,
+                 histogram_uri,
+                 sample_pixels=None,
+                 sample_mode=RANDOM_SAMPLE,
+                 num_workers=1,
+                 downsample_factor=1):
+        self.histogram_uri = histogram_uri
+        self.sample_pixels = sample_pixels
+        self.sample_mode = sample_mode
+        self.num_workers = num_workers
+        self.downsample_factor = downsample_factor
+
+    def process(self, scenes, tmp_dir):
+        histogram = RasterHistogram()
+        histogram.compute(
+            list(map(lambda s: s.raster_source, scenes)),
+            downsample_factor=self.downsample_factor,
+            sample_pixels=self.sample_pixels,
+            sample_mode=self.sample_mode,
+            num_workers=self.num_workers)
+        histogram.save(self.histogram_uri)
@@ -0,0 +1,163 @@
+import os
+from copy import deepcopy
+
+import rastervision as rv
+from rastervision.analyzer import (AnalyzerConfig, AnalyzerConfigBuilder,
+                                   HistogramAnalyzer)
+from rastervision.core.raster_stats import (RANDOM_SAMPLE, STRIDED_SAMPLE)
+from rastervision.protos.analyzer_pb2 import AnalyzerConfig as AnalyzerConfigMsg
+
+
+class HistogramAnalyzerConfig(AnalyzerConfig):
+    def __init__(self,
+                 histogram_uri=None,
+                 sample_pixels=None,
+                 sample_mode=RANDOM_SAMPLE,
+                 num_workers=1,
+                 downsample_factor=1):
+        super().__init__(rv.HISTOGRAM_ANALYZER)
+        self.histogram_uri = histogram_uri
+        self.sample_pixels = sample_pixels
+        self.sample_mode = sample_mode
+        self.num_workers = num_workers
+        self.downsample_factor = downsample_factor
+
+    def create_analyzer(self):
+        if not self.histogram_uri:
+            raise rv.ConfigError('histogram_uri is not set.')
+        return HistogramAnalyzer(
+            self.histogram_uri,
+            sample_pixels=self.sample_pixels,
+            sample_mode=self.sample_mode,
+            num_workers=self.num_workers,
+            downsample_factor=self.downsample_factor)
+
+    def to_proto(self):
+        msg = AnalyzerConfigMsg(
+            analyzer_type=self.analyzer_type,
+            sample_mode=self.sample_mode,
+            num_workers=self.num_workers,
+            downsample_factor=self.downsample_factor)
+        if self.histogram_uri:
+            msg.histogram_uri = self.histogram_uri
+        if self.sample_pixels is not None:
+            msg.sample_pixels = self.sample_pixels
+        return msg
+
+    def save_bundle_files(self, bundle_dir):
+        if not self.histogram_uri:
+            raise rv.ConfigError('histogram_uri is not set.')
+        # Only set the basename. The PercentileTransformer saves the
+        # histogram it uses separately.
+        base_name = os.path.basename(self.histogram_uri)
+        new_config = self.to_builder() \
+                         .with_histogram_uri(base_name) \
+                         .build()
+        return (new_config, [])
+
+    def load_bundle_files(self, bundle_dir):
+        if not self.histogram_uri:
+            raise rv.ConfigError('histogram_uri is not set.')
+        local_histogram_uri = os.path.join(bundle_dir, self.histogram_uri)
+        return self.to_builder() \
+                   .with_histogram_uri(local_histogram_uri) \
+                   .build()
+
+    def update_for_command(self,
+                           command_type,
+                           experiment_config,
+                           context=None,
+                           io_def=None):
+        io_def = io_def or rv.core.CommandIODefinition()
+        if command_type == rv.ANALYZE:
+            if not self.histogram_uri:
+                self.histogram_uri = os.path.join(
+                    experiment_config.analyze_uri, 'histogram.json')
+
+            io_def.add_output(self.histogram_uri)
+        return io_def
+
+
+class HistogramAnalyzerConfigBuilder(AnalyzerConfigBuilder):
+    def __init__(self, prev=None):
+        config = {}
+        if prev:
+            config = {
+                'histogram_uri': prev.histogram_uri,
+                'sample_pixels': prev.sample_pixels,
+                'sample_mode': prev.sample_mode,
+                'num_workers': prev.num_workers,
+                'downsample_factor': prev.downsample_factor
+            }
+        super().__init__(HistogramAnalyzerConfig, config)
+
+    def validate(self):
+        super().validate()
+        sample_mode = self.config.get('sample_mode')
+        if sample_mode not in [None, RANDOM_SAMPLE, STRIDED_SAMPLE]:
+            raise rv.ConfigError(
+                'sample_mode must be "random" or "strided", got {}'.format(
+                    sample_mode))
+        num_workers = self.config.get('num_workers')
+        if num_workers is not None and num_workers < 1:
+            raise rv.ConfigError(
+                'num_workers must be at least 1, got {}'.format(num_workers))
+        downsample_factor = self.config.get('downsample_factor')
+        if downsample_factor is not None and downsample_factor < 1:
+            raise rv.ConfigError(
+                'downsample_factor must be at least 1, got {}'.format(
+                    downsample_factor))
+
+    def from_proto(self, msg):
+        b = HistogramAnalyzerConfigBuilder()
+        b = b.with_histogram_uri(msg.histogram_uri) \
+             .with_num_workers(msg.num_workers) \
+             .with_downsample_factor(msg.downsample_factor)
+        if msg.HasField('sample_pixels'):
+            b = b.with_sample_pixels(msg.sample_pixels, msg.sample_mode)
+        return b
+
+    def with_histogram_uri(self, histogram_uri):
+        """Set the histogram_uri.
+
+            Args:
+                histogram_uri: URI to the histogram json to use
+        """
+        b = deepcopy(self)
+        b.config['histogram_uri'] = histogram_uri
+        return b
+
+    def with_sample_pixels(self, sample_pixels, sample_mode=RANDOM_SAMPLE):
+        """Compute the histogram over a sample of the imagery.
+
+            Args:
+                sample_pixels: approximate number of pixels to sample across
+                    all scenes
+                sample_mode: "random" to sample windows at random, or
+                    "strided" to sample evenly spaced windows
+        """
+        b = deepcopy(self)
+        b.config['sample_pixels'] = sample_pixels
+        b.config['sample_mode'] = sample_mode
+        return b
+
+    def with_num_workers(self, num_workers):
+        """Set the number of scenes to read in parallel.
+
+            Args:
+                num_workers: number of threads used to read scenes
+        """
+        b = deepcopy(self)
+        b.config['num_workers'] = num_workers
+        return b
+
+    def with_downsample_factor(self, downsample_factor):
+        """Compute the histogram over the imagery at a reduced resolution.
+
+            Args:
+                downsample_factor: factor by which to reduce the resolution.
+                    This reads the overviews of the imagery if it has any.
+        """
+        b = deepcopy(self)
+        b.config['downsample_factor'] = downsample_factor
+        return b
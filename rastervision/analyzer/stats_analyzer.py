@@ -1,15 +1,39 @@
 from rastervision.analyzer import Analyzer
 from rastervision.core import RasterStats
+from rastervision.core.raster_stats import (RANDOM_SAMPLE, StatsCache)
 
 
 class StatsAnalyzer(Analyzer):
     """Computes RasterStats against the entire scene set.
     """
 
-    def __init__(self, stats_uri):
+    def __init__(self,
+                 stats_uri,
+                 sample_pixels=None,
+                 sample_mode=RANDOM_SAMPLE,
+                 num_workers=1,
+                 downsample_factor=1,
+                 stats_cache_uri=None):
         self.stats_uri = stats_uri
+        self.sample_pixels = sample_pixels
+        self.sample_mode = sample_mode
+        self.num_workers = num_workers
+        self.downsample_factor = downsample_factor
+        self.stats_cache_uri = stats_cache_uri
 
     def process(self, scenes, tmp_dir):
+        cache = None
+        if self.stats_cache_uri:
+            cache = StatsCache.load(self.stats_cache_uri)
+
         stats = RasterStats()
-        stats.compute(list(map(lambda s: s.raster_source, scenes)))
+        stats.compute(
+            list(map(lambda s: s.raster_source, scenes)),
+            downsample_factor=self.downsample_factor,
+            sample_pixels=self.sample_pixels,
+            sample_mode=self.sample_mode,
+            num_workers=self.num_workers,
+            cache=cache)
         stats.save(self.stats_uri)
+        if cache is not None:
+            cache.save(self.stats_cache_uri)
@@ -4,23 +4,49 @@ from copy import deepcopy
 import rastervision as rv
 from rastervision.analyzer import (AnalyzerConfig, AnalyzerConfigBuilder,
                                    StatsAnalyzer)
+from rastervision.core.raster_stats import (RANDOM_SAMPLE, STRIDED_SAMPLE)
 from rastervision.protos.analyzer_pb2 import AnalyzerConfig as AnalyzerConfigMsg
 
 
 class StatsAnalyzerConfig(AnalyzerConfig):
-    def __init__(self, stats_uri=None):
+    def __init__(self,
+                 stats_uri=None,
+                 sample_pixels=None,
+                 sample_mode=RANDOM_SAMPLE,
+                 num_workers=1,
+                 downsample_factor=1,
+                 stats_cache_uri=None):
         super().__init__(rv.STATS_ANALYZER)
         self.stats_uri = stats_uri
+        self.sample_pixels = sample_pixels
+        self.sample_mode = sample_mode
+        self.num_workers = num_workers
+        self.downsample_factor = downsample_factor
+        self.stats_cache_uri = stats_cache_uri
 
     def create_analyzer(self):
         if not self.stats_uri:
             raise rv.ConfigError('stat_uri is not set.')
-        return StatsAnalyzer(self.stats_uri)
+        return StatsAnalyzer(
+            self.stats_uri,
+            sample_pixels=self.sample_pixels,
+            sample_mode=self.sample_mode,
+            num_workers=self.num_workers,
+            downsample_factor=self.downsample_factor,
+            stats_cache_uri=self.stats_cache_uri)
 
     def to_proto(self):
-        msg = AnalyzerConfigMsg(analyzer_type=self.analyzer_type)
+        msg = AnalyzerConfigMsg(
+            analyzer_type=self.analyzer_type,
+            sample_mode=self.sample_mode,
+            num_workers=self.num_workers,
+            downsample_factor=self.downsample_factor)
         if self.stats_uri:
             msg.MergeFrom(AnalyzerConfigMsg(stats_uri=self.stats_uri))
+        if self.sample_pixels is not None:
+            msg.sample_pixels = self.sample_pixels
+        if self.stats_cache_uri:
+            msg.stats_cache_uri = self.stats_cache_uri
         return msg
 
     def save_bundle_files(self, bundle_dir):
@@ -54,8 +80,12 @@ class StatsAnalyzerConfig(AnalyzerConfig):
             if not self.stats_uri:
                 self.stats_uri = os.path.join(experiment_config.analyze_uri,
                                               'stats.json')
+            if not self.stats_cache_uri:
+                self.stats_cache_uri = os.path.join(
+                    os.path.dirname(self.stats_uri), 'stats_cache.json')
 
             io_def.add_output(self.stats_uri)
+            io_def.add_output(self.stats_cache_uri)
         return io_def
 
 
@@ -63,12 +93,43 @@ class StatsAnalyzerConfigBuilder(AnalyzerConfigBuilder):
     def __init__(self, prev=None):
         config = {}
         if prev:
-            config = {'stats_uri': prev.stats_uri}
+            config = {
+                'stats_uri': prev.stats_uri,
+                'sample_pixels': prev.sample_pixels,
+                'sample_mode': prev.sample_mode,
+                'num_workers': prev.num_workers,
+                'downsample_factor': prev.downsample_factor,
+                'stats_cache_uri': prev.stats_cache_uri
+            }
         super().__init__(StatsAnalyzerConfig, config)
 
+    def validate(self):
+        super().validate()
+        sample_mode = self.config.get('sample_mode')
+        if sample_mode not in [None, RANDOM_SAMPLE, STRIDED_SAMPLE]:
+            raise rv.ConfigError(
+                'sample_mode must be "random" or "strided", got {}'.format(
+                    sample_mode))
+        num_workers = self.config.get('num_workers')
+        if num_workers is not None and num_workers < 1:
+            raise rv.ConfigError(
+                'num_workers must be at least 1, got {}'.format(num_workers))
+        downsample_factor = self.config.get('downsample_factor')
+        if downsample_factor is not None and downsample_factor < 1:
+            raise rv.ConfigError(
+                'downsample_factor must be at least 1, got {}'.format(
+                    downsample_factor))
+
     def from_proto(self, msg):
         b = StatsAnalyzerConfigBuilder()
-        return b.with_stats_uri(msg.stats_uri)
+        b = b.with_stats_uri(msg.stats_uri) \
+             .with_num_workers(msg.num_workers) \
+             .with_downsample_factor(msg.downsample_factor)
+        if msg.HasField('sample_pixels'):
+            b = b.with_sample_pixels(msg.sample_pixels, msg.sample_mode)
+        if msg.HasField('stats_cache_uri'):
+            b = b.with_stats_cache_uri(msg.stats_cache_uri)
+        return b
 
     def with_stats_uri(self, stats_uri):
         """Set the stats_uri.
@@ -79,3 +140,52 @@ class StatsAnalyzerConfigBuilder(AnalyzerConfigBuilder):
         b = deepcopy(self)
         b.config['stats_uri'] = stats_uri
         return b
+
+    def with_sample_pixels(self, sample_pixels, sample_mode=RANDOM_SAMPLE):
+        """Compute the stats over a sample of the imagery.
+
+            Args:
+                sample_pixels: approximate number of pixels to sample across
+                    all scenes
+                sample_mode: "random" to sample windows at random, or
+                    "strided" to sample evenly spaced windows
+        """
+        b = deepcopy(self)
+        b.config['sample_pixels'] = sample_pixels
+        b.config['sample_mode'] = sample_mode
+        return b
+
+    def with_num_workers(self, num_workers):
+        """Set the number of scenes to read in parallel.
+
+            Args:
+                num_workers: number of threads used to read scenes
+        """
+        b = deepcopy(self)
+        b.config['num_workers'] = num_workers
+        return b
+
+    def with_downsample_factor(self, downsample_factor):
+        """Compute the stats over the imagery at a reduced resolution.
+
+            Args:
+                downsample_factor: factor by which to reduce the resolution.
+                    This reads the overviews of the imagery if it has any.
+        """
+        b = deepcopy(self)
+        b.config['downsample_factor'] = downsample_factor
+        return b
+
+    def with_stats_cache_uri(self, stats_cache_uri):
+        """Set the URI of the cache of the stats of each scene.
+
+            When the analyzer is run again, only the scenes that are not in
+            the cache are read. Defaults to stats_cache.json next to the
+            stats_uri.
+
+            Args:
+                stats_cache_uri: URI to the cache json to use
+        """
+        b = deepcopy(self)
+        b.config['stats_cache_uri'] = stats_cache_uri
+        return b
@@ -26,7 +26,7 @@ from rastervision.utils.files import (download_if_needed, get_local_path,
                                       make_dir, start_sync, upload_or_copy,
                                       sync_to_dir, sync_from_dir)
 from rastervision.utils.misc import (numpy_to_png, png_to_numpy, save_img)
-from rastervision.data.label_source.utils import color_to_integer
+from rastervision.data.label_source import SegmentationClassTransformer
 from rastervision.rv_config import RVConfig
 
 FROZEN_INFERENCE_GRAPH = 'model'
@@ -98,55 +98,41 @@ def make_debug_images(record_path: str, output_dir: str, class_map: ClassMap,
     import tensorflow as tf
     make_dir(output_dir)
 
-    ids = class_map.get_keys()
-    color_strs = list(map(lambda c: c.color, class_map.get_items()))
-    color_ints = list(map(lambda c: color_to_integer(c), color_strs))
-    correspondence = dict(zip(ids, color_ints))
-
-    def _label_fn(v: int) -> int:
-        if v in correspondence:
-            return correspondence.get(v)
-        else:
-            return 0
-
-    label_fn = np.vectorize(_label_fn, otypes=[np.uint64])
-
-    def _image_fn(pixel: int) -> int:
-        if (pixel & 0x00ffffff):
-            r = ((pixel >> 41 & 0x7f) + (pixel >> 17 & 0x7f)) << 16
-            g = ((pixel >> 33 & 0x7f) + (pixel >> 9 & 0x7f)) << 8
-            b = ((pixel >> 25 & 0x7f) + (pixel >> 1 & 0x7f)) << 0
-            return r + g + b
-        else:
-            return pixel >> 24
-
-    image_fn = np.vectorize(_image_fn, otypes=[np.uint64])
+    class_trans = SegmentationClassTransformer(class_map)
 
     log.info('Generating debug chips')
     tfrecord_iter = tf.python_io.tf_record_iterator(record_path)
     for ind, example in enumerate(tfrecord_iter):
         if np.random.rand() <= p:
             example = tf.train.Example.FromString(example)
-            im_unpacked, labels = parse_tf_example(example)
+            im, labels = parse_tf_example(example)
+            im = blend_labels(im, labels, class_trans)
+            output_path = join(output_dir, '{}.png'.format(ind))
+            save_img(im, output_path)
 
-            im_r = np.array(im_unpacked[:, :, 0], dtype=np.uint64) * 1 << 40
-            im_g = np.array(im_unpacked[:, :, 1], dtype=np.uint64) * 1 << 32
-            im_b = np.array(im_unpacked[:, :, 2], dtype=np.uint64) * 1 << 24
-            im_packed = im_r + im_g + im_b
 
-            labels_packed = label_fn(np.array(labels))
-            im_labels_packed = im_packed + labels_packed
-            im_packed = image_fn(im_labels_packed)
+def blend_labels(im: np.ndarray, labels: np.ndarray,
+                 class_trans: SegmentationClassTransformer) -> np.ndarray:
+    """Blend the colors of the classes of labels into an image.
 
-            im_unpacked[:, :, 0] = np.bitwise_and(
-                im_packed >> 16, 0xff, dtype=np.uint8)
-            im_unpacked[:, :, 1] = np.bitwise_and(
-                im_packed >> 8, 0xff, dtype=np.uint8)
-            im_unpacked[:, :, 2] = np.bitwise_and(
-                im_packed >> 0, 0xff, dtype=np.uint8)
+    Pixels whose class has a color other than black are set to the average
+    of the image and the color of the class, and the others are unchanged.
 
-            output_path = join(output_dir, '{}.png'.format(ind))
-            save_img(im_unpacked, output_path)
+    Args:
+         im: A [height, width, 3] uint8 np.ndarray.
+         labels: A [height, width] np.ndarray of class ids.
+         class_trans: A SegmentationClassTransformer with the class colors.
+
+    Returns:
+         The blended [height, width, 3] uint8 np.ndarray.
+
+    """
+    im = np.array(im, dtype=np.uint8)
+    rgb = im[:, :, 0:3]
+    has_color = class_trans.has_color(labels)
+    colors = class_trans.class_to_rgb(labels[has_color])
+    rgb[has_color] = (rgb[has_color] >> 1) + (colors >> 1)
+    return im
 
 
 def parse_tf_example(example) -> Tuple[np.ndarray, np.ndarray]:
@@ -193,18 +179,14 @@ def create_tf_example(image: np.ndarray,
     import tensorflow as tf
     from object_detection.utils import dataset_util
 
-    class_keys = set(class_map.get_keys())
-
-    def _clean(n):
-        return (n if n in class_keys else 0x00)
-
-    clean = np.vectorize(_clean, otypes=[np.uint8])
+    class_trans = SegmentationClassTransformer(class_map)
 
     image_encoded = numpy_to_png(image)
     image_filename = chip_id.encode('utf8')
     image_format = 'png'.encode('utf8')
     image_height, image_width, image_channels = image.shape
-    image_segmentation_class_encoded = numpy_to_png(clean(labels))
+    image_segmentation_class_encoded = numpy_to_png(
+        class_trans.filter_class_ids(labels))
     image_segmentation_class_format = 'png'.encode('utf8')
 
     features = tf.train.Features(
@@ -5,4 +5,5 @@ from rastervision.core.class_map import *
 from rastervision.core.command_io_definition import *
 from rastervision.core.config import *
 from rastervision.core.raster_stats import RasterStats
+from rastervision.core.raster_histogram import RasterHistogram
 from rastervision.core.training_data import *
@@ -0,0 +1,185 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from rastervision.core.raster_stats import (get_stats_windows, RANDOM_SAMPLE)
+from rastervision.utils.files import str_to_file, file_to_str
+
+# Number of bins of the histogram of each channel.
+NB_BINS = 2**16
+
+
+def get_bins(values):
+    """Return the bin of each value in a RasterHistogram.
+
+    Bins are ordered like the values they hold. 8 and 16-bit integers each
+    have their own bin, and other values are binned by their nearest float16
+    value, so values are rounded to about 3 significant digits, and values
+    beyond 65504 in magnitude fall in the first or last bins.
+
+    Args:
+        values: numpy array
+
+    Returns:
+        uint16 numpy array of the same shape with the bin of each value
+    """
+    if values.dtype in (np.uint8, np.uint16):
+        return values.astype(np.uint16, copy=False)
+    if values.dtype in (np.int8, np.int16):
+        return values.astype(np.int16, copy=False).view(np.uint16) ^ 0x8000
+
+    # Flip the bits of negative floats and the sign bit of positive ones to
+    # order them like integers.
+    bits = values.astype(np.float16).view(np.uint16)
+    return np.where(bits & 0x8000, ~bits, bits | 0x8000).astype(np.uint16)
+
+
+def get_bin_values(dtype):
+    """Return the value of each bin for values of a dtype.
+
+    Returns:
+        float64 numpy array of length NB_BINS
+    """
+    dtype = np.dtype(dtype)
+    bins = np.arange(NB_BINS, dtype=np.uint16)
+    if dtype in (np.uint8, np.uint16):
+        return bins.astype(np.float64)
+    if dtype in (np.int8, np.int16):
+        return (bins ^ 0x8000).view(np.int16).astype(np.float64)
+
+    bits = np.where(bins & 0x8000, bins ^ 0x8000, ~bins).astype(np.uint16)
+    return bits.view(np.float16).astype(np.float64)
+
+
+class RasterHistogram():
+    """Histogram of the values of each channel of a set of rasters.
+
+    The histograms have NB_BINS fixed bins (see get_bins), so they are built
+    in a single streaming pass and histograms of different rasters can be
+    added. Percentiles are exact for 8 and 16-bit integer rasters.
+    """
+
+    def __init__(self, dtype=None, counts=None):
+        """Construct a new RasterHistogram.
+
+        Args:
+            dtype: (str) dtype of the raw chips of the rasters
+            counts: [channels, NB_BINS] numpy array with the number of values
+                in each bin
+        """
+        self.dtype = dtype
+        self.counts = counts
+
+    def update(self, chip):
+        """Add the values of a [height, width, channels] chip.
+
+        Zero values are treated as NODATA and ignored.
+        """
+        values = chip.reshape(-1, chip.shape[-1])
+        nb_channels = values.shape[1]
+        bins = get_bins(values).astype(np.int64)
+        bins += np.arange(nb_channels) * NB_BINS
+        counts = np.bincount(
+            bins[values != 0], minlength=nb_channels * NB_BINS)
+        self.merge(
+            RasterHistogram(
+                str(chip.dtype), counts.reshape(nb_channels, NB_BINS)))
+
+    def merge(self, other):
+        """Add the values of another RasterHistogram."""
+        if other.counts is None:
+            return
+        if self.counts is None:
+            self.dtype = other.dtype
+            self.counts = np.array(other.counts, dtype=np.float64)
+        else:
+            self.counts = self.counts + other.counts
+
+    def get_percentiles(self, percentile):
+        """Return the value at a percentile of each channel.
+
+        Args:
+            percentile: (float) between 0 and 100
+
+        Returns:
+            list with a value for each channel
+        """
+        bin_values = get_bin_values(self.dtype)
+        cum_counts = np.cumsum(self.counts, axis=1)
+        # Use the value below the percentile, like np.percentile with
+        # interpolation='lower'.
+        targets = np.floor((cum_counts[:, -1] - 1) * percentile / 100) + 1
+        values = []
+        for channel_counts, channel_cum_counts, target in zip(
+                self.counts, cum_counts, targets):
+            is_reached = (channel_cum_counts >= target) & (channel_counts > 0)
+            values.append(float(bin_values[np.argmax(is_reached)]))
+        return values
+
+    def compute(self,
+                raster_sources,
+                downsample_factor=1,
+                sample_pixels=None,
+                sample_mode=RANDOM_SAMPLE,
+                num_workers=1):
+        """Compute the histogram of each channel.
+
+        The histograms are computed over the raw channels of the raster
+        sources in a single pass. The options are the same as for
+        RasterStats.compute.
+
+        Args:
+            raster_sources: list of RasterSource
+            downsample_factor: (int) if greater than 1, read the rasters at
+                1/downsample_factor of their resolution
+            sample_pixels: (int or None) if set, compute the histograms over
+                a subset of the windows of the rasters containing about this
+                many pixels in total
+            sample_mode: RANDOM_SAMPLE or STRIDED_SAMPLE, how to pick the
+                windows when sample_pixels is set
+            num_workers: (int) number of raster sources to read in parallel
+        """
+        windows, scales, out_shape = get_stats_windows(
+            raster_sources, downsample_factor, sample_pixels, sample_mode)
+
+        def compute_histogram(args):
+            raster_source, source_windows, scale = args
+            histogram = RasterHistogram()
+            with raster_source.activate():
+                for window in source_windows:
+                    histogram.update(
+                        raster_source.get_raw_chip(
+                            window, out_shape=out_shape))
+            if histogram.counts is not None:
+                histogram.counts *= scale
+            return histogram
+
+        self.dtype = None
+        self.counts = None
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            for histogram in executor.map(compute_histogram,
+                                          zip(raster_sources, windows,
+                                              scales)):
+                self.merge(histogram)
+
+    def save(self, histogram_uri):
+        # Only save the non-empty bins.
+        channels = []
+        for channel_counts in self.counts:
+            bins = np.flatnonzero(channel_counts)
+            channels.append({
+                'bins': bins.tolist(),
+                'counts': channel_counts[bins].tolist()
+            })
+        histogram = {'dtype': self.dtype, 'channels': channels}
+        str_to_file(json.dumps(histogram), histogram_uri)
+
+    @staticmethod
+    def load(histogram_uri):
+        histogram_json = json.loads(file_to_str(histogram_uri))
+        channels = histogram_json['channels']
+        counts = np.zeros((len(channels), NB_BINS))
+        for channel_counts, channel in zip(counts, channels):
+            channel_counts[channel['bins']] = channel['counts']
+        return RasterHistogram(histogram_json['dtype'], counts)
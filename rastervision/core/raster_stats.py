@@ -1,9 +1,238 @@
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
-from npstreams import imean, istd, last
 
-from rastervision.utils.files import str_to_file, file_to_str
+from rastervision.utils.files import (str_to_file, file_to_str, file_exists,
+                                      last_modified)
+
+RANDOM_SAMPLE = 'random'
+STRIDED_SAMPLE = 'strided'
+
+# Size of the chips read when computing statistics.
+STATS_CHIP_SIZE = 300
+
+
+class ChannelMoments():
+    """Running count, mean and sum of squared deviations of each channel.
+
+    Chips are folded in one at a time using the pairwise form of Welford's
+    algorithm, and the moments of different rasters can be merged, so the
+    statistics of a dataset are computed in a single pass over the pixels.
+    Zero values are treated as NODATA and ignored.
+    """
+
+    def __init__(self, counts=None, means=None, m2s=None):
+        """Construct a new ChannelMoments.
+
+        Args:
+            counts: array with the number of values of each channel
+            means: array with the mean of each channel
+            m2s: array with the sum of squared deviations from the mean of
+                each channel
+        """
+        self.counts = counts
+        self.means = means
+        self.m2s = m2s
+
+    def update(self, chip):
+        """Add the values of a [height, width, channels] chip."""
+        values = chip.reshape(-1, chip.shape[-1]).astype(np.float64)
+        is_valid = values != 0
+        counts = is_valid.sum(axis=0)
+        means = values.sum(axis=0) / np.maximum(counts, 1)
+        deviations = values - means
+        deviations[~is_valid] = 0
+        m2s = np.einsum('ij,ij->j', deviations, deviations)
+        self.merge(ChannelMoments(counts, means, m2s))
+
+    def merge(self, other):
+        """Add the values summarized by another ChannelMoments."""
+        if other.counts is None:
+            return
+        if self.counts is None:
+            self.counts = np.array(other.counts, dtype=np.float64)
+            self.means = np.array(other.means, dtype=np.float64)
+            self.m2s = np.array(other.m2s, dtype=np.float64)
+            return
+
+        counts = self.counts + other.counts
+        weights = np.divide(
+            other.counts, counts, out=np.zeros(len(counts)), where=counts > 0)
+        deltas = other.means - self.means
+        self.means = self.means + deltas * weights
+        self.m2s = self.m2s + other.m2s + \
+            deltas * deltas * self.counts * weights
+        self.counts = counts
+
+    def scale(self, factor):
+        """Scale the moments to those of factor times as many values.
+
+        This estimates the moments of a raster from those of a sample of its
+        windows.
+        """
+        if self.counts is not None:
+            self.counts = self.counts * factor
+            self.m2s = self.m2s * factor
+
+    def to_json(self):
+        if self.counts is None:
+            return None
+        return {
+            'counts': self.counts.tolist(),
+            'means': self.means.tolist(),
+            'm2s': self.m2s.tolist()
+        }
+
+    @staticmethod
+    def from_json(moments_json):
+        moments = ChannelMoments()
+        if moments_json is not None:
+            moments.merge(
+                ChannelMoments(moments_json['counts'], moments_json['means'],
+                               moments_json['m2s']))
+        return moments
+
+    def get_stds(self):
+        """Return the population standard deviation of each channel."""
+        return np.sqrt(self.m2s / np.maximum(self.counts, 1))
+
+
+def get_stats_windows(raster_sources,
+                      downsample_factor=1,
+                      sample_pixels=None,
+                      sample_mode=RANDOM_SAMPLE):
+    """Return the windows to compute the statistics of raster sources over.
+
+    Args:
+        raster_sources: list of RasterSource
+        downsample_factor: (int) if greater than 1, read the rasters at
+            1/downsample_factor of their resolution
+        sample_pixels: (int or None) if set, sample a subset of the windows
+            containing about this many pixels in total
+        sample_mode: RANDOM_SAMPLE or STRIDED_SAMPLE
+
+    Returns:
+        (windows, scales, out_shape) where windows is a list with the windows
+        of each raster source, scales is a list with the factor by which to
+        scale the statistics of the sampled windows of each raster source to
+        estimate those of the whole raster, and out_shape is the shape to
+        read the windows at
+    """
+    window_size = STATS_CHIP_SIZE * downsample_factor
+    out_shape = None
+    if downsample_factor > 1:
+        out_shape = (STATS_CHIP_SIZE, STATS_CHIP_SIZE)
+
+    all_windows = RasterStats.get_sample_windows(raster_sources, window_size)
+    if sample_pixels is None:
+        return all_windows, [1] * len(raster_sources), out_shape
+
+    sample_size = max(1, -(-sample_pixels // STATS_CHIP_SIZE**2))
+    windows = RasterStats.get_sample_windows(raster_sources, window_size,
+                                             sample_size, sample_mode)
+    scales = [
+        len(source_all_windows) / max(len(source_windows), 1)
+        for source_windows, source_all_windows in zip(windows, all_windows)
+    ]
+    return windows, scales, out_shape
+
+
+def get_file_version(uri):
+    """Return the size and last modified time of a file.
+
+    The size is None unless the file is local. Returns None if the last
+    modified time of the file is unknown.
+    """
+    modified = last_modified(uri)
+    if modified is None:
+        return None
+    size = os.path.getsize(uri) if os.path.isfile(uri) else None
+    return [size, modified.isoformat()]
+
+
+def get_source_key(raster_source):
+    """Return a key that identifies a raster source in a StatsCache.
+
+    The key is made of the URIs and channel order of the raster source, and
+    of the size and last modified time of its files so that the moments of
+    a file that is overwritten are not reused. The key is None if the raster
+    source has no URI, or if the last modified time of one of its files is
+    unknown.
+    """
+    uris = getattr(raster_source, 'uris', None)
+    if uris is None:
+        uri = getattr(raster_source, 'uri', None)
+        if uri is None:
+            return None
+        uris = [uri]
+    versions = [get_file_version(uri) for uri in uris]
+    if None in versions:
+        return None
+    channel_order = raster_source.channel_order
+    if channel_order is not None:
+        channel_order = [int(channel) for channel in channel_order]
+    return json.dumps({
+        'uris': list(uris),
+        'versions': versions,
+        'channel_order': channel_order
+    })
+
+
+class StatsCache():
+    """The ChannelMoments of each raster source used by RasterStats.compute.
+
+    Saving this between runs means that only the raster sources that were
+    not part of the previous run need to be read. The moments of a raster
+    source are only reused if they were computed with the same options.
+    """
+
+    def __init__(self, options=None, source_moments=None):
+        """Construct a new StatsCache.
+
+        Args:
+            options: dict of the options of RasterStats.compute the moments
+                were computed with
+            source_moments: dict from raster source key (see get_source_key)
+                to ChannelMoments
+        """
+        self.options = options
+        self.source_moments = source_moments or {}
+
+    def get(self, key):
+        return self.source_moments.get(key)
+
+    def set(self, key, moments):
+        self.source_moments[key] = moments
+
+    def check_options(self, options):
+        """Clear the cache if it was made with other options."""
+        if self.options != options:
+            self.options = options
+            self.source_moments = {}
+
+    def save(self, cache_uri):
+        cache_json = {
+            'options': self.options,
+            'sources': {
+                key: moments.to_json()
+                for key, moments in self.source_moments.items()
+            }
+        }
+        str_to_file(json.dumps(cache_json), cache_uri)
+
+    @staticmethod
+    def load(cache_uri):
+        """Load a StatsCache, or return an empty one if there is none."""
+        if not file_exists(cache_uri):
+            return StatsCache()
+        cache_json = json.loads(file_to_str(cache_uri))
+        source_moments = {
+            key: ChannelMoments.from_json(moments_json)
+            for key, moments_json in cache_json['sources'].items()
+        }
+        return StatsCache(cache_json['options'], source_moments)
 
 
 class RasterStats():
@@ -11,33 +240,143 @@ class RasterStats():
         self.means = None
         self.stds = None
 
-    def compute(self, raster_sources):
-        chip_size = 300
-        stride = chip_size
-
-        def chip_stream(channel):
-            for raster_source in raster_sources:
-                with raster_source.activate():
-                    windows = raster_source.get_extent().get_windows(
-                        chip_size, stride)
-                    for window in windows:
-                        chip = raster_source.get_raw_chip(window).astype(
-                            np.float32)
-                        chip = chip[:, :, channel].ravel()
-                        # Ignore NODATA values.
-                        chip[chip == 0.0] = np.nan
-                        yield chip
-
-        nb_channels = len(raster_sources[0].channel_order)
-
-        self.means = []
-        self.stds = []
-        for channel in range(nb_channels):
-            mean = last(
-                imean(chip_stream(channel), axis=None, ignore_nan=True))
-            self.means.append(mean)
-            std = last(istd(chip_stream(channel), axis=None, ignore_nan=True))
-            self.stds.append(std)
+    @staticmethod
+    def get_sample_windows(raster_sources,
+                           window_size,
+                           sample_size=None,
+                           sample_mode=RANDOM_SAMPLE):
+        """Return the windows to read from each raster source.
+
+        Args:
+            raster_sources: list of RasterSource
+            window_size: (int) size of the windows
+            sample_size: (int or None) if set, the number of windows to sample
+                across all raster sources. Otherwise, all windows are used.
+            sample_mode: RANDOM_SAMPLE to sample windows uniformly at random,
+                or STRIDED_SAMPLE to sample evenly spaced windows
+
+        Returns:
+            list with a list of windows for each raster source
+        """
+        windows = [
+            raster_source.get_extent().get_windows(window_size, window_size)
+            for raster_source in raster_sources
+        ]
+        nb_windows = sum(map(len, windows))
+        if sample_size is None or sample_size >= nb_windows:
+            return windows
+
+        if sample_mode == RANDOM_SAMPLE:
+            # Use a fixed seed so that stats are reproducible.
+            inds = np.random.RandomState(0).choice(
+                nb_windows, sample_size, replace=False)
+        elif sample_mode == STRIDED_SAMPLE:
+            inds = np.linspace(0, nb_windows, sample_size, endpoint=False)
+            inds = inds.astype(np.int64)
+        else:
+            raise ValueError('Unknown sample_mode: {}'.format(sample_mode))
+
+        is_sampled = np.zeros(nb_windows, dtype=bool)
+        is_sampled[inds] = True
+        sample_windows = []
+        offset = 0
+        for source_windows in windows:
+            source_is_sampled = is_sampled[offset:offset + len(source_windows)]
+            sample_windows.append([
+                window
+                for window, sampled in zip(source_windows, source_is_sampled)
+                if sampled
+            ])
+            offset += len(source_windows)
+        return sample_windows
+
+    @staticmethod
+    def compute_moments(raster_source, windows, out_shape=None):
+        """Compute the moments of each channel over windows of a raster.
+
+        Args:
+            raster_source: RasterSource
+            windows: list of Box
+            out_shape: (tuple or None) shape to read each window at
+
+        Returns:
+            ChannelMoments of the raw channels of the raster source
+        """
+        moments = ChannelMoments()
+        with raster_source.activate():
+            for window in windows:
+                moments.update(
+                    raster_source.get_raw_chip(window, out_shape=out_shape))
+        return moments
+
+    def compute(self,
+                raster_sources,
+                downsample_factor=1,
+                sample_pixels=None,
+                sample_mode=RANDOM_SAMPLE,
+                num_workers=1,
+                cache=None):
+        """Compute the mean and standard deviation of each channel.
+
+        The statistics are computed over the raw channels of the raster
+        sources (ie. before applying the channel order) in a single pass.
+        When sampling, the moments of each raster source are scaled up to
+        estimate those of the whole raster, so rasters sampled at different
+        rates can be merged.
+
+        Args:
+            raster_sources: list of RasterSource
+            downsample_factor: (int) if greater than 1, compute the statistics
+                over the rasters read at 1/downsample_factor of their
+                resolution. This uses the overviews of the rasters if they
+                have any, and reads much less data.
+            sample_pixels: (int or None) if set, compute the statistics over
+                a subset of the windows of the rasters containing about this
+                many pixels in total
+            sample_mode: RANDOM_SAMPLE or STRIDED_SAMPLE, how to pick the
+                windows when sample_pixels is set
+            num_workers: (int) number of raster sources to read in parallel
+            cache: (StatsCache or None) if set, the moments of the raster
+                sources found in the cache are used instead of reading them,
+                and the cache is updated with the moments of the others
+        """
+        windows, scales, out_shape = get_stats_windows(
+            raster_sources, downsample_factor, sample_pixels, sample_mode)
+
+        keys = [None] * len(raster_sources)
+        if cache is not None:
+            cache.check_options({
+                'downsample_factor': downsample_factor,
+                'sample_pixels': sample_pixels,
+                'sample_mode': sample_mode
+            })
+            keys = [get_source_key(rs) for rs in raster_sources]
+
+        def compute_moments(args):
+            raster_source, key, source_windows, scale = args
+            if key is not None and cache.get(key) is not None:
+                return cache.get(key)
+            moments = RasterStats.compute_moments(raster_source,
+                                                  source_windows, out_shape)
+            moments.scale(scale)
+            return moments
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            source_moments = executor.map(
+                compute_moments, zip(raster_sources, keys, windows, scales))
+            moments = ChannelMoments()
+            for key, m in zip(keys, source_moments):
+                if key is not None:
+                    cache.set(key, m)
+                moments.merge(m)
+
+        if moments.counts is None or not np.any(moments.counts > 0):
+            raise ValueError(
+                'Cannot compute the stats of the raster sources, as there are '
+                'no valid (ie. non-zero) pixels in the windows that were read. '
+                'If sample_pixels is set, try increasing it.')
+        self.means = moments.means.tolist()
+        self.stds = moments.get_stds().tolist()
 
     def save(self, stats_uri):
         # Ensure lists
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class CRSTransformer(object):
     """Transforms map points in some CRS into pixel coordinates.
 
@@ -18,6 +21,22 @@ class CRSTransformer(object):
         """
         pass
 
+    def map_to_pixel_many(self, map_points):
+        """Transform an array of points from map to pixel-based coordinates.
+
+        Subclasses should override this to transform all of the points in a
+        single batched call. By default, it calls map_to_pixel on each point.
+
+        Args:
+            map_points: numpy array of size nx2 with (x, y) points in map
+                coordinates
+
+        Returns:
+            numpy array of size nx2 with (x, y) points in pixel coordinates
+        """
+        return np.array([self.map_to_pixel(p) for p in map_points]).reshape(
+            -1, 2)
+
     def pixel_to_map(self, pixel_point):
         """Transform point from pixel to map-based coordinates.
 
@@ -29,6 +48,22 @@ class CRSTransformer(object):
         """
         pass
 
+    def pixel_to_map_many(self, pixel_points):
+        """Transform an array of points from pixel to map-based coordinates.
+
+        Subclasses should override this to transform all of the points in a
+        single batched call. By default, it calls pixel_to_map on each point.
+
+        Args:
+            pixel_points: numpy array of size nx2 with (x, y) points in pixel
+                coordinates
+
+        Returns:
+            numpy array of size nx2 with (x, y) points in map coordinates
+        """
+        return np.array([self.pixel_to_map(p) for p in pixel_points]).reshape(
+            -1, 2)
+
     def get_image_crs(self):
         return self.image_crs
 
@@ -1,3 +1,5 @@
+import numpy as np
+
 from rastervision.data.crs_transformer import CRSTransformer
 
 
@@ -18,6 +20,18 @@ class IdentityCRSTransformer(CRSTransformer):
         """
         return map_point
 
+    def map_to_pixel_many(self, map_points):
+        """Identity function.
+
+        Args:
+            map_points: numpy array of size nx2 with (x, y) points in pixel
+                coordinates
+
+        Returns:
+            numpy array of size nx2 with (x, y) points in pixel coordinates
+        """
+        return np.array(map_points).reshape(-1, 2)
+
     def pixel_to_map(self, pixel_point):
         """Identity function.
 
@@ -28,3 +42,15 @@ class IdentityCRSTransformer(CRSTransformer):
             (x, y) tuple in pixel coordinates
         """
         return pixel_point
+
+    def pixel_to_map_many(self, pixel_points):
+        """Identity function.
+
+        Args:
+            pixel_points: numpy array of size nx2 with (x, y) points in pixel
+                coordinates
+
+        Returns:
+            numpy array of size nx2 with (x, y) points in pixel coordinates
+        """
+        return np.array(pixel_points).reshape(-1, 2)
@@ -1,13 +1,58 @@
-import pyproj
+from functools import lru_cache
+import sys
 
-from rasterio.transform import (rowcol, xy)
+import numpy as np
+import pyproj
 
 from rastervision.data.crs_transformer import (CRSTransformer,
                                                IdentityCRSTransformer)
 
+# rasterio.transform.rowcol (as of the pinned rasterio 1.0) moves points by
+# this much before flooring, so that points on the top-left edges of a pixel
+# fall in it despite rounding errors.
+ROWCOL_EPSILON = sys.float_info.epsilon
+
+
+class LegacyProjTransformer(object):
+    """Transforms arrays of points with pyproj.transform for pyproj<2.2.
+
+    This has the same transform method as pyproj.Transformer.
+    """
+
+    def __init__(self, src_crs, dst_crs):
+        self.src_proj = pyproj.Proj(init=src_crs)
+        self.dst_proj = pyproj.Proj(init=dst_crs)
+
+    def transform(self, xs, ys):
+        return pyproj.transform(self.src_proj, self.dst_proj, xs, ys)
+
+
+@lru_cache(maxsize=32)
+def get_pyproj_transformer(src_crs, dst_crs):
+    """Return a cached transformer from one CRS to another.
+
+    This is a pyproj.Transformer, or a LegacyProjTransformer for versions of
+    pyproj without it. Points are in (x, y) order (eg. lon/lat) for all CRSs.
+    """
+    if not hasattr(pyproj, 'Transformer'):
+        return LegacyProjTransformer(src_crs, dst_crs)
+    return pyproj.Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+
+
+def apply_affine(transform, xs, ys):
+    """Apply an Affine transform to arrays of x and y coordinates."""
+    a, b, c, d, e, f = transform[:6]
+    return xs * a + ys * b + c, xs * d + ys * e + f
+
 
 class RasterioCRSTransformer(CRSTransformer):
-    """Transformer for a RasterioRasterSource."""
+    """Transformer for a RasterioRasterSource.
+
+    Points are transformed between CRSs with a transformer that is cached for
+    each pair of CRSs (see get_pyproj_transformer), and between the image CRS
+    and pixels with the affine transform of the image, so arrays of points
+    are transformed without a Python call per point.
+    """
 
     def __init__(self, transform, image_crs, map_crs='epsg:4326'):
         """Construct transformer.
@@ -17,8 +62,9 @@ class RasterioCRSTransformer(CRSTransformer):
             map_crs: CRS code
         """
         self.transform = transform
-        self.map_proj = pyproj.Proj(init=map_crs)
-        self.image_proj = pyproj.Proj(init=image_crs)
+        self.inverse_transform = ~transform
+        self.map_to_image = get_pyproj_transformer(map_crs, image_crs)
+        self.image_to_map = get_pyproj_transformer(image_crs, map_crs)
 
         super().__init__(image_crs, map_crs)
 
@@ -31,11 +77,28 @@ class RasterioCRSTransformer(CRSTransformer):
         Returns:
             (x, y) tuple in pixel coordinates
         """
-        image_point = pyproj.transform(self.map_proj, self.image_proj,
-                                       map_point[0], map_point[1])
-        pixel_point = rowcol(self.transform, image_point[0], image_point[1])
-        pixel_point = (pixel_point[1], pixel_point[0])
-        return pixel_point
+        return tuple(self.map_to_pixel_many([map_point[:2]])[0].tolist())
+
+    def map_to_pixel_many(self, map_points):
+        """Transform an array of points from map to pixel-based coordinates.
+
+        Args:
+            map_points: numpy array of size nx2 with (x, y) points in map
+                coordinates
+
+        Returns:
+            int numpy array of size nx2 with (x, y) points in pixel
+            coordinates, which are those of the pixels containing the points.
+            Like rasterio.transform.rowcol, points are moved by
+            ROWCOL_EPSILON before flooring.
+        """
+        map_points = np.asarray(map_points, dtype=np.float64).reshape(-1, 2)
+        image_xs, image_ys = self.map_to_image.transform(
+            map_points[:, 0], map_points[:, 1])
+        cols, rows = apply_affine(self.inverse_transform,
+                                  np.asarray(image_xs) + ROWCOL_EPSILON,
+                                  np.asarray(image_ys) - ROWCOL_EPSILON)
+        return np.floor(np.stack([cols, rows], axis=1)).astype(np.int64)
 
     def pixel_to_map(self, pixel_point):
         """Transform point from pixel to map-based coordinates.
@@ -46,11 +109,25 @@ class RasterioCRSTransformer(CRSTransformer):
         Returns:
             (x, y) tuple in map coordinates
         """
-        image_point = xy(self.transform, int(pixel_point[1]),
-                         int(pixel_point[0]))
-        map_point = pyproj.transform(self.image_proj, self.map_proj,
-                                     image_point[0], image_point[1])
-        return map_point
+        return tuple(self.pixel_to_map_many([pixel_point[:2]])[0].tolist())
+
+    def pixel_to_map_many(self, pixel_points):
+        """Transform an array of points from pixel to map-based coordinates.
+
+        Args:
+            pixel_points: numpy array of size nx2 with (x, y) points in pixel
+                coordinates, which are truncated to ints
+
+        Returns:
+            numpy array of size nx2 with (x, y) points in map coordinates,
+            which are those of the centers of the pixels
+        """
+        pixel_points = np.trunc(
+            np.asarray(pixel_points, dtype=np.float64).reshape(-1, 2))
+        image_xs, image_ys = apply_affine(
+            self.transform, pixel_points[:, 0] + 0.5, pixel_points[:, 1] + 0.5)
+        map_xs, map_ys = self.image_to_map.transform(image_xs, image_ys)
+        return np.stack([map_xs, map_ys], axis=1)
 
     @classmethod
     def from_dataset(cls, dataset, map_crs='epsg:4326'):
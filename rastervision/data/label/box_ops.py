@@ -0,0 +1,271 @@
+"""Vectorized operations on arrays of boxes.
+
+Boxes are stored as [n, 4] numpy arrays with columns ymin, xmin, ymax, xmax.
+"""
+import numpy as np
+
+
+def get_areas(npboxes):
+    """Return the area of each box.
+
+    Args:
+        npboxes: [n, 4] numpy array
+
+    Returns:
+        [n] numpy array
+    """
+    return (npboxes[:, 2] - npboxes[:, 0]) * (npboxes[:, 3] - npboxes[:, 1])
+
+
+def get_intersections(npboxes1, npboxes2):
+    """Return the area of the intersection of each pair of boxes.
+
+    Args:
+        npboxes1: [n, 4] numpy array
+        npboxes2: [m, 4] numpy array
+
+    Returns:
+        [n, m] numpy array
+    """
+    ymin1, xmin1, ymax1, xmax1 = np.split(npboxes1, 4, axis=1)
+    ymin2, xmin2, ymax2, xmax2 = np.split(npboxes2, 4, axis=1)
+    heights = np.minimum(ymax1, ymax2.T) - np.maximum(ymin1, ymin2.T)
+    widths = np.minimum(xmax1, xmax2.T) - np.maximum(xmin1, xmin2.T)
+    np.maximum(heights, 0, out=heights)
+    np.maximum(widths, 0, out=widths)
+    return heights * widths
+
+
+def get_ioas(npboxes1, npboxes2):
+    """Return the intersection over area of each pair of boxes.
+
+    The area is that of the boxes in npboxes2, so this is the fraction of each
+    box in npboxes2 that lies within each box in npboxes1.
+
+    Args:
+        npboxes1: [n, 4] numpy array
+        npboxes2: [m, 4] numpy array
+
+    Returns:
+        [n, m] numpy array
+    """
+    intersections = get_intersections(npboxes1, npboxes2)
+    areas = get_areas(npboxes2)[np.newaxis, :]
+    return np.divide(
+        intersections,
+        areas,
+        out=np.zeros(intersections.shape),
+        where=areas > 0)
+
+
+def get_ious(npboxes1, npboxes2):
+    """Return the intersection over union of each pair of boxes.
+
+    Args:
+        npboxes1: [n, 4] numpy array
+        npboxes2: [m, 4] numpy array
+
+    Returns:
+        [n, m] numpy array
+    """
+    intersections = get_intersections(npboxes1, npboxes2)
+    unions = get_areas(npboxes1)[:, np.newaxis] + \
+        get_areas(npboxes2)[np.newaxis, :]
+    unions -= intersections
+    return np.divide(
+        intersections,
+        unions,
+        out=np.zeros(intersections.shape),
+        where=unions > 0)
+
+
+def clip_to_window(npboxes, window_npbox):
+    """Clip boxes to a window.
+
+    Args:
+        npboxes: [n, 4] numpy array
+        window_npbox: [4] numpy array with the window
+
+    Returns:
+        (clipped_npboxes, inds) where clipped_npboxes are the clipped boxes
+        with a non-zero area, and inds are their indices in npboxes
+    """
+    ymin, xmin, ymax, xmax = window_npbox
+    clipped_npboxes = np.clip(npboxes, [ymin, xmin, ymin, xmin],
+                              [ymax, xmax, ymax, xmax]).astype(npboxes.dtype)
+    inds = np.flatnonzero(get_areas(clipped_npboxes) > 0)
+    return clipped_npboxes[inds], inds
+
+
+def intersects_segment(npboxes, segment):
+    """Return whether each box intersects a line segment.
+
+    Boxes that only touch the segment intersect it. This clips the segment to
+    each box (Liang-Barsky).
+
+    Args:
+        npboxes: [n, 4] numpy array
+        segment: (y0, x0, y1, x1) endpoints of the segment
+
+    Returns:
+        [n] boolean numpy array
+    """
+    y0, x0, y1, x1 = segment
+    dy, dx = y1 - y0, x1 - x0
+    t0 = np.zeros(len(npboxes))
+    t1 = np.ones(len(npboxes))
+    intersects = np.ones(len(npboxes), dtype=bool)
+    # The part of the segment inside the box is where p * t <= q for each of
+    # its four sides.
+    for p, q in [(-dy, y0 - npboxes[:, 0]), (-dx, x0 - npboxes[:, 1]),
+                 (dy, npboxes[:, 2] - y0), (dx, npboxes[:, 3] - x0)]:
+        if p == 0:
+            intersects &= q >= 0
+        elif p < 0:
+            t0 = np.maximum(t0, q / p)
+        else:
+            t1 = np.minimum(t1, q / p)
+    return intersects & (t0 <= t1)
+
+
+def non_max_suppression(npboxes,
+                        scores,
+                        iou_thresh,
+                        score_thresh=None,
+                        max_output_size=None):
+    """Greedily select boxes with high scores that do not overlap.
+
+    Boxes are visited in decreasing order of score, and each selected box
+    suppresses the remaining boxes with an IOU above iou_thresh. Among boxes
+    with the same score, later boxes are visited first.
+
+    Args:
+        npboxes: [n, 4] numpy array
+        scores: [n] numpy array
+        iou_thresh: boxes with an IOU above this with a box with a higher
+            score are suppressed
+        score_thresh: if set, only consider boxes with a score above this
+        max_output_size: if set, maximum number of boxes to select
+
+    Returns:
+        indices of the selected boxes in decreasing order of score
+    """
+    inds = np.arange(len(scores))
+    if score_thresh is not None:
+        inds = inds[scores > score_thresh]
+    # Like the TF Object Detection API, break ties in favor of later boxes.
+    inds = inds[np.argsort(scores[inds], kind='stable')[::-1]]
+    if max_output_size is None:
+        max_output_size = len(inds)
+
+    npboxes = npboxes[inds]
+    areas = get_areas(npboxes)
+    is_valid = np.ones(len(inds), dtype=bool)
+    selected = []
+    for i in range(len(inds)):
+        if len(selected) >= max_output_size:
+            break
+        if not is_valid[i]:
+            continue
+        selected.append(i)
+
+        # Only compare with the remaining boxes with lower scores.
+        rest = i + 1 + np.flatnonzero(is_valid[i + 1:])
+        if len(rest) == 0:
+            break
+        intersections = get_intersections(npboxes[i:i + 1], npboxes[rest])[0]
+        unions = areas[i] + areas[rest] - intersections
+        ious = np.divide(
+            intersections, unions, out=np.zeros(len(rest)), where=unions > 0)
+        is_valid[rest[ious > iou_thresh]] = False
+    return inds[selected]
+
+
+class BoxIndex():
+    """A grid index over the extents of boxes.
+
+    Each box is registered in the cells of a regular grid that it touches,
+    and the entries are sorted by cell, so the boxes in a row of cells are a
+    contiguous slice. Finding the boxes that may intersect a window then
+    costs a binary search per row of cells spanned by the window, plus the
+    number of boxes in those cells.
+    """
+
+    def __init__(self, npboxes, cell_size=None):
+        """Build an index.
+
+        Args:
+            npboxes: [n, 4] numpy array
+            cell_size: (float or None) size of the cells. Defaults to twice
+                the median size of the boxes.
+        """
+        self.nb_boxes = len(npboxes)
+        if cell_size is None:
+            sizes = np.maximum(npboxes[:, 2] - npboxes[:, 0],
+                               npboxes[:, 3] - npboxes[:, 1])
+            cell_size = 2 * float(np.median(sizes)) if len(sizes) else 1
+        self.cell_size = max(cell_size, 1)
+
+        if self.nb_boxes == 0:
+            self.ymin = self.xmin = 0
+            self.nb_rows = self.nb_cols = 0
+            self.cell_keys = np.empty((0, ), dtype=np.int64)
+            self.box_inds = np.empty((0, ), dtype=np.int64)
+            return
+
+        self.ymin = float(npboxes[:, 0].min())
+        self.xmin = float(npboxes[:, 1].min())
+        rows0, cols0, rows1, cols1 = self._get_cells(npboxes)
+        rows1 = np.maximum(rows0, rows1)
+        cols1 = np.maximum(cols0, cols1)
+        self.nb_rows = int(rows1.max()) + 1
+        self.nb_cols = int(cols1.max()) + 1
+
+        # Register each box in each cell it touches.
+        nb_rows = rows1 - rows0 + 1
+        nb_cols = cols1 - cols0 + 1
+        nb_cells = nb_rows * nb_cols
+        box_inds = np.repeat(np.arange(self.nb_boxes), nb_cells)
+        starts = np.cumsum(nb_cells) - nb_cells
+        cell_inds = np.arange(len(box_inds)) - np.repeat(starts, nb_cells)
+        rows = rows0[box_inds] + cell_inds // nb_cols[box_inds]
+        cols = cols0[box_inds] + cell_inds % nb_cols[box_inds]
+        cell_keys = rows * self.nb_cols + cols
+
+        order = np.argsort(cell_keys, kind='stable')
+        self.cell_keys = cell_keys[order]
+        self.box_inds = box_inds[order]
+
+    def _get_cells(self, npboxes):
+        """Return the first and last row and column of cells of each box."""
+        cells = np.empty(npboxes.shape, dtype=np.int64)
+        cells[:, 0::2] = np.floor(
+            (npboxes[:, 0::2] - self.ymin) / self.cell_size)
+        cells[:, 1::2] = np.floor(
+            (npboxes[:, 1::2] - self.xmin) / self.cell_size)
+        return cells[:, 0], cells[:, 1], cells[:, 2], cells[:, 3]
+
+    def query(self, window_npbox):
+        """Return the indices of the boxes that may intersect a window.
+
+        This returns every box that intersects the window, including boxes
+        that only touch it, and possibly a few more.
+
+        Args:
+            window_npbox: [4] numpy array
+
+        Returns:
+            sorted array of box indices
+        """
+        rows0, cols0, rows1, cols1 = self._get_cells(
+            np.asarray(window_npbox, dtype=np.float64)[np.newaxis, :])
+        row0, row1 = max(rows0[0], 0), min(rows1[0], self.nb_rows - 1)
+        col0, col1 = max(cols0[0], 0), min(cols1[0], self.nb_cols - 1)
+        if row0 > row1 or col0 > col1:
+            return np.empty((0, ), dtype=np.int64)
+
+        row_keys = np.arange(row0, row1 + 1) * self.nb_cols
+        starts = np.searchsorted(self.cell_keys, row_keys + col0, 'left')
+        ends = np.searchsorted(self.cell_keys, row_keys + col1, 'right')
+        box_inds = [self.box_inds[s:e] for s, e in zip(starts, ends)]
+        return np.unique(np.concatenate(box_inds))
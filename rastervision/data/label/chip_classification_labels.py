@@ -1,36 +1,258 @@
+import numpy as np
+from shapely.geometry import box as ShapelyBox
+from shapely.prepared import prep
+import shapely.vectorized
+
 from rastervision.core.box import Box
 from rastervision.data.label import Labels
+from rastervision.data.label import box_ops
+
+# Class id stored for cells without a class.
+NO_CLASS_ID = -1
+
+
+def get_within_polygon(npboxes, polygon):
+    """Return whether each box lies within a polygon.
+
+    A box that does not touch the boundary of the polygon is either inside
+    or outside it, which is decided for all such boxes at once from their
+    centers. Only the boxes crossed by the boundary are checked with shapely.
+
+    Args:
+        npboxes: [n, 4] numpy array
+        polygon: shapely Polygon or MultiPolygon
+
+    Returns:
+        [n] boolean numpy array
+    """
+    is_within = np.zeros(len(npboxes), dtype=bool)
+    if len(npboxes) == 0:
+        return is_within
+
+    index = box_ops.BoxIndex(npboxes)
+    on_boundary = np.zeros(len(npboxes), dtype=bool)
+    boundary = polygon.boundary
+    for line in getattr(boundary, 'geoms', [boundary]):
+        coords = np.asarray(line.coords)
+        for (x0, y0), (x1, y1) in zip(coords[:-1], coords[1:]):
+            inds = index.query(
+                [min(y0, y1),
+                 min(x0, x1),
+                 max(y0, y1),
+                 max(x0, x1)])
+            inds = inds[~on_boundary[inds]]
+            on_boundary[inds[box_ops.intersects_segment(
+                npboxes[inds], (y0, x0, y1, x1))]] = True
+
+    inds = np.flatnonzero(~on_boundary)
+    centers_y = (npboxes[inds, 0] + npboxes[inds, 2]) / 2
+    centers_x = (npboxes[inds, 1] + npboxes[inds, 3]) / 2
+    is_within[inds] = shapely.vectorized.contains(polygon, centers_x,
+                                                  centers_y)
+
+    prepared_polygon = prep(polygon)
+    for ind in np.flatnonzero(on_boundary):
+        is_within[ind] = prepared_polygon.contains(
+            Box(*npboxes[ind]).to_shapely())
+    return is_within
 
 
 class ChipClassificationLabels(Labels):
-    """Represents a spatial grid of cells associated with classes."""
+    """Represents a spatial grid of cells associated with classes.
+
+    The cells, class_ids and scores are stored in separate arrays. Cells set
+    with set_cell are buffered and added to the arrays the next time the
+    labels are read, so setting the cells of a scene one at a time stays
+    linear. Cells are looked up with a grid index (see box_ops.BoxIndex).
+    """
+
+    def __init__(self, npboxes=None, class_ids=None, scores=None):
+        """Construct a set of chip classification labels.
 
-    def __init__(self):
-        self.cell_to_class_id = {}
+        Args:
+            npboxes: int numpy array of size nx4 with the cells, with cols
+                ymin, xmin, ymax, xmax. Cells must be unique.
+            class_ids: int numpy array of size n with the class id of each
+                cell, or NO_CLASS_ID for cells without a class
+            scores: None, or float numpy array of size nxc with the scores of
+                each class for each cell, and NaNs for cells without scores
+        """
+        if npboxes is None:
+            npboxes = np.empty((0, 4))
+            class_ids = np.empty((0, ))
+        self.npboxes = np.asarray(npboxes).round().astype(np.int64).reshape(
+            -1, 4)
+        self.class_ids = np.asarray(class_ids).astype(np.int64).reshape(-1)
+        if scores is not None:
+            scores = np.asarray(scores, dtype=np.float32)
+            scores = scores.reshape(len(self.npboxes), -1)
+        self.scores = scores
+        if not len(self.npboxes) == len(self.class_ids):
+            raise ValueError(
+                'npboxes and class_ids must have the same length.')
+
+        self._new_cells = []
+        # Number of scores of the cells in _new_cells.
+        self._new_nb_scores = None
+        self._index = None
+
+    def _flush(self):
+        """Add the cells set with set_cell to the arrays."""
+        if not self._new_cells:
+            return
+        new_cells, self._new_cells = self._new_cells, []
+        self._new_nb_scores = None
+
+        npboxes = np.array([cell for cell, _, _ in new_cells])
+        class_ids = np.array([
+            NO_CLASS_ID if class_id is None else class_id
+            for _, class_id, _ in new_cells
+        ])
+        scores = None
+        nb_scores = [
+            len(cell_scores) for _, _, cell_scores in new_cells
+            if cell_scores is not None
+        ]
+        if nb_scores:
+            scores = np.full(
+                (len(new_cells), nb_scores[0]), np.nan, dtype=np.float32)
+            for i, (_, _, cell_scores) in enumerate(new_cells):
+                if cell_scores is not None:
+                    scores[i] = cell_scores
+        labels = ChipClassificationLabels.concatenate_all(
+            [self, ChipClassificationLabels(npboxes, class_ids, scores)])
+        self.npboxes = labels.npboxes
+        self.class_ids = labels.class_ids
+        self.scores = labels.scores
+        self._index = None
+
+    def _get_ind(self, cell):
+        """Return the index of a cell, or None if there is no such cell."""
+        self._flush()
+        if self._index is None:
+            self._index = box_ops.BoxIndex(self.npboxes)
+        npbox = np.array(cell.tuple_format()).round().astype(np.int64)
+        inds = self._index.query(npbox)
+        inds = inds[(self.npboxes[inds] == npbox).all(axis=1)]
+        if len(inds) == 0:
+            return None
+        return inds[0]
+
+    def get_inds(self, npboxes):
+        """Return the index of each of an array of cells in these labels.
+
+        Args:
+            npboxes: numpy array of size nx4 with cells
+
+        Returns:
+            int numpy array of size n with the indices of the cells, and -1 for
+            cells that are not in these labels
+        """
+        self._flush()
+        npboxes = np.asarray(npboxes).round().astype(np.int64).reshape(-1, 4)
+        _, cell_ids = np.unique(
+            np.concatenate([self.npboxes, npboxes]),
+            axis=0,
+            return_inverse=True)
+        cell_ids = cell_ids.reshape(-1)
+        inds = np.full(cell_ids.max() + 1 if len(cell_ids) else 0, -1)
+        inds[cell_ids[:len(self.npboxes)]] = np.arange(len(self.npboxes))
+        return inds[cell_ids[len(self.npboxes):]]
+
+    def get_subset(self, inds):
+        """Return the labels at some indices.
+
+        Args:
+            inds: array of indices or boolean mask
+        """
+        self._flush()
+        scores = None if self.scores is None else self.scores[inds]
+        return ChipClassificationLabels(self.npboxes[inds],
+                                        self.class_ids[inds], scores)
 
     def __len__(self):
-        return len(self.cell_to_class_id)
+        self._flush()
+        return len(self.npboxes)
 
     def __eq__(self, other):
-        return (isinstance(other, ChipClassificationLabels)
-                and self.cell_to_class_id == other.cell_to_class_id)
+        if not (isinstance(other, ChipClassificationLabels)
+                and len(self) == len(other)):
+            return False
+        inds = other.get_inds(self.npboxes)
+        if (inds < 0).any():
+            return False
+        other = other.get_subset(inds)
+        if (self.scores is None) != (other.scores is None):
+            return False
+        if not np.array_equal(self.class_ids, other.class_ids):
+            return False
+        return (self.scores is None
+                or np.array_equal(self.scores, other.scores, equal_nan=True))
 
     def __add__(self, other):
-        result = ChipClassificationLabels()
-        result.extend(self)
-        result.extend(other)
-        return result
+        return ChipClassificationLabels.concatenate_all([self, other])
+
+    @classmethod
+    def concatenate_all(cls, labels_list):
+        """Return concatenation of a non-empty list of labels.
+
+        When labels have the same cell, the class_id and scores of the last
+        labels are kept.
+        """
+        for labels in labels_list:
+            labels._flush()
+        npboxes = np.concatenate([labels.npboxes for labels in labels_list])
+        class_ids = np.concatenate(
+            [labels.class_ids for labels in labels_list])
+
+        # Labels without scores get NaN scores if other labels have some.
+        scores = None
+        nb_scores = [
+            labels.scores.shape[1] for labels in labels_list
+            if labels.scores is not None
+        ]
+        if len(set(nb_scores)) > 1:
+            raise ValueError(
+                'Cannot concatenate labels with different numbers of scores: '
+                '{}'.format(sorted(set(nb_scores))))
+        if nb_scores:
+            scores = np.concatenate([
+                labels.scores if labels.scores is not None else np.full(
+                    (len(labels.npboxes), nb_scores[0]), np.nan, np.float32)
+                for labels in labels_list
+            ])
+
+        # Keep the last occurrence of each cell.
+        _, last_inds = np.unique(npboxes[::-1], axis=0, return_index=True)
+        inds = np.sort(len(npboxes) - 1 - last_inds)
+        if len(inds) < len(npboxes):
+            npboxes = npboxes[inds]
+            class_ids = class_ids[inds]
+            if scores is not None:
+                scores = scores[inds]
+        return ChipClassificationLabels(npboxes, class_ids, scores)
 
     def filter_by_aoi(self, aoi_polygons):
-        result = ChipClassificationLabels()
-        for cell in self.cell_to_class_id:
-            cell_box = Box.from_tuple(cell)
-            cell_poly = cell_box.to_shapely()
-            for aoi in aoi_polygons:
-                if cell_poly.within(aoi):
-                    (class_id, scores) = self.cell_to_class_id[cell]
-                    result.set_cell(cell_box, class_id, scores)
-        return result
+        """Return the cells that lie within an AOI polygon.
+
+        Cells outside the bounds of a polygon are discarded with numpy, and
+        rectangular polygons need no other check. Otherwise, only the cells
+        crossed by the boundary of the polygon are checked one at a time (see
+        get_within_polygon).
+        """
+        self._flush()
+        is_within = np.zeros(len(self.npboxes), dtype=bool)
+        for aoi in aoi_polygons:
+            xmin, ymin, xmax, ymax = aoi.bounds
+            inds = np.flatnonzero(~is_within
+                                  & (self.npboxes[:, 0] >= ymin)
+                                  & (self.npboxes[:, 1] >= xmin)
+                                  & (self.npboxes[:, 2] <= ymax)
+                                  & (self.npboxes[:, 3] <= xmax))
+            if not aoi.equals(ShapelyBox(xmin, ymin, xmax, ymax)):
+                inds = inds[get_within_polygon(self.npboxes[inds], aoi)]
+            is_within[inds] = True
+        return self.get_subset(is_within)
 
     def set_cell(self, cell, class_id, scores=None):
         """Set cell and its class_id.
@@ -38,11 +260,19 @@ class ChipClassificationLabels(Labels):
         Args:
             cell: (Box)
             class_id: int
-            scores: 1d numpy array of probabilities for each class
+            scores: 1d numpy array of probabilities for each class, which must
+                have the same length for all cells
         """
         if scores is not None:
-            scores = list(map(lambda x: float(x), list(scores)))
-        self.cell_to_class_id[cell.tuple_format()] = (class_id, scores)
+            nb_scores = self._new_nb_scores
+            if nb_scores is None and self.scores is not None:
+                nb_scores = self.scores.shape[1]
+            if nb_scores is not None and len(scores) != nb_scores:
+                raise ValueError(
+                    'Cannot set cell {} with {} scores, as other cells have {} '
+                    'scores.'.format(cell, len(scores), nb_scores))
+            self._new_nb_scores = len(scores)
+        self._new_cells.append((cell.tuple_format(), class_id, scores))
 
     def get_cell_class_id(self, cell):
         """Return class_id for a cell.
@@ -50,7 +280,7 @@ class ChipClassificationLabels(Labels):
         Args:
             cell: (Box)
         """
-        result = self.cell_to_class_id.get(cell.tuple_format())
+        result = self.get_cell_values(cell)
         if result:
             return result[0]
         else:
@@ -62,7 +292,7 @@ class ChipClassificationLabels(Labels):
         Args:
             cell: (Box)
         """
-        result = self.cell_to_class_id.get(cell.tuple_format())
+        result = self.get_cell_values(cell)
         if result:
             return result[1]
         else:
@@ -74,37 +304,53 @@ class ChipClassificationLabels(Labels):
         Args:
             cell: (Box)
         """
-        return self.cell_to_class_id.get(cell.tuple_format())
+        ind = self._get_ind(cell)
+        if ind is None:
+            return None
+        return self.get_subset([ind]).get_values()[0]
 
     def get_singleton_labels(self, cell):
         """Return Labels object representing a single cell.
 
+        The labels are empty if there is no such cell.
+
         Args:
             cell: (Box)
         """
-        class_id, scores = self.get_cell_values(cell)
-        labels = ChipClassificationLabels()
-        labels.set_cell(cell, class_id, scores)
-        return labels
+        ind = self._get_ind(cell)
+        return self.get_subset([] if ind is None else [ind])
+
+    def get_npboxes(self):
+        """Return numpy array of size nx4 with all cells."""
+        self._flush()
+        return self.npboxes
 
     def get_cells(self):
         """Return list of all cells (list of Box)."""
-        return [
-            Box.from_npbox(box_tup)
-            for box_tup in self.cell_to_class_id.keys()
-        ]
+        return [Box.from_npbox(npbox) for npbox in self.get_npboxes().tolist()]
 
     def get_class_ids(self):
         """Return list of class_ids for all cells."""
-        return list(map(lambda x: x[0], self.cell_to_class_id.values()))
+        self._flush()
+        return [
+            None if class_id == NO_CLASS_ID else class_id
+            for class_id in self.class_ids.tolist()
+        ]
 
     def get_scores(self):
         """Return list of scores for all cells."""
-        return list(map(lambda x: x[1], self.cell_to_class_id.values()))
+        self._flush()
+        if self.scores is None:
+            return [None] * len(self.npboxes)
+        has_scores = ~np.isnan(self.scores).all(axis=1)
+        return [
+            cell_scores if has else None
+            for cell_scores, has in zip(self.scores.tolist(), has_scores)
+        ]
 
     def get_values(self):
         """Return list of class_ids and scores for all cells."""
-        return list(self.cell_to_class_id.values())
+        return list(zip(self.get_class_ids(), self.get_scores()))
 
     def extend(self, labels):
         """Adds cells contained in labels.
@@ -112,6 +358,8 @@ class ChipClassificationLabels(Labels):
         Args:
             labels: ChipClassificationLabels
         """
-        for cell in labels.get_cells():
-            class_id, scores = labels.get_cell_values(cell)
-            self.set_cell(cell, class_id, scores)
+        labels = ChipClassificationLabels.concatenate_all([self, labels])
+        self.npboxes = labels.npboxes
+        self.class_ids = labels.class_ids
+        self.scores = labels.scores
+        self._index = None
@@ -1,4 +1,6 @@
 from abc import (ABC, abstractmethod)
+from functools import reduce
+import operator
 
 
 class Labels(ABC):
@@ -18,6 +20,15 @@ class Labels(ABC):
         """
         pass
 
+    @classmethod
+    def concatenate_all(cls, labels_list):
+        """Return the concatenation of a non-empty list of labels.
+
+        Subclasses should override this when adding labels copies them, so
+        that concatenating many labels takes linear time.
+        """
+        return reduce(operator.add, labels_list)
+
     @abstractmethod
     def filter_by_aoi(self, aoi_polygons):
         """Returns a copy of these labels filtered by a given set of AOI polygons
@@ -26,3 +37,30 @@ class Labels(ABC):
           aoi_polygons - A list of AOI polygons to filter by, in pixel coordinates.
         """
         pass
+
+
+class LabelsBuilder(object):
+    """Accumulates labels and concatenates them once when built.
+
+    Adding labels one batch at a time with + copies all the labels added so
+    far for each batch, which takes quadratic time in the number of labels.
+    """
+
+    def __init__(self, labels):
+        """Construct a new LabelsBuilder.
+
+        Args:
+            labels: Labels to start from, usually the empty labels of the type
+                to build
+        """
+        self.labels_list = [labels]
+
+    def add(self, labels):
+        """Add labels of the same type as the initial labels."""
+        self.labels_list.append(labels)
+
+    def build(self):
+        """Return the concatenation of all the labels added so far."""
+        labels = type(self.labels_list[0]).concatenate_all(self.labels_list)
+        self.labels_list = [labels]
+        return labels
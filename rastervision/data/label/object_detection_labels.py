@@ -2,12 +2,14 @@ import numpy as np
 
 from rastervision.core.box import Box
 from rastervision.data.label import Labels
+from rastervision.data.label import box_ops
 
 
 class ObjectDetectionLabels(Labels):
     """A set of boxes and associated class_ids and scores.
 
-    Implemented using the Tensorflow Object Detection API's BoxList class.
+    The boxes, class_ids and scores are stored in separate arrays, and the
+    operations on them are vectorized with numpy (see box_ops).
     """
 
     def __init__(self, npboxes, class_ids, scores=None):
@@ -16,22 +18,36 @@ class ObjectDetectionLabels(Labels):
         Args:
             npboxes: float numpy array of size nx4 with cols
                 ymin, xmin, ymax, xmax. Should be in pixel coordinates within
-                the global frame of reference.
+                the global frame of reference. This is stored as float32.
             class_ids: int numpy array of size n with class ids starting at 1
             scores: float numpy array of size n
         """
-        # Lazily load TF Object Detection
-        from object_detection.utils.np_box_list import BoxList
-
-        self.boxlist = BoxList(npboxes)
-        # This field name actually needs to be 'classes' to be able to use
-        # certain utility functions in the TF Object Detection API.
-        self.boxlist.add_field('classes', class_ids)
-        # We need to ensure that there is always a scores field so that the
-        # concatenate method will work with empty labels objects.
+        npboxes = np.asarray(npboxes, dtype=np.float32).reshape(-1, 4)
+        class_ids = np.asarray(class_ids).astype(np.int32).reshape(-1)
+        # Always store scores so that labels with and without scores can be
+        # concatenated.
         if scores is None:
             scores = np.ones(class_ids.shape)
-        self.boxlist.add_field('scores', scores)
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        if not len(npboxes) == len(class_ids) == len(scores):
+            raise ValueError(
+                'npboxes, class_ids and scores must have the same length.')
+
+        self.npboxes = npboxes
+        self.class_ids = class_ids
+        self.scores = scores
+        self.index = None
+
+    def build_index(self, cell_size=None):
+        """Build a spatial index of the boxes to speed up get_overlapping.
+
+        This is worth it when the labels are queried with many windows, eg.
+        for all the labels of a scene.
+
+        Args:
+            cell_size: size of the cells of the index (see box_ops.BoxIndex)
+        """
+        self.index = box_ops.BoxIndex(self.npboxes, cell_size=cell_size)
 
     def __add__(self, other):
         return ObjectDetectionLabels.concatenate(self, other)
@@ -49,24 +65,24 @@ class ObjectDetectionLabels(Labels):
                                       expected_labels.get_scores())
 
     def filter_by_aoi(self, aoi_polygons):
-        boxes = self.get_boxes()
-        class_ids = self.get_class_ids()
-        scores = self.get_scores()
-
-        new_boxes = []
-        new_class_ids = []
-        new_scores = []
-        for box, class_id, score in zip(boxes, class_ids, scores):
+        inds = []
+        for ind, box in enumerate(self.get_boxes()):
             box_poly = box.to_shapely()
             for aoi in aoi_polygons:
                 if box_poly.within(aoi):
-                    new_boxes.append(box)
-                    new_class_ids.append(class_id)
-                    new_scores.append(score)
+                    inds.append(ind)
                     break
 
-        return ObjectDetectionLabels(
-            np.array(new_boxes), np.array(new_class_ids), np.array(new_scores))
+        return self.get_subset(np.array(inds, dtype=np.int64))
+
+    def get_subset(self, inds):
+        """Return the labels at some indices.
+
+        Args:
+            inds: array of indices or boolean mask
+        """
+        return ObjectDetectionLabels(self.npboxes[inds], self.class_ids[inds],
+                                     self.scores[inds])
 
     @staticmethod
     def make_empty():
@@ -77,7 +93,7 @@ class ObjectDetectionLabels(Labels):
 
     @staticmethod
     def from_boxlist(boxlist):
-        """Make ObjectDetectionLabels from BoxList object."""
+        """Make ObjectDetectionLabels from a TF Object Detection BoxList."""
         scores = (boxlist.get_field('scores')
                   if boxlist.has_field('scores') else None)
         return ObjectDetectionLabels(
@@ -85,27 +101,32 @@ class ObjectDetectionLabels(Labels):
 
     def get_boxes(self):
         """Return list of Boxes."""
-        return [Box.from_npbox(npbox) for npbox in self.boxlist.get()]
+        return [Box.from_npbox(npbox) for npbox in self.npboxes.tolist()]
 
     def get_npboxes(self):
-        return self.boxlist.get()
+        return self.npboxes
 
     def get_scores(self):
-        if self.boxlist.has_field('scores'):
-            return self.boxlist.get_field('scores')
-        return None
+        return self.scores
 
     def get_class_ids(self):
-        return self.boxlist.get_field('classes')
+        return self.class_ids
 
     def __len__(self):
-        return self.boxlist.get().shape[0]
+        return self.npboxes.shape[0]
 
     def __str__(self):
-        return str(self.boxlist.get())
+        return str(self.npboxes)
 
     def to_boxlist(self):
-        return self.boxlist
+        """Return a TF Object Detection BoxList with the labels."""
+        # Lazily load TF Object Detection
+        from object_detection.utils.np_box_list import BoxList
+
+        boxlist = BoxList(self.npboxes)
+        boxlist.add_field('classes', self.class_ids)
+        boxlist.add_field('scores', self.scores)
+        return boxlist
 
     def to_dict(self):
         """Returns a dict version of these labels.
@@ -114,9 +135,9 @@ class ObjectDetectionLabels(Labels):
         as the values.
         """
         d = {}
-        boxes = list(map(Box.from_npbox, self.get_npboxes()))
-        classes = list(self.get_class_ids())
-        scores = list(self.get_scores())
+        boxes = self.get_boxes()
+        classes = self.class_ids.tolist()
+        scores = self.scores.tolist()
         for box, class_id, score in zip(boxes, classes, scores):
             d[box.tuple_format()] = (class_id, score)
         return d
@@ -176,19 +197,19 @@ class ObjectDetectionLabels(Labels):
                 overlapping
             clip: if True, clip label boxes to the window
         """
-        # Lazily load TF Object Detection
-        from object_detection.utils.np_box_list import BoxList
-        from object_detection.utils.np_box_list_ops import (
-            prune_non_overlapping_boxes, clip_to_window)
-
         window_npbox = window.npbox_format()
-        window_boxlist = BoxList(np.expand_dims(window_npbox, axis=0))
-        boxlist = prune_non_overlapping_boxes(
-            labels.boxlist, window_boxlist, minoverlap=ioa_thresh)
+        # Boxes outside the window have an IOA of 0, so only the boxes that
+        # intersect it need to be considered.
+        if labels.index is not None and ioa_thresh > 0:
+            labels = labels.get_subset(labels.index.query(window_npbox))
+        ioas = box_ops.get_ioas(window_npbox[np.newaxis, :], labels.npboxes)[0]
+        labels = labels.get_subset(ioas >= ioa_thresh)
         if clip:
-            boxlist = clip_to_window(boxlist, window_npbox)
-
-        return ObjectDetectionLabels.from_boxlist(boxlist)
+            npboxes, inds = box_ops.clip_to_window(labels.npboxes,
+                                                   window_npbox)
+            labels = ObjectDetectionLabels(npboxes, labels.class_ids[inds],
+                                           labels.scores[inds])
+        return labels
 
     @staticmethod
     def concatenate(labels1, labels2):
@@ -198,10 +219,21 @@ class ObjectDetectionLabels(Labels):
             labels1: ObjectDetectionLabels
             labels2: ObjectDetectionLabels
         """
-        from object_detection.utils.np_box_list_ops import concatenate
+        return ObjectDetectionLabels.concatenate_all([labels1, labels2])
+
+    @classmethod
+    def concatenate_all(cls, labels_list):
+        """Return concatenation of a non-empty list of labels.
+
+        The arrays of all the labels are concatenated at once.
 
-        new_boxlist = concatenate([labels1.to_boxlist(), labels2.to_boxlist()])
-        return ObjectDetectionLabels.from_boxlist(new_boxlist)
+        Args:
+            labels_list: list of ObjectDetectionLabels
+        """
+        return ObjectDetectionLabels(
+            np.concatenate([labels.npboxes for labels in labels_list]),
+            np.concatenate([labels.class_ids for labels in labels_list]),
+            np.concatenate([labels.scores for labels in labels_list]))
 
     @staticmethod
     def prune_duplicates(labels, score_thresh, merge_thresh):
@@ -219,12 +251,9 @@ class ObjectDetectionLabels(Labels):
         Returns:
             ObjectDetectionLabels
         """
-        from object_detection.utils.np_box_list_ops import non_max_suppression
-
-        max_output_size = 1000000
-        pruned_boxlist = non_max_suppression(
-            labels.boxlist,
-            max_output_size=max_output_size,
-            iou_threshold=merge_thresh,
-            score_threshold=score_thresh)
-        return ObjectDetectionLabels.from_boxlist(pruned_boxlist)
+        inds = box_ops.non_max_suppression(
+            labels.npboxes,
+            labels.scores,
+            iou_thresh=merge_thresh,
+            score_thresh=score_thresh)
+        return labels.get_subset(inds)
@@ -3,35 +3,127 @@ from rastervision.core.box import Box
 
 import numpy as np
 from rasterio.features import rasterize
+from rasterio.transform import Affine
+
+# Size of the square tiles that SemanticSegmentationLabels are stored in.
+TILE_SIZE = 512
 
 
 class SemanticSegmentationLabels(Labels):
     """A set of spatially referenced labels.
+
+    The class ids of the pixels are stored as uint8 arrays in the square
+    tiles of a regular grid, and a tile is only allocated once labels are set
+    within it. Pixels that have not been set have the class id 0 (ie. don't
+    care). Labels are set and read by window, and AOI filtering, clipping and
+    evaluation go through the tiles one at a time, so the labels of a large
+    scene never need to be held in a single dense array.
     """
 
-    def __init__(self, label_pairs=None):
+    def __init__(self, label_pairs=None, tile_size=TILE_SIZE):
         """Constructor
 
         Args:
             label_pairs: list of (window, label_array) where window is Box and
                 label_array is numpy array of shape [height, width] and each value
                 is a class_id
+            tile_size: (int) size of the tiles the labels are stored in
         """
+        self.tile_size = tile_size
+        # Map from (row, col) of a tile to its [tile_size, tile_size] array.
+        self.tiles = {}
+        # Masks of the pixels that were set in the tiles that were only partly
+        # set, so that adding labels does not overwrite pixels with zeros.
+        self.masks = {}
+        self.ymax = 0
+        self.xmax = 0
 
-        self.label_pairs = []
         if label_pairs is not None:
-            self.label_pairs = label_pairs
+            for window, label_array in label_pairs:
+                self.add_label_pair(window, label_array)
 
     def __eq__(self, other):
-        return (isinstance(other, SemanticSegmentationLabels)
-                and np.array_equal(self.to_array(), other.to_array()))
+        if not (isinstance(other, SemanticSegmentationLabels)
+                and self.get_extent() == other.get_extent()):
+            return False
+        # Pixels outside the tiles of both labels are 0.
+        for labels, other_labels in [(self, other), (other, self)]:
+            for window, label_array in labels.get_tiles():
+                if not np.array_equal(label_array, other_labels.get(window)):
+                    return False
+        return True
 
     def __add__(self, other):
         """Add labels to these labels.
 
         Returns a concatenation of this and the other labels.
         """
-        return SemanticSegmentationLabels(self.label_pairs + other.label_pairs)
+        return SemanticSegmentationLabels.concatenate_all([self, other])
+
+    @classmethod
+    def concatenate_all(cls, labels_list):
+        result = SemanticSegmentationLabels(tile_size=labels_list[0].tile_size)
+        for labels in labels_list:
+            result.update(labels)
+        return result
+
+    def update(self, labels):
+        """Set the pixels that were set in other labels.
+
+        Args:
+            labels: SemanticSegmentationLabels with the same tile_size
+        """
+        if labels.tile_size != self.tile_size:
+            raise ValueError('Labels must have the same tile_size.')
+
+        for key, tile in labels.tiles.items():
+            mask = labels.masks.get(key)
+            if mask is None or key not in self.tiles:
+                self.tiles[key] = tile.copy()
+                self.masks.pop(key, None)
+                if mask is not None:
+                    self.masks[key] = mask.copy()
+            else:
+                self.tiles[key][mask] = tile[mask]
+                self._set_mask(key, mask)
+        self.ymax = max(self.ymax, labels.ymax)
+        self.xmax = max(self.xmax, labels.xmax)
+
+    def _set_mask(self, key, slices):
+        """Mark pixels of a partly set tile as set."""
+        mask = self.masks.get(key)
+        if mask is not None:
+            mask[slices] = True
+            if mask.all():
+                del self.masks[key]
+
+    def _get_tile_window(self, key):
+        row, col = key
+        return Box.make_square(row * self.tile_size, col * self.tile_size,
+                               self.tile_size)
+
+    def _get_tile_slices(self, window):
+        """Yield the tiles overlapping a window.
+
+        Yields:
+            (key, tile_slices, window_slices) where key is the (row, col) of
+            the tile, and tile_slices and window_slices are the slices of the
+            overlap in the tile and in the window
+        """
+        size = self.tile_size
+        for row in range(window.ymin // size, -(-window.ymax // size)):
+            for col in range(window.xmin // size, -(-window.xmax // size)):
+                tile_window = self._get_tile_window((row, col))
+                overlap = tile_window.intersection(window)
+                tile_slices = (slice(overlap.ymin - tile_window.ymin,
+                                     overlap.ymax - tile_window.ymin),
+                               slice(overlap.xmin - tile_window.xmin,
+                                     overlap.xmax - tile_window.xmin))
+                window_slices = (slice(overlap.ymin - window.ymin,
+                                       overlap.ymax - window.ymin),
+                                 slice(overlap.xmin - window.xmin,
+                                       overlap.xmax - window.xmin))
+                yield (row, col), tile_slices, window_slices
 
     def filter_by_aoi(self, aoi_polygons):
         """Returns a copy of these labels filtered by a given set of AOI polygons
@@ -41,30 +133,79 @@ class SemanticSegmentationLabels(Labels):
         Args:
           aoi_polygons - A list of AOI polygons to filter by, in pixel coordinates.
         """
-        arr = self.to_array()
-        mask = rasterize(
-            [(p, 1) for p in aoi_polygons], out_shape=arr.shape, fill=0)
-        arr = arr * mask
-        return SemanticSegmentationLabels.from_array(arr)
+        result = SemanticSegmentationLabels(tile_size=self.tile_size)
+        for window, label_array in self.get_tiles():
+            window_polygon = window.to_shapely()
+            shapes = [(p, 1) for p in aoi_polygons
+                      if p.intersects(window_polygon)]
+            if shapes:
+                mask = rasterize(
+                    shapes,
+                    out_shape=label_array.shape,
+                    fill=0,
+                    transform=Affine.translation(window.xmin, window.ymin),
+                    dtype=np.uint8)
+                result.add_label_pair(window, label_array * mask)
+        result.ymax = self.ymax
+        result.xmax = self.xmax
+        return result
 
     def add_label_pair(self, window, label_array):
-        self.label_pairs.append((window, label_array))
+        """Set the labels of a window.
+
+        Args:
+            window: Box with non-negative coordinates
+            label_array: numpy array of shape [height, width] with the class
+                ids of the window, which are stored as uint8
+        """
+        for key, tile_slices, window_slices in self._get_tile_slices(window):
+            tile = self.tiles.get(key)
+            if tile is None:
+                tile = np.zeros(
+                    (self.tile_size, self.tile_size), dtype=np.uint8)
+                self.tiles[key] = tile
+                self.masks[key] = np.zeros(tile.shape, dtype=bool)
+            tile[tile_slices] = label_array[window_slices]
+            self._set_mask(key, tile_slices)
+        self.ymax = max(self.ymax, window.ymax)
+        self.xmax = max(self.xmax, window.xmax)
+
+    def get(self, window):
+        """Return the labels of a window.
+
+        Args:
+            window: Box
+
+        Returns:
+            uint8 numpy array of shape [height, width]
+        """
+        label_array = np.zeros(
+            (window.get_height(), window.get_width()), dtype=np.uint8)
+        for key, tile_slices, window_slices in self._get_tile_slices(window):
+            tile = self.tiles.get(key)
+            if tile is not None:
+                label_array[window_slices] = tile[tile_slices]
+        return label_array
+
+    def get_tiles(self):
+        """Yield (window, label_array) for each tile in row-major order.
+
+        The tiles are clipped to the extent of the labels, and label_array is
+        a view of the tile.
+        """
+        for key in sorted(self.tiles):
+            window = self._get_tile_window(key).intersection(self.get_extent())
+            height, width = window.get_height(), window.get_width()
+            yield window, self.tiles[key][:height, :width]
 
     def get_label_pairs(self):
-        return self.label_pairs
+        return list(self.get_tiles())
 
     def get_extent(self):
-        windows = list(map(lambda pair: pair[0], self.get_label_pairs()))
-        xmax = max(map(lambda w: w.xmax, windows))
-        ymax = max(map(lambda w: w.ymax, windows))
-        return Box(0, 0, ymax, xmax)
+        return Box(0, 0, self.ymax, self.xmax)
 
     def to_array(self):
-        extent = self.get_extent()
-        arr = np.zeros((extent.ymax, extent.ymax))
-        for window, label_array in self.label_pairs:
-            arr[window.ymin:window.ymax, window.xmin:window.xmax] = label_array
-        return arr
+        return self.get(self.get_extent())
 
     @staticmethod
     def from_array(arr):
@@ -72,14 +213,29 @@ class SemanticSegmentationLabels(Labels):
         label_pair = (window, arr)
         return SemanticSegmentationLabels([label_pair])
 
+    @staticmethod
+    def get_tile_windows(extent, tile_size=TILE_SIZE):
+        """Return windows covering an extent to read labels a tile at a time.
+
+        The windows are clipped to the extent.
+        """
+        return [
+            window.intersection(extent)
+            for window in extent.get_windows(tile_size, tile_size)
+        ]
+
     def get_clipped_labels(self, extent):
-        clipped_labels = SemanticSegmentationLabels()
+        clipped_labels = SemanticSegmentationLabels(tile_size=self.tile_size)
 
-        for window, label_array in self.get_label_pairs():
+        for window, label_array in self.get_tiles():
             clipped_window = window.intersection(extent)
-            clipped_label_array = label_array[0:(
-                clipped_window.ymax - clipped_window.ymin), 0:(
-                    clipped_window.xmax - clipped_window.xmin)]
-            clipped_labels.add_label_pair(clipped_window, clipped_label_array)
+            height = clipped_window.get_height()
+            width = clipped_window.get_width()
+            if height > 0 and width > 0:
+                ymin = clipped_window.ymin - window.ymin
+                xmin = clipped_window.xmin - window.xmin
+                clipped_labels.add_label_pair(
+                    clipped_window,
+                    label_array[ymin:ymin + height, xmin:xmin + width])
 
         return clipped_labels
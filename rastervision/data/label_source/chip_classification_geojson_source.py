@@ -1,8 +1,10 @@
 import numpy as np
-from shapely.strtree import STRtree
 from shapely import geometry
+from shapely.prepared import prep
 
+from rastervision.core.box import Box
 from rastervision.data import ChipClassificationLabels
+from rastervision.data.label.chip_classification_labels import NO_CLASS_ID
 from rastervision.data.label_source import LabelSource
 from rastervision.data.label_source.utils import (
     add_classes_to_geojson, load_label_store_json,
@@ -10,6 +12,59 @@ from rastervision.data.label_source.utils import (
 from rastervision.data.utils import geojson_to_shapes
 
 
+def _pick_class_ids(nb_cells, cell_inds, shape_inds, intersection_areas,
+                    cell_area, shapes, ioa_thresh, use_intersection_over_cell,
+                    background_class_id, pick_min_class_id):
+    """Infer the class_id of cells from the polygons intersecting them.
+
+    Args:
+        nb_cells: (int) number of cells
+        cell_inds: int numpy array with the cell of each pair of a cell and a
+            polygon whose bounds intersect
+        shape_inds: int numpy array with the index in shapes of the polygon of
+            each pair
+        intersection_areas: numpy array with the area of the intersection of
+            the cell and polygon of each pair
+        cell_area: (float) the area of a cell
+
+    See infer_cell for the other args.
+
+    Returns:
+        int numpy array with the class_id of each cell, or NO_CLASS_ID
+    """
+    class_ids = np.array([class_id for _, class_id in shapes], dtype=np.int64)
+    polygon_areas = np.array([shape.area for shape, _ in shapes])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        intersection_over_cells = intersection_areas / cell_area
+        intersection_over_polygons = (
+            intersection_areas / polygon_areas[shape_inds])
+
+    # Find polygons whose intersection with the cell is big enough.
+    if use_intersection_over_cell:
+        enough_intersection = intersection_over_cells >= ioa_thresh
+    else:
+        enough_intersection = intersection_over_polygons >= ioa_thresh
+    cell_inds = cell_inds[enough_intersection]
+    shape_inds = shape_inds[enough_intersection]
+    intersection_over_cells = intersection_over_cells[enough_intersection]
+
+    if background_class_id is None or background_class_id == 0:
+        background_class_id = NO_CLASS_ID
+    cell_class_ids = np.full(nb_cells, background_class_id, dtype=np.int64)
+
+    # Sort the candidates of each cell so that the one picked comes first.
+    if pick_min_class_id:
+        order = np.lexsort((class_ids[shape_inds], cell_inds))
+    else:
+        # Pick class_id of the polygon with the biggest intersection over
+        # cell. If there is a tie, pick the first.
+        order = np.lexsort((shape_inds, -intersection_over_cells, cell_inds))
+    picked_cell_inds, first_inds = np.unique(
+        cell_inds[order], return_index=True)
+    cell_class_ids[picked_cell_inds] = class_ids[shape_inds[order][first_inds]]
+    return cell_class_ids
+
+
 def infer_cell(shapes, cell, ioa_thresh, use_intersection_over_cell,
                background_class_id, pick_min_class_id):
     """Infer the class_id of a cell given a set of polygons.
@@ -21,6 +76,8 @@ def infer_cell(shapes, cell, ioa_thresh, use_intersection_over_cell,
     setting the class_id. If there are none in the running, the cell is either
     considered null or background. See args for more details.
 
+    Use infer_grid to infer the class_ids of a whole grid of cells at once.
+
     Args:
         shapes: List of (shapely.geometry, class_id) tuples
         cell: Box
@@ -35,51 +92,100 @@ def infer_cell(shapes, cell, ioa_thresh, use_intersection_over_cell,
             which is considered a null value.
         pick_min_class_id: If true, the class_id for a cell is the minimum
             class_id of the boxes in that cell. Otherwise, pick the class_id of
-            the box covering the greatest area.
+            the box covering the greatest area. If there is a tie, pick the
+            first box in shapes.
     """
-    str_tree = STRtree([shape for shape, class_id in shapes])
-    # Monkey-patching class_id onto shapely.geom is not a good idea because
-    # if you transform it, the class_id will be lost, but this works here. I wanted to
-    # use a dictionary to associate shape with class_id, but couldn't because they are
-    # mutable.
-    for shape, class_id in shapes:
-        shape.class_id = class_id
-
-    cell_geom = geometry.Polygon(
-        [(p[0], p[1]) for p in cell.geojson_coordinates()])
-    intersecting_polygons = str_tree.query(cell_geom)
-
-    intersection_over_cells = []
-    intersection_over_polygons = []
-    class_ids = []
+    cell_geom = cell.to_shapely()
+    xmin, ymin, xmax, ymax = cell_geom.bounds
+    shape_inds = np.array(
+        [
+            shape_ind for shape_ind, (shape, _) in enumerate(shapes)
+            if (shape.bounds[0] <= xmax and shape.bounds[1] <= ymax
+                and shape.bounds[2] >= xmin and shape.bounds[3] >= ymin)
+        ],
+        dtype=np.int64)
+    intersection_areas = np.array(
+        [shapes[i][0].intersection(cell_geom).area for i in shape_inds])
+
+    class_id = _pick_class_ids(1, np.zeros(len(shape_inds), dtype=np.int64),
+                               shape_inds, intersection_areas, cell_geom.area,
+                               shapes, ioa_thresh, use_intersection_over_cell,
+                               background_class_id, pick_min_class_id)[0]
+    return None if class_id == NO_CLASS_ID else int(class_id)
+
+
+def infer_grid(shapes, extent, cell_size, ioa_thresh,
+               use_intersection_over_cell, background_class_id,
+               pick_min_class_id):
+    """Infer ChipClassificationLabels for a grid of cells given polygons.
+
+    The cells are those of extent.get_windows(cell_size, cell_size), and the
+    class_id of each is the one that infer_cell would infer. Instead of
+    querying the polygons intersecting each cell, the cells intersecting each
+    polygon are found from its bounds, so cells away from all polygons are
+    never visited, and cells that lie within a polygon are found with a
+    prepared geometry without computing their intersection.
 
-    # Find polygons whose intersection with the cell is big enough.
-    for polygon in intersecting_polygons:
-        intersection = polygon.intersection(cell_geom)
-        intersection_over_cell = intersection.area / cell_geom.area
-        intersection_over_polygon = intersection.area / polygon.area
-
-        if use_intersection_over_cell:
-            enough_intersection = intersection_over_cell >= ioa_thresh
-        else:
-            enough_intersection = intersection_over_polygon >= ioa_thresh
-
-        if enough_intersection:
-            intersection_over_cells.append(intersection_over_cell)
-            intersection_over_polygons.append(intersection_over_polygon)
-            class_ids.append(polygon.class_id)
-
-    # Infer class id for cell.
-    if len(class_ids) == 0:
-        class_id = (None if background_class_id == 0 else background_class_id)
-    elif pick_min_class_id:
-        class_id = min(class_ids)
-    else:
-        # Pick class_id of the polygon with the biggest intersection over
-        # cell. If there is a tie, pick the first.
-        class_id = class_ids[np.argmax(intersection_over_cells)]
+    Args:
+        shapes: List of (shapely.geometry, class_id) tuples
+        extent: Box representing the bounds of the grid
+        cell_size: (int) the size of the cells
+
+    See infer_cell for the other args.
 
-    return class_id
+    Returns:
+        ChipClassificationLabels
+    """
+    nb_rows = len(range(0, extent.get_height(), cell_size))
+    nb_cols = len(range(0, extent.get_width(), cell_size))
+    cell_area = cell_size * cell_size
+
+    cell_inds = []
+    shape_inds = []
+    intersection_areas = []
+    for shape_ind, (shape, _) in enumerate(shapes):
+        xmin, ymin, xmax, ymax = shape.bounds
+        # Cells that touch the bounds are included, like with an STRtree.
+        rows = range(
+            max(int(np.ceil(ymin / cell_size)) - 1, 0),
+            min(int(np.floor(ymax / cell_size)), nb_rows - 1) + 1)
+        cols = range(
+            max(int(np.ceil(xmin / cell_size)) - 1, 0),
+            min(int(np.floor(xmax / cell_size)), nb_cols - 1) + 1)
+        if len(rows) == 0 or len(cols) == 0:
+            continue
+
+        prepared_shape = prep(shape)
+        for row in rows:
+            for col in cols:
+                cell_geom = Box.make_square(row * cell_size, col * cell_size,
+                                            cell_size).to_shapely()
+                if prepared_shape.contains(cell_geom):
+                    intersection_area = cell_area
+                elif prepared_shape.intersects(cell_geom):
+                    intersection_area = shape.intersection(cell_geom).area
+                else:
+                    intersection_area = 0.0
+                cell_inds.append(row * nb_cols + col)
+                shape_inds.append(shape_ind)
+                intersection_areas.append(intersection_area)
+
+    class_ids = _pick_class_ids(nb_rows * nb_cols,
+                                np.array(cell_inds, dtype=np.int64),
+                                np.array(shape_inds, dtype=np.int64),
+                                np.array(intersection_areas,
+                                         dtype=np.float64), cell_area, shapes,
+                                ioa_thresh, use_intersection_over_cell,
+                                background_class_id, pick_min_class_id)
+
+    rows, cols = np.meshgrid(
+        np.arange(nb_rows) * cell_size,
+        np.arange(nb_cols) * cell_size,
+        indexing='ij')
+    ymins, xmins = rows.reshape(-1), cols.reshape(-1)
+    npboxes = np.stack(
+        [ymins, xmins, ymins + cell_size, xmins + cell_size], axis=1)
+    return ChipClassificationLabels(npboxes, class_ids)
 
 
 def infer_labels(geojson, crs_transformer, extent, cell_size, ioa_thresh,
@@ -104,15 +210,9 @@ def infer_labels(geojson, crs_transformer, extent, cell_size, ioa_thresh,
     # TODO: handle linestrings
     shapes = [(shape, class_id) for shape, class_id in shapes
               if type(shape) in [geometry.Polygon, geometry.MultiPolygon]]
-    labels = ChipClassificationLabels()
-
-    cells = extent.get_windows(cell_size, cell_size)
-    for cell in cells:
-        class_id = infer_cell(shapes, cell, ioa_thresh,
-                              use_intersection_over_cell, background_class_id,
-                              pick_min_class_id)
-        labels.set_cell(cell, class_id)
-    return labels
+    return infer_grid(shapes, extent, cell_size, ioa_thresh,
+                      use_intersection_over_cell, background_class_id,
+                      pick_min_class_id)
 
 
 def read_labels(geojson, crs_transformer, extent=None):
@@ -24,6 +24,8 @@ class ObjectDetectionGeoJSONSource(LabelSource):
             geojson = add_classes_to_geojson(json_dict, class_map)
             self.labels = geojson_to_object_detection_labels(
                 geojson, crs_transformer, extent=extent)
+        # Index the boxes once, since the labels are queried for each window.
+        self.labels.build_index()
 
     def get_labels(self, window=None):
         if window is None:
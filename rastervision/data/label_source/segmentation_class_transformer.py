@@ -1,62 +1,82 @@
 import numpy as np
 
-from rastervision.data.label_source.utils import (
-    color_to_triple, color_to_integer, rgb_to_int_array)
+from rastervision.data.label_source.utils import (color_to_triple,
+                                                  rgb_to_int_array)
 
 
 class SegmentationClassTransformer():
+    """Converts between RGB label images and class ids.
+
+    Both directions use lookup arrays built from the class map, so converting
+    an image costs a few numpy operations rather than a Python call per
+    pixel. Colors are packed into integers and matched against the sorted
+    packed colors of the classes with np.searchsorted, and class ids index a
+    palette with the color of each class.
+    """
+
     def __init__(self, class_map):
-        color_to_class = dict(
-            [(item.color, item.id) for item in class_map.get_items()])
-
-        # color int to class
-        color_int_to_class = dict(
-            zip([color_to_integer(c) for c in color_to_class.keys()],
-                color_to_class.values()))
-
-        def color_int_to_class_fn(color: int) -> int:
-            # Convert unspecified colors to class 0 which is "don't care"
-            return color_int_to_class.get(color, 0x00)
-
-        self.transform_color_int_to_class = \
-            np.vectorize(color_int_to_class_fn, otypes=[np.uint8])
-
-        # class to color triple
-        class_to_color_triple = dict(
-            zip(color_to_class.values(),
-                [color_to_triple(c) for c in color_to_class.keys()]))
-
-        def class_to_channel_color(channel: int, class_id: int) -> int:
-            """Given a channel (red, green, or blue) and a class, return the
-            intensity of that channel.
-
-            Args:
-                 channel: An integer with value 0, 1, or 2
-                      representing the channel.
-                 class_id: The class id represented as an integer.
-            Returns:
-                 The intensity of the channel for the color associated
-                      with the given class.
-            """
-            default_triple = (0x00, 0x00, 0x00)
-            return class_to_color_triple.get(class_id, default_triple)[channel]
-
-        class_to_r = np.vectorize(
-            lambda c: class_to_channel_color(0, c), otypes=[np.uint8])
-        class_to_g = np.vectorize(
-            lambda c: class_to_channel_color(1, c), otypes=[np.uint8])
-        class_to_b = np.vectorize(
-            lambda c: class_to_channel_color(2, c), otypes=[np.uint8])
-        self.transform_class_to_color = [class_to_r, class_to_g, class_to_b]
+        color_int_to_class = {}
+        class_to_color_triple = {}
+        for item in class_map.get_items():
+            # Compute the triple once since colors that are None are random.
+            color_triple = color_to_triple(item.color)
+            r, g, b = color_triple
+            color_int = (r << 16) + (g << 8) + b
+            color_int_to_class[color_int] = item.id
+            class_to_color_triple[item.id] = color_triple
+
+        # Sorted packed colors and the class id of each.
+        self.color_ints = np.array(sorted(color_int_to_class), dtype=np.uint32)
+        self.color_class_ids = np.array(
+            [color_int_to_class[c] for c in self.color_ints.tolist()],
+            dtype=np.uint8)
+
+        # Color of each class id, which is black for unspecified class ids.
+        # There is an entry for each uint8 value so that uint8 class ids can
+        # index the palette directly.
+        nb_entries = max([255] + list(class_to_color_triple)) + 1
+        self.palette = np.zeros((nb_entries, 3), dtype=np.uint8)
+        self.is_class_id = np.zeros(nb_entries, dtype=bool)
+        for class_id, color_triple in class_to_color_triple.items():
+            self.palette[class_id] = color_triple
+            self.is_class_id[class_id] = True
+        self.is_colored = self.palette.any(axis=1)
+
+    def _get_palette_inds(self, class_labels):
+        """Return class ids with those outside of the palette set to 0."""
+        class_labels = np.asarray(class_labels)
+        if class_labels.dtype == np.uint8:
+            return class_labels
+        is_valid = (class_labels >= 0) & (class_labels < len(self.palette))
+        return np.where(is_valid, class_labels, 0).astype(np.int64)
 
     def rgb_to_class(self, rgb_labels):
+        """Convert a [height, width, 3] RGB array to uint8 class ids.
+
+        Unspecified colors are converted to class 0 which is "don't care".
+        """
         color_int_labels = rgb_to_int_array(rgb_labels)
-        class_labels = self.transform_color_int_to_class(color_int_labels)
-        return class_labels.astype(np.uint8)
+        if len(self.color_ints) == 0:
+            return np.zeros(color_int_labels.shape, dtype=np.uint8)
+        inds = np.searchsorted(self.color_ints, color_int_labels)
+        np.minimum(inds, len(self.color_ints) - 1, out=inds)
+        is_match = self.color_ints[inds] == color_int_labels
+        return np.where(is_match, self.color_class_ids[inds],
+                        0).astype(np.uint8)
 
     def class_to_rgb(self, class_labels):
-        rgb_labels = np.empty(class_labels.shape + (3, ))
-        for chan in range(3):
-            class_to_channel_color = self.transform_class_to_color[chan]
-            rgb_labels[:, :, chan] = class_to_channel_color(class_labels)
-        return rgb_labels.astype(np.uint8)
+        """Convert class ids to a [height, width, 3] uint8 RGB array."""
+        return self.palette[self._get_palette_inds(class_labels)]
+
+    def filter_class_ids(self, class_labels):
+        """Set the class ids that are not in the class map to 0.
+
+        Returns:
+            uint8 numpy array of the same shape as class_labels
+        """
+        inds = self._get_palette_inds(class_labels)
+        return np.where(self.is_class_id[inds], inds, 0).astype(np.uint8)
+
+    def has_color(self, class_labels):
+        """Return a mask of the class ids with a color other than black."""
+        return self.is_colored[self._get_palette_inds(class_labels)]
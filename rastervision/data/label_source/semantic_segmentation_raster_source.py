@@ -62,7 +62,8 @@ class SemanticSegmentationRasterSource(ActivateMixin, LabelSource):
         """Get labels from a window.
 
         If window is not None then a label window is clipped from
-        the source. If window is None then assume window is full extent.
+        the source. If window is None then assume window is full extent,
+        which is read a tile at a time.
 
         Args:
              window: Either None or a window given as a Box object.
@@ -70,16 +71,21 @@ class SemanticSegmentationRasterSource(ActivateMixin, LabelSource):
              SemanticSegmentationLabels covering window
         """
         if window is None:
-            raw_labels = self.source.get_raw_image_array()
-        else:
-            raw_labels = self.source.get_raw_chip(window)
+            labels = SemanticSegmentationLabels()
+            for tile_window in SemanticSegmentationLabels.get_tile_windows(
+                    self.source.get_extent()):
+                labels.add_label_pair(tile_window,
+                                      self._get_class_labels(tile_window))
+            return labels
 
-        if self.class_transformer is not None:
-            labels = self.class_transformer.rgb_to_class(raw_labels)
-        else:
-            labels = np.squeeze(raw_labels)
+        return SemanticSegmentationLabels.from_array(
+            self._get_class_labels(window))
 
-        return SemanticSegmentationLabels.from_array(labels)
+    def _get_class_labels(self, window):
+        raw_labels = self.source.get_raw_chip(window)
+        if self.class_transformer is not None:
+            return self.class_transformer.rgb_to_class(raw_labels)
+        return raw_labels[:, :, 0]
 
     def _subcomponents_to_activate(self):
         return [self.source]
@@ -7,6 +7,7 @@ from PIL import ImageColor
 
 from rastervision.core.box import Box
 from rastervision.data import (ChipClassificationLabels, ObjectDetectionLabels)
+from rastervision.data.utils import map_to_pixel_bounds
 from rastervision.utils.files import file_to_str
 
 
@@ -65,36 +66,31 @@ def geojson_to_object_detection_labels(geojson_dict,
     Returns:
         ObjectDetectionLabels
     """
-    features = geojson_dict['features']
-    boxes = []
+    # Gather the polygons of all the features to transform them at once.
+    polygons = []
     class_ids = []
     scores = []
-
-    def polygon_to_label(polygon, crs_transformer):
-        polygon = [crs_transformer.map_to_pixel(p) for p in polygon]
-        xmin, ymin = np.min(polygon, axis=0)
-        xmax, ymax = np.max(polygon, axis=0)
-        boxes.append(Box(ymin, xmin, ymax, xmax))
-
-        properties = feature['properties']
-        class_ids.append(properties['class_id'])
-        scores.append(properties.get('score', 1.0))
-
-    for feature in features:
+    for feature in geojson_dict['features']:
         geom_type = feature['geometry']['type']
         coordinates = feature['geometry']['coordinates']
         if geom_type == 'MultiPolygon':
-            for polygon in coordinates:
-                polygon_to_label(polygon[0], crs_transformer)
+            feature_polygons = [polygon[0] for polygon in coordinates]
         elif geom_type == 'Polygon':
-            polygon_to_label(coordinates[0], crs_transformer)
+            feature_polygons = [coordinates[0]]
         else:
             raise Exception(
                 'Geometries of type {} are not supported in object detection \
                 labels.'.format(geom_type))
 
-    if len(boxes):
-        boxes = np.array([box.npbox_format() for box in boxes], dtype=float)
+        properties = feature['properties']
+        polygons.extend(feature_polygons)
+        class_ids.extend([properties['class_id']] * len(feature_polygons))
+        scores.extend([properties.get('score', 1.0)] * len(feature_polygons))
+
+    if len(polygons):
+        xmins, ymins, xmaxs, ymaxs = map_to_pixel_bounds(
+            polygons, crs_transformer).T
+        boxes = np.stack([ymins, xmins, ymaxs, xmaxs], axis=1).astype(float)
         class_ids = np.array(class_ids)
         scores = np.array(scores)
         labels = ObjectDetectionLabels(boxes, class_ids, scores=scores)
@@ -123,38 +119,36 @@ def geojson_to_chip_classification_labels(geojson_dict,
     Returns:
        ChipClassificationLabels
     """
-    features = geojson_dict['features']
-
-    labels = ChipClassificationLabels()
-
-    extent_shape = None
-    if extent:
-        extent_shape = extent.to_shapely()
-
-    def polygon_to_label(polygon, crs_transformer):
-        polygon = [crs_transformer.map_to_pixel(p) for p in polygon]
-        xmin, ymin = np.min(polygon, axis=0)
-        xmax, ymax = np.max(polygon, axis=0)
-        cell = Box(ymin, xmin, ymax, xmax)
-
-        if extent_shape and not cell.to_shapely().intersects(extent_shape):
-            return
-
-        properties = feature['properties']
-        class_id = properties['class_id']
-        scores = properties.get('scores')
-
-        labels.set_cell(cell, class_id, scores)
-
-    for feature in features:
+    # Gather the polygons of all the features to transform them at once.
+    polygons = []
+    properties_list = []
+    for feature in geojson_dict['features']:
         geom_type = feature['geometry']['type']
         coordinates = feature['geometry']['coordinates']
         if geom_type == 'Polygon':
-            polygon_to_label(coordinates[0], crs_transformer)
+            polygons.append(coordinates[0])
+            properties_list.append(feature['properties'])
         else:
             raise Exception(
                 'Geometries of type {} are not supported in chip classification \
                 labels.'.format(geom_type))
+
+    labels = ChipClassificationLabels()
+    bounds = map_to_pixel_bounds(polygons, crs_transformer)
+    if extent:
+        # Keep the cells that intersect (or touch) the extent.
+        xmins, ymins, xmaxs, ymaxs = bounds.T
+        is_kept = ((xmins <= extent.xmax) & (xmaxs >= extent.xmin)
+                   & (ymins <= extent.ymax) & (ymaxs >= extent.ymin))
+    else:
+        is_kept = np.ones(len(bounds), dtype=bool)
+
+    for (xmin, ymin, xmax, ymax), properties, keep in zip(
+            bounds.tolist(), properties_list, is_kept):
+        if keep:
+            cell = Box(ymin, xmin, ymax, xmax)
+            labels.set_cell(cell, properties['class_id'],
+                            properties.get('scores'))
     return labels
 
 
@@ -42,13 +42,18 @@ class SemanticSegmentationRasterStore(LabelStore):
                                       .with_uri(self.uri) \
                                       .build() \
                                       .create_source(self.tmp_dir)
+        labels = SemanticSegmentationLabels()
         with source.activate():
-            raw_labels = source.get_raw_image_array()
-            if self.class_trans:
-                labels = self.class_trans.rgb_to_class(raw_labels)
-            else:
-                labels = np.squeeze(raw_labels)
-            return SemanticSegmentationLabels.from_array(labels)
+            # Read the labels a tile at a time.
+            for window in SemanticSegmentationLabels.get_tile_windows(
+                    source.get_extent()):
+                raw_labels = source.get_raw_chip(window)
+                if self.class_trans:
+                    class_labels = self.class_trans.rgb_to_class(raw_labels)
+                else:
+                    class_labels = raw_labels[:, :, 0]
+                labels.add_label_pair(window, class_labels)
+        return labels
 
     def save(self, labels):
         """Save.
@@ -83,7 +88,7 @@ class SemanticSegmentationRasterStore(LabelStore):
                 dtype=dtype,
                 transform=transform,
                 crs=crs) as dataset:
-            for (window, class_labels) in clipped_labels.get_label_pairs():
+            for (window, class_labels) in clipped_labels.get_tiles():
                 window = (window.ymin, window.ymax), (window.xmin, window.xmax)
                 if self.class_trans:
                     rgb_labels = self.class_trans.class_to_rgb(class_labels)
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
                      scores=None):
     """Convert boxes and associated data into a GeoJSON dict.
@@ -15,10 +18,16 @@ def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
     Returns:
         dict in GeoJSON format
     """
+    # Transform the corners of all the boxes at once.
+    corners = [box.geojson_coordinates() for box in boxes]
+    starts = np.cumsum([0] + [len(box_corners) for box_corners in corners])
+    map_points = crs_transformer.pixel_to_map_many(
+        np.array([p for box_corners in corners for p in box_corners]).reshape(
+            -1, 2)).tolist()
+
     features = []
-    for box_ind, box in enumerate(boxes):
-        polygon = box.geojson_coordinates()
-        polygon = [list(crs_transformer.pixel_to_map(p)) for p in polygon]
+    for box_ind in range(len(boxes)):
+        polygon = map_points[starts[box_ind]:starts[box_ind + 1]]
 
         class_id = int(class_ids[box_ind])
         class_name = class_map.get_by_id(class_id).name
@@ -2,9 +2,12 @@
 
 from rastervision.data.raster_source.raster_source import *
 from rastervision.data.raster_source.raster_source_config import *
+from rastervision.data.raster_source.coverage_index import *
 from rastervision.data.raster_source.geotiff_source import *
 from rastervision.data.raster_source.geotiff_source_config import *
 from rastervision.data.raster_source.image_source import *
 from rastervision.data.raster_source.image_source_config import *
 from rastervision.data.raster_source.geojson_source import *
 from rastervision.data.raster_source.geojson_source_config import *
+from rastervision.data.raster_source.memmap_source import *
+from rastervision.data.raster_source.memmap_source_config import *
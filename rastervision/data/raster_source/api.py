@@ -6,5 +6,6 @@ RASTER_SOURCE = 'RASTER_SOURCE'
 GEOTIFF_SOURCE = 'GEOTIFF_SOURCE'
 IMAGE_SOURCE = 'IMAGE_SOURCE'
 GEOJSON_SOURCE = 'GEOJSON_SOURCE'
+MEMMAP_SOURCE = 'MEMMAP_SOURCE'
 
 from .raster_source_config import RasterSourceConfig
@@ -0,0 +1,121 @@
+from collections import OrderedDict
+import threading
+
+import numpy as np
+from rasterio.windows import Window
+
+
+class BlockCache():
+    """An LRU cache of decoded internal blocks of a raster dataset.
+
+    Chips are assembled from whole blocks, so overlapping windows (eg. the
+    half-overlapping prediction windows used for object detection) only
+    decode each compressed block once while it stays in the cache.
+
+    The cache can be shared by threads that read from their own handles to
+    the same dataset.
+    """
+
+    def __init__(self, max_bytes):
+        """Construct a new BlockCache.
+
+        Args:
+            max_bytes: (int) the maximum number of bytes of decoded block data
+                to hold before evicting the least recently used blocks
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def clear(self):
+        """Remove all blocks from the cache. Counters are left untouched."""
+        with self._lock:
+            self._blocks = OrderedDict()
+            self.nbytes = 0
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _get_block(self, image_dataset, indexes, block_row, block_col,
+                   block_height, block_width):
+        key = (indexes, block_row, block_col)
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None:
+                self.hits += 1
+                self._blocks.move_to_end(key)
+                return block
+            self.misses += 1
+
+        # Decode outside of the lock so that threads can decode in parallel.
+        row_off = block_row * block_height
+        col_off = block_col * block_width
+        height = min(block_height, image_dataset.height - row_off)
+        width = min(block_width, image_dataset.width - col_off)
+        block = image_dataset.read(
+            list(indexes), window=Window(col_off, row_off, width, height))
+
+        if block.nbytes <= self.max_bytes:
+            with self._lock:
+                if key not in self._blocks:
+                    self._blocks[key] = block
+                    self.nbytes += block.nbytes
+                while self.nbytes > self.max_bytes:
+                    _, evicted = self._blocks.popitem(last=False)
+                    self.nbytes -= evicted.nbytes
+        return block
+
+    def read(self, image_dataset, window, indexes=None):
+        """Read a window of a dataset by assembling it from cached blocks.
+
+        Pixels that lie outside of the dataset are set to zero.
+
+        Args:
+            image_dataset: Rasterio DatasetReader
+            window: ((row_start, row_stop), (col_start, col_stop))
+            indexes: optional list of 1-based indices of the bands to read.
+                Blocks are cached separately for each selection of bands.
+
+        Returns:
+            [channels, height, width] numpy array
+        """
+        if indexes is None:
+            indexes = list(range(1, image_dataset.count + 1))
+        indexes = tuple(indexes)
+        (ymin, ymax), (xmin, xmax) = window
+        ymin, ymax, xmin, xmax = map(int, (ymin, ymax, xmin, xmax))
+        im = np.zeros(
+            (len(indexes), ymax - ymin, xmax - xmin),
+            dtype=image_dataset.dtypes[0])
+
+        block_height, block_width = image_dataset.block_shapes[0]
+        inner_ymin, inner_ymax = max(ymin, 0), min(ymax, image_dataset.height)
+        inner_xmin, inner_xmax = max(xmin, 0), min(xmax, image_dataset.width)
+        if inner_ymin >= inner_ymax or inner_xmin >= inner_xmax:
+            return im
+
+        for block_row in range(inner_ymin // block_height,
+                               (inner_ymax - 1) // block_height + 1):
+            for block_col in range(inner_xmin // block_width,
+                                   (inner_xmax - 1) // block_width + 1):
+                block = self._get_block(image_dataset, indexes, block_row,
+                                        block_col, block_height, block_width)
+                row_off = block_row * block_height
+                col_off = block_col * block_width
+
+                # Intersection of the block and the window in dataset coords.
+                y0 = max(row_off, inner_ymin)
+                y1 = min(row_off + block.shape[1], inner_ymax)
+                x0 = max(col_off, inner_xmin)
+                x1 = min(col_off + block.shape[2], inner_xmax)
+                im[:, y0 - ymin:y1 - ymin, x0 - xmin:x1 - xmin] = \
+                    block[:, y0 - row_off:y1 - row_off,
+                          x0 - col_off:x1 - col_off]
+        return im
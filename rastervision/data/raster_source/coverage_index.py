@@ -0,0 +1,171 @@
+import io
+
+import numpy as np
+
+from rastervision.core.box import Box
+from rastervision.core.raster_stats import get_source_key
+from rastervision.filesystem import FileSystem
+from rastervision.utils.files import file_exists
+
+
+def dilate(mask):
+    """Return a boolean mask dilated by one cell in every direction."""
+    rows, cols = mask.shape
+    padded_mask = np.pad(mask, 1, mode='constant')
+    dilated_mask = np.zeros_like(mask)
+    for row_off in range(3):
+        for col_off in range(3):
+            dilated_mask |= padded_mask[row_off:, col_off:][:rows, :cols]
+    return dilated_mask
+
+
+class CoverageIndex():
+    """A low resolution mask of where a RasterSource has data.
+
+    This is used to drop windows that do not contain any data (eg. in the
+    NODATA collar around strip imagery) before reading them. Each cell of the
+    mask covers a square of cell_size pixels, and is True if there may be
+    data in it.
+
+    When the RasterSource has a data mask (see RasterSource.get_data_mask),
+    the index is built from a reduced resolution read of that mask, which
+    uses the overviews of the mask when there are any. Since the mask is
+    resampled, the index is dilated by one cell, and windows that pass it
+    should still be checked after they are read. Otherwise, the index is
+    built by reading the whole raster at full resolution, one strip of cells
+    at a time. Indexes can be saved so that they are only built once.
+    """
+
+    def __init__(self, mask, cell_size, source_key=None):
+        """Construct a new CoverageIndex.
+
+        Args:
+            mask: [rows, cols] boolean numpy array which is True for cells
+                that have data
+            cell_size: (int) size in pixels of each cell of the mask, whose
+                first cell is at the origin of the pixel coordinates
+            source_key: (str or None) key of the RasterSource the index was
+                built from (see raster_stats.get_source_key)
+        """
+        self.mask = mask
+        self.cell_size = cell_size
+        self.source_key = source_key
+
+        # Summed-area table of the mask so that the number of cells with data
+        # in any window can be found in constant time.
+        self._sums = np.zeros(
+            (mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int64)
+        self._sums[1:, 1:] = mask.cumsum(axis=0).cumsum(axis=1)
+
+    @staticmethod
+    def build(raster_source, cell_size=32, strip_pixels=2**24):
+        """Build a CoverageIndex of a RasterSource.
+
+        The RasterSource must be activated.
+
+        Args:
+            raster_source: RasterSource
+            cell_size: (int) size in pixels of each cell of the mask
+            strip_pixels: (int) approximate number of pixels to read at once
+                when the RasterSource has no data mask
+        """
+        extent = raster_source.get_extent()
+        height, width = extent.get_height(), extent.get_width()
+        rows = int(np.ceil(height / cell_size))
+        cols = int(np.ceil(width / cell_size))
+        source_key = get_source_key(raster_source)
+
+        # Read a few mask pixels per cell so that the mask is less likely to
+        # miss data between the pixels it is resampled at.
+        factor = min(4, cell_size)
+        data_mask = raster_source.get_data_mask((rows * factor, cols * factor))
+        if data_mask is not None:
+            mask = data_mask.reshape(rows, factor, cols,
+                                     factor).any(axis=(1, 3))
+            return CoverageIndex(dilate(mask), cell_size, source_key)
+
+        mask = np.zeros((rows, cols), dtype=bool)
+        strip_rows = max(1, strip_pixels // (cell_size * cell_size * cols))
+        for row in range(0, rows, strip_rows):
+            ymin = row * cell_size
+            ymax = min((row + strip_rows) * cell_size, height)
+            chip = raster_source.get_raw_chip(Box(ymin, 0, ymax, width))
+            has_data = np.any(chip, axis=2)
+
+            # Max-pool the pixels of each cell.
+            nb_rows = int(np.ceil((ymax - ymin) / cell_size))
+            padded = np.zeros(
+                (nb_rows * cell_size, cols * cell_size), dtype=bool)
+            padded[:has_data.shape[0], :has_data.shape[1]] = has_data
+            mask[row:row + nb_rows] = padded.reshape(
+                nb_rows, cell_size, cols, cell_size).any(axis=(1, 3))
+        return CoverageIndex(mask, cell_size, source_key)
+
+    @staticmethod
+    def build_cached(raster_source, cache_uri=None, cell_size=32):
+        """Load the CoverageIndex of a RasterSource, or build and save it.
+
+        The saved index is only used if it was built from the same files,
+        with the same cell size. It is not saved if the RasterSource has no
+        key.
+
+        Args:
+            raster_source: RasterSource, which must be activated
+            cache_uri: (str or None) URI of the saved index
+            cell_size: (int) size in pixels of each cell of the mask
+        """
+        if cache_uri is not None and file_exists(cache_uri):
+            index = CoverageIndex.load(cache_uri)
+            if (index.source_key is not None
+                    and index.source_key == get_source_key(raster_source)
+                    and index.cell_size == cell_size):
+                return index
+
+        index = CoverageIndex.build(raster_source, cell_size=cell_size)
+        if cache_uri is not None and index.source_key is not None:
+            index.save(cache_uri)
+        return index
+
+    def save(self, uri):
+        """Save the index to a .npz file."""
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            mask=self.mask,
+            cell_size=self.cell_size,
+            source_key=self.source_key)
+        FileSystem.get_file_system(uri, 'w').write_bytes(
+            uri, buffer.getvalue())
+
+    @staticmethod
+    def load(uri):
+        """Load an index saved with save."""
+        data = FileSystem.get_file_system(uri, 'r').read_bytes(uri)
+        with np.load(io.BytesIO(data), allow_pickle=True) as index_npz:
+            return CoverageIndex(index_npz['mask'], int(
+                index_npz['cell_size']), index_npz['source_key'].item())
+
+    def has_data(self, window):
+        """Return True if there may be data in a window.
+
+        Args:
+            window: Box in pixel coordinates
+        """
+        rows, cols = self.mask.shape
+        size = self.cell_size
+        row0 = int(np.clip(window.ymin // size, 0, rows))
+        col0 = int(np.clip(window.xmin // size, 0, cols))
+        row1 = int(np.clip(np.ceil(window.ymax / size), 0, rows))
+        col1 = int(np.clip(np.ceil(window.xmax / size), 0, cols))
+        sums = self._sums
+        count = sums[row1, col1] - sums[row0, col1] - sums[row1, col0]
+        count += sums[row0, col0]
+        return count > 0
+
+    def filter_windows(self, windows):
+        """Return the windows that may contain data.
+
+        Args:
+            windows: list of Box in pixel coordinates
+        """
+        return [window for window in windows if self.has_data(window)]
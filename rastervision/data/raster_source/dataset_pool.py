@@ -0,0 +1,45 @@
+import threading
+
+
+class DatasetPool():
+    """A pool of handles to a dataset, with one handle per thread.
+
+    Rasterio datasets cannot be shared between threads, so each thread that
+    reads from a RasterSource gets its own handle, which is opened the first
+    time the thread uses it. GDAL releases the GIL while decoding, so this
+    lets reads of one dataset run in parallel.
+    """
+
+    def __init__(self, open_dataset):
+        """Construct a new DatasetPool.
+
+        Args:
+            open_dataset: function with no arguments that opens a new handle
+                to the dataset
+        """
+        self.open_dataset = open_dataset
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._datasets = []
+
+    def get(self):
+        """Return the handle of the current thread, opening it if needed."""
+        dataset = getattr(self._local, 'dataset', None)
+        if dataset is None:
+            dataset = self.open_dataset()
+            self.set(dataset)
+        return dataset
+
+    def set(self, dataset):
+        """Set the handle of the current thread."""
+        self._local.dataset = dataset
+        with self._lock:
+            self._datasets.append(dataset)
+
+    def close(self):
+        """Close the handles of all threads."""
+        with self._lock:
+            for dataset in self._datasets:
+                dataset.close()
+            self._datasets = []
+            self._local = threading.local()
@@ -46,6 +46,20 @@ class GeoJSONSourceDefaultProvider(RasterSourceDefaultProvider):
                                     .build()
 
 
+class MemmapSourceDefaultProvider(RasterSourceDefaultProvider):
+    @staticmethod
+    def handles(uri):
+        ext = os.path.splitext(uri)[1]
+        return ext.lower() == '.npy'
+
+    @staticmethod
+    def construct(uri, channel_order=None):
+        return rv.RasterSourceConfig.builder(rv.MEMMAP_SOURCE) \
+                                    .with_uri(uri) \
+                                    .with_channel_order(channel_order) \
+                                    .build()
+
+
 class ImageSourceDefaultProvider(RasterSourceDefaultProvider):
     @staticmethod
     def handles(uri):
@@ -1,18 +1,33 @@
+from collections import OrderedDict
 import json
 
 from rasterio.features import rasterize
+from rasterio.transform import Affine
 import numpy as np
 import shapely
+from shapely.strtree import STRtree
 
+from rastervision.core.box import Box
 from rastervision.data import (ActivateMixin, ActivationError)
 from rastervision.data.raster_source import RasterSource
 from rastervision.utils.files import file_to_str
 from rastervision.data.utils import geojson_to_shapes
 
+# Size of the square tiles that are cached in windowed mode.
+TILE_SIZE = 512
 
-def geojson_to_raster(geojson, rasterizer_options, extent, crs_transformer):
+
+def geojson_to_raster_shapes(geojson, rasterizer_options, extent,
+                             crs_transformer):
+    """Return the shapes to rasterize for a GeoJSON dict.
+
+    Shapes are cropped against the extent, empty shapes are removed, and
+    lines are buffered by rasterizer_options.line_buffer.
+
+    Returns:
+        List of (shapely.geometry, class_id) tuples
+    """
     line_buffer = rasterizer_options.line_buffer
-    background_class_id = rasterizer_options.background_class_id
 
     # Crop shapes against extent and remove empty shapes.
     shapes = geojson_to_shapes(geojson, crs_transformer)
@@ -21,6 +36,13 @@ def geojson_to_raster(geojson, rasterizer_options, extent, crs_transformer):
     shapes = [(s.buffer(line_buffer), c)
               if type(s) is shapely.geometry.LineString else (s, c)
               for s, c in shapes]
+    return shapes
+
+
+def geojson_to_raster(geojson, rasterizer_options, extent, crs_transformer):
+    background_class_id = rasterizer_options.background_class_id
+    shapes = geojson_to_raster_shapes(geojson, rasterizer_options, extent,
+                                      crs_transformer)
 
     out_shape = (extent.get_height(), extent.get_width())
     # rasterize needs to passed >= 1 shapes.
@@ -33,10 +55,46 @@ def geojson_to_raster(geojson, rasterizer_options, extent, crs_transformer):
     return raster
 
 
-class GeoJSONSource(ActivateMixin, RasterSource):
-    """A RasterSource based on the rasterization of a GeoJSON file."""
+def rasterize_window(shapes, window, background_class_id):
+    """Rasterize shapes into an array covering a window.
+
+    Args:
+        shapes: List of (shapely.geometry, class_id) tuples in pixel coords
+        window: Box
+        background_class_id: class_id of pixels not covered by any shape
+
+    Returns:
+        [height, width] uint8 numpy array
+    """
+    out_shape = (window.get_height(), window.get_width())
+    # rasterize needs to passed >= 1 shapes and a non-empty output.
+    if not shapes or 0 in out_shape:
+        return np.full(out_shape, background_class_id, dtype=np.uint8)
+    return rasterize(
+        shapes,
+        out_shape=out_shape,
+        fill=background_class_id,
+        transform=Affine.translation(window.xmin, window.ymin),
+        dtype=np.uint8)
+
 
-    def __init__(self, uri, rasterizer_options, extent, crs_transformer):
+class GeoJSONSource(ActivateMixin, RasterSource):
+    """A RasterSource based on the rasterization of a GeoJSON file.
+
+    By default, the whole extent is rasterized when the source is activated.
+    In windowed mode, the shapes are indexed with an STRtree instead, and
+    only the shapes that intersect a window are rasterized when a chip is
+    read. Rasterized tiles can be kept in an LRU cache so that overlapping
+    windows reuse them.
+    """
+
+    def __init__(self,
+                 uri,
+                 rasterizer_options,
+                 extent,
+                 crs_transformer,
+                 windowed=False,
+                 tile_cache_size=0):
         """Constructor.
 
         Args:
@@ -45,11 +103,17 @@ class GeoJSONSource(ActivateMixin, RasterSource):
                 rastervision.data.raster_source.GeoJSONSourceConfig.RasterizerOptions
             extent: (Box) extent of corresponding imagery RasterSource
             crs_transformer: (CRSTransformer)
+            windowed: (bool) if True, rasterize the shapes of each window when
+                it is read instead of rasterizing the extent on activation
+            tile_cache_size: (int) byte budget of an LRU cache of rasterized
+                tiles used in windowed mode. If 0, no cache is used.
         """
         self.uri = uri
         self.rasterizer_options = rasterizer_options
         self.extent = extent
         self.crs_transformer = crs_transformer
+        self.windowed = windowed
+        self.tile_cache_size = tile_cache_size
         self.activated = False
 
         super().__init__(channel_order=[0])
@@ -70,6 +134,78 @@ class GeoJSONSource(ActivateMixin, RasterSource):
         """Return the associated CRSTransformer."""
         return self.crs_transformer
 
+    def _get_window_shapes(self, window):
+        """Return the shapes that intersect a window, in their GeoJSON order.
+
+        The order matters since later shapes are burned over earlier ones.
+        """
+        window_geom = window.to_shapely()
+        shape_inds = sorted(self.shape_inds[id(shape)]
+                            for shape in self.str_tree.query(window_geom)
+                            if shape.intersects(window_geom))
+        return [self.shapes[i] for i in shape_inds]
+
+    def _rasterize(self, window):
+        return rasterize_window(
+            self._get_window_shapes(window), window,
+            self.rasterizer_options.background_class_id)
+
+    def _get_tile(self, row, col):
+        """Return a rasterized tile from the cache, or rasterize it."""
+        key = (row, col)
+        tile = self.tile_cache.get(key)
+        if tile is not None:
+            self.tile_cache.move_to_end(key)
+            return tile
+
+        tile_window = Box.make_square(row * TILE_SIZE, col * TILE_SIZE,
+                                      TILE_SIZE).intersection(self.extent)
+        tile = self._rasterize(tile_window)
+        if tile.nbytes <= self.tile_cache_size:
+            self.tile_cache[key] = tile
+            self.tile_cache_nbytes += tile.nbytes
+            while self.tile_cache_nbytes > self.tile_cache_size:
+                _, evicted = self.tile_cache.popitem(last=False)
+                self.tile_cache_nbytes -= evicted.nbytes
+        return tile
+
+    def _get_tiled_window(self, window):
+        """Assemble a window that lies within the extent from cached tiles."""
+        chip = np.empty(
+            (window.get_height(), window.get_width()), dtype=np.uint8)
+        for row in range(window.ymin // TILE_SIZE,
+                         -(-window.ymax // TILE_SIZE)):
+            for col in range(window.xmin // TILE_SIZE,
+                             -(-window.xmax // TILE_SIZE)):
+                tile = self._get_tile(row, col)
+                row_off, col_off = row * TILE_SIZE, col * TILE_SIZE
+                overlap = Box.make_square(row_off, col_off,
+                                          TILE_SIZE).intersection(window)
+                tile_slices = (slice(overlap.ymin - row_off,
+                                     overlap.ymax - row_off),
+                               slice(overlap.xmin - col_off,
+                                     overlap.xmax - col_off))
+                chip_slices = (slice(overlap.ymin - window.ymin,
+                                     overlap.ymax - window.ymin),
+                               slice(overlap.xmin - window.xmin,
+                                     overlap.xmax - window.xmin))
+                chip[chip_slices] = tile[tile_slices]
+        return chip
+
+    def _get_windowed_chip(self, window):
+        # Like slicing a raster of the extent, the chip is clipped to the
+        # extent.
+        ymin, xmin = max(window.ymin, 0), max(window.xmin, 0)
+        ymax = max(min(window.ymax, self.extent.ymax), ymin)
+        xmax = max(min(window.xmax, self.extent.xmax), xmin)
+        window = Box(ymin, xmin, ymax, xmax)
+
+        if self.tile_cache_size:
+            chip = self._get_tiled_window(window)
+        else:
+            chip = self._rasterize(window)
+        return np.expand_dims(chip, 2)
+
     def _get_chip(self, window):
         """Return the chip located in the window.
 
@@ -81,16 +217,37 @@ class GeoJSONSource(ActivateMixin, RasterSource):
         """
         if not self.activated:
             raise ActivationError('GeoJSONSource must be activated before use')
+        if self.windowed:
+            return self._get_windowed_chip(window)
         return self.raster[window.ymin:window.ymax, window.xmin:window.xmax, :]
 
     def _activate(self):
         geojson = json.loads(file_to_str(self.uri))
-        self.raster = geojson_to_raster(geojson, self.rasterizer_options,
-                                        self.extent, self.crs_transformer)
-        # Add third singleton dim since rasters must have >=1 channel.
-        self.raster = np.expand_dims(self.raster, 2)
+        if self.windowed:
+            shapes = geojson_to_raster_shapes(geojson, self.rasterizer_options,
+                                              self.extent,
+                                              self.crs_transformer)
+            self.str_tree = STRtree([shape for shape, _ in shapes])
+            # Shapes are mutable so they are associated with their index by
+            # id.
+            self.shape_inds = {
+                id(shape): shape_ind
+                for shape_ind, (shape, _) in enumerate(shapes)
+            }
+            self.shapes = shapes
+            self.tile_cache = OrderedDict()
+            self.tile_cache_nbytes = 0
+        else:
+            self.raster = geojson_to_raster(geojson, self.rasterizer_options,
+                                            self.extent, self.crs_transformer)
+            # Add third singleton dim since rasters must have >=1 channel.
+            self.raster = np.expand_dims(self.raster, 2)
         self.activated = True
 
     def _deactivate(self):
         self.raster = None
+        self.shapes = None
+        self.str_tree = None
+        self.shape_inds = None
+        self.tile_cache = None
         self.activated = False
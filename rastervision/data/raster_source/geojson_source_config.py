@@ -31,13 +31,17 @@ class GeoJSONSourceConfig(RasterSourceConfig):
                  uri,
                  rasterizer_options,
                  transformers=None,
-                 channel_order=None):
+                 channel_order=None,
+                 windowed=False,
+                 tile_cache_size=0):
         super().__init__(
             source_type=rv.GEOJSON_SOURCE,
             transformers=transformers,
             channel_order=channel_order)
         self.uri = uri
         self.rasterizer_options = rasterizer_options
+        self.windowed = windowed
+        self.tile_cache_size = tile_cache_size
 
     def to_proto(self):
         msg = super().to_proto()
@@ -45,7 +49,9 @@ class GeoJSONSourceConfig(RasterSourceConfig):
             RasterSourceConfigMsg(
                 geojson_file=RasterSourceConfigMsg.GeoJSONFile(
                     uri=self.uri,
-                    rasterizer_options=self.rasterizer_options.to_proto())))
+                    rasterizer_options=self.rasterizer_options.to_proto(),
+                    windowed=self.windowed,
+                    tile_cache_size=self.tile_cache_size)))
         return msg
 
     def save_bundle_files(self, bundle_dir):
@@ -68,8 +74,13 @@ class GeoJSONSourceConfig(RasterSourceConfig):
                    .build()
 
     def create_source(self, tmp_dir, extent, crs_transformer):
-        return GeoJSONSource(self.uri, self.rasterizer_options, extent,
-                             crs_transformer)
+        return GeoJSONSource(
+            self.uri,
+            self.rasterizer_options,
+            extent,
+            crs_transformer,
+            windowed=self.windowed,
+            tile_cache_size=self.tile_cache_size)
 
     def update_for_command(self,
                            command_type,
@@ -89,7 +100,9 @@ class GeoJSONSourceConfigBuilder(RasterSourceConfigBuilder):
         if prev:
             config = {
                 'uri': prev.uri,
-                'rasterizer_options': prev.rasterizer_options
+                'rasterizer_options': prev.rasterizer_options,
+                'windowed': prev.windowed,
+                'tile_cache_size': prev.tile_cache_size
             }
 
         super().__init__(GeoJSONSourceConfig, config)
@@ -112,7 +125,9 @@ class GeoJSONSourceConfigBuilder(RasterSourceConfigBuilder):
             .with_uri(msg.geojson_file.uri) \
             .with_rasterizer_options(
                 msg.geojson_file.rasterizer_options.background_class_id,
-                msg.geojson_file.rasterizer_options.line_buffer)
+                msg.geojson_file.rasterizer_options.line_buffer) \
+            .with_windowed(msg.geojson_file.windowed) \
+            .with_tile_cache(msg.geojson_file.tile_cache_size)
 
     def with_uri(self, uri):
         """Set URI for a GeoJSON file used to read labels."""
@@ -132,3 +147,33 @@ class GeoJSONSourceConfigBuilder(RasterSourceConfigBuilder):
         b.config['rasterizer_options'] = GeoJSONSourceConfig.RasterizerOptions(
             background_class_id, line_buffer=line_buffer)
         return b
+
+    def with_windowed(self, windowed=True):
+        """Rasterize the GeoJSON one window at a time.
+
+        Instead of rasterizing the whole extent into one array when the
+        source is activated, the shapes are indexed with an STRtree and only
+        the shapes that intersect a window are rasterized when its chip is
+        read. This avoids a large allocation for big scenes.
+
+        Args:
+            windowed: (bool) whether to rasterize one window at a time
+        """
+        b = deepcopy(self)
+        b.config['windowed'] = windowed
+        return b
+
+    def with_tile_cache(self, size):
+        """Cache rasterized tiles in windowed mode.
+
+        Chips are assembled from cached tiles, so overlapping windows only
+        rasterize each tile once.
+
+        Args:
+            size: (int) the maximum number of bytes of rasterized tiles to
+                keep in memory. Least recently used tiles are evicted first.
+                If 0, no cache is used.
+        """
+        b = deepcopy(self)
+        b.config['tile_cache_size'] = size
+        return b
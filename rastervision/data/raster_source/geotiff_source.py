@@ -1,41 +1,95 @@
-import subprocess
-import os
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
+import rasterio
+
 from rastervision.data.raster_source.rasterio_source \
     import RasterioRasterSource
+from rastervision.data.raster_source.mosaic import (Mosaic, MosaicIndex)
 from rastervision.data.crs_transformer import RasterioCRSTransformer
-from rastervision.utils.files import download_if_needed
+from rastervision.utils.files import (download_if_needed, get_vsi_path)
 
 log = logging.getLogger(__name__)
 
 
-def build_vrt(vrt_path, image_paths):
-    """Build a VRT for a set of TIFF files."""
-    cmd = ['gdalbuildvrt', vrt_path]
-    cmd.extend(image_paths)
-    subprocess.run(cmd)
-
+def get_stream_path(uri, temp_dir):
+    """Return a path that streams the file at uri.
 
-def download_and_build_vrt(image_uris, temp_dir):
-    log.info('Building VRT...')
-    image_paths = [download_if_needed(uri, temp_dir) for uri in image_uris]
-    image_path = os.path.join(temp_dir, 'index.vrt')
-    build_vrt(image_path, image_paths)
-    return image_path
+    Falls back to downloading the file if its URI has no corresponding GDAL
+    virtual file system.
+    """
+    path = get_vsi_path(uri)
+    if path is None:
+        log.warning('Cannot stream {}, downloading it instead.'.format(uri))
+        path = download_if_needed(uri, temp_dir)
+    return path
 
 
 class GeoTiffSource(RasterioRasterSource):
-    def __init__(self, uris, raster_transformers, temp_dir,
-                 channel_order=None):
+    def __init__(self,
+                 uris,
+                 raster_transformers,
+                 temp_dir,
+                 channel_order=None,
+                 block_cache_size=0,
+                 stream=False,
+                 max_workers=8):
+        """Constructor.
+
+        If there is more than one URI, the files are treated as tiles of a
+        Mosaic. The MosaicIndex of the tiles is built the first time the
+        source is activated, and is shared by the Mosaics of all threads.
+
+        Args:
+            uris: list of URIs of GeoTIFFs
+            raster_transformers: RasterTransformers used to transform chips
+            temp_dir: directory to download data to
+            channel_order: list of channel indices to use
+            block_cache_size: (int) byte budget of the cache of decoded blocks
+            stream: (bool) if True, stream remote files instead of
+                downloading them
+            max_workers: (int) maximum number of tiles of a mosaic to download
+                or open concurrently
+        """
         self.uris = uris
-        super().__init__(raster_transformers, temp_dir, channel_order)
+        self.stream = stream
+        self.max_workers = max_workers
+        self.mosaic_index = None
+        super().__init__(raster_transformers, temp_dir, channel_order,
+                         block_cache_size)
 
     def _download_data(self, temp_dir):
+        def get_path(uri):
+            if self.stream:
+                return get_stream_path(uri, temp_dir)
+            return download_if_needed(uri, temp_dir)
+
         if len(self.uris) == 1:
-            return download_if_needed(self.uris[0], temp_dir)
-        else:
-            return download_and_build_vrt(self.uris, temp_dir)
+            return get_path(self.uris[0])
+
+        log.info('Getting {} tiles of mosaic...'.format(len(self.uris)))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(get_path, self.uris))
+
+    def _get_env_options(self):
+        # Avoid listing the remote "directory" of each file on open.
+        if self.stream:
+            return {'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR'}
+        return {}
+
+    def _open_dataset(self):
+        if isinstance(self.imagery_path, list):
+            return Mosaic(self.mosaic_index)
+        with rasterio.Env(**self._get_env_options()):
+            return super()._open_dataset()
+
+    def _activate(self):
+        if (isinstance(self.imagery_path, list) and self.mosaic_index is None):
+            self.mosaic_index = MosaicIndex(
+                self.imagery_path,
+                max_workers=self.max_workers,
+                env_options=self._get_env_options())
+        super()._activate()
 
     def _set_crs_transformer(self):
         self.crs_transformer = RasterioCRSTransformer.from_dataset(
@@ -10,17 +10,27 @@ from rastervision.utils.files import download_if_needed
 
 
 class GeoTiffSourceConfig(RasterSourceConfig):
-    def __init__(self, uris, transformers=None, channel_order=None):
+    def __init__(self,
+                 uris,
+                 transformers=None,
+                 channel_order=None,
+                 block_cache_size=0,
+                 stream=False):
         super().__init__(
             source_type=rv.GEOTIFF_SOURCE,
             transformers=transformers,
             channel_order=channel_order)
         self.uris = uris
+        self.block_cache_size = block_cache_size
+        self.stream = stream
 
     def to_proto(self):
         msg = super().to_proto()
         msg.geotiff_files.CopyFrom(
-            RasterSourceConfigMsg.GeoTiffFiles(uris=self.uris))
+            RasterSourceConfigMsg.GeoTiffFiles(
+                uris=self.uris,
+                block_cache_size=self.block_cache_size,
+                stream=self.stream))
         return msg
 
     def save_bundle_files(self, bundle_dir):
@@ -38,6 +48,8 @@ class GeoTiffSourceConfig(RasterSourceConfig):
                    .build()
 
     def create_local(self, tmp_dir):
+        if self.stream:
+            return self
         new_uris = [download_if_needed(uri, tmp_dir) for uri in self.uris]
         return self.to_builder() \
                    .with_uris(new_uris) \
@@ -45,8 +57,13 @@ class GeoTiffSourceConfig(RasterSourceConfig):
 
     def create_source(self, tmp_dir, extent=None, crs_transformer=None):
         transformers = self.create_transformers()
-        return GeoTiffSource(self.uris, transformers, tmp_dir,
-                             self.channel_order)
+        return GeoTiffSource(
+            self.uris,
+            transformers,
+            tmp_dir,
+            self.channel_order,
+            block_cache_size=self.block_cache_size,
+            stream=self.stream)
 
     def update_for_command(self,
                            command_type,
@@ -68,7 +85,9 @@ class GeoTiffSourceConfigBuilder(RasterSourceConfigBuilder):
             config = {
                 'uris': prev.uris,
                 'transformers': prev.transformers,
-                'channel_order': prev.channel_order
+                'channel_order': prev.channel_order,
+                'block_cache_size': prev.block_cache_size,
+                'stream': prev.stream
             }
 
         super().__init__(GeoTiffSourceConfig, config)
@@ -84,7 +103,9 @@ class GeoTiffSourceConfigBuilder(RasterSourceConfigBuilder):
         b = super().from_proto(msg)
 
         return b \
-            .with_uris(msg.geotiff_files.uris)
+            .with_uris(msg.geotiff_files.uris) \
+            .with_block_cache(msg.geotiff_files.block_cache_size) \
+            .with_stream(msg.geotiff_files.stream)
 
     def with_uris(self, uris):
         """Set URIs for a GeoTIFFs containing as raster data."""
@@ -97,3 +118,33 @@ class GeoTiffSourceConfigBuilder(RasterSourceConfigBuilder):
         b = deepcopy(self)
         b.config['uris'] = [uri]
         return b
+
+    def with_block_cache(self, size):
+        """Cache decoded internal blocks of the GeoTIFFs.
+
+        Chips are assembled from cached blocks, so overlapping windows, such
+        as the prediction windows of object detection, only decode each
+        compressed block once.
+
+        Args:
+            size: (int) the maximum number of bytes of decoded blocks to keep
+                in memory. Least recently used blocks are evicted first. If 0,
+                no cache is used.
+        """
+        b = deepcopy(self)
+        b.config['block_cache_size'] = size
+        return b
+
+    def with_stream(self, stream=True):
+        """Stream remote GeoTIFFs instead of downloading them.
+
+        S3, GCS and HTTP(S) URIs are opened through GDAL's virtual file
+        systems, so only the byte ranges covering the windows that are read
+        get fetched. This works best with Cloud Optimized GeoTIFFs.
+
+        Args:
+            stream: (bool) whether to stream the GeoTIFFs
+        """
+        b = deepcopy(self)
+        b.config['stream'] = stream
+        return b
@@ -0,0 +1,272 @@
+import json
+import os
+
+import numpy as np
+import rasterio
+from rasterio.enums import ColorInterp
+from rasterio.transform import Affine
+
+from rastervision.data import (ActivateMixin, ActivationError)
+from rastervision.data.raster_source import RasterSource
+from rastervision.data.crs_transformer import (RasterioCRSTransformer,
+                                               IdentityCRSTransformer)
+from rastervision.core.box import Box
+from rastervision.utils.files import (download_if_needed, file_to_str)
+
+
+def _get_block_offset(image_dataset, band, block_row, block_col):
+    offset = image_dataset.get_tag_item(
+        'BLOCK_OFFSET_{}_{}'.format(block_col, block_row), 'TIFF', bidx=band)
+    return None if offset is None else int(offset)
+
+
+def memmap_geotiff(path):
+    """Memory-map the pixels of an uncompressed GeoTIFF.
+
+    The blocks of the GeoTIFF must be laid out contiguously in the file, which
+    is the case for files written by GDAL.
+
+    Args:
+        path: local path to the GeoTIFF
+
+    Returns:
+        (image, tiles) where image is a [height, width, channels] array and
+        tiles is None for GeoTIFFs with blocks that span the whole width, and
+        otherwise image is None and tiles is a
+        [tile_rows, tile_cols, tile_height, tile_width, channels] array. Both
+        are read-only views of the file.
+
+    Raises:
+        ValueError if the GeoTIFF cannot be memory-mapped
+    """
+    with rasterio.open(path) as image_dataset:
+        if image_dataset.compression is not None:
+            raise ValueError(
+                'Cannot memory-map compressed GeoTIFF: {}'.format(path))
+        if len(set(image_dataset.dtypes)) != 1:
+            raise ValueError('Cannot memory-map GeoTIFF with bands of '
+                             'different types: {}'.format(path))
+
+        with open(path, 'rb') as tiff_file:
+            byteorder = '<' if tiff_file.read(2) == b'II' else '>'
+        dtype = np.dtype(image_dataset.dtypes[0]).newbyteorder(byteorder)
+        height, width = image_dataset.height, image_dataset.width
+        count = image_dataset.count
+        block_height, block_width = image_dataset.block_shapes[0]
+        striped = block_width == width
+        tile_rows = -(-height // block_height)
+        tile_cols = -(-width // block_width)
+
+        offset = _get_block_offset(image_dataset, 1, 0, 0)
+        pixel_interleaved = count == 1 or _get_block_offset(
+            image_dataset, 2, 0, 0) == offset
+        channels = count if pixel_interleaved else 1
+        bands = [1] if pixel_interleaved else range(1, count + 1)
+
+        # Check that the blocks of each band are laid out one after another.
+        block_bytes = block_height * block_width * channels * dtype.itemsize
+        if striped:
+            band_bytes = height * width * dtype.itemsize
+        else:
+            band_bytes = tile_rows * tile_cols * block_bytes
+        for band_ind, band in enumerate(bands):
+            for block_row in range(tile_rows):
+                for block_col in range(tile_cols):
+                    expected_offset = offset + band_ind * band_bytes + \
+                        (block_row * tile_cols + block_col) * block_bytes
+                    block_offset = _get_block_offset(image_dataset, band,
+                                                     block_row, block_col)
+                    if block_offset != expected_offset:
+                        raise ValueError(
+                            'Cannot memory-map GeoTIFF with non-contiguous '
+                            'blocks: {}'.format(path))
+
+    if striped:
+        shape = (height, width)
+        axes = (1, 2, 0)
+    else:
+        shape = (tile_rows, tile_cols, block_height, block_width)
+        axes = (1, 2, 3, 4, 0)
+    if pixel_interleaved:
+        array = np.memmap(
+            path,
+            dtype=dtype,
+            mode='r',
+            offset=offset,
+            shape=shape + (count, ))
+    else:
+        array = np.memmap(
+            path,
+            dtype=dtype,
+            mode='r',
+            offset=offset,
+            shape=(count, ) + shape).transpose(axes)
+    return (array, None) if striped else (None, array)
+
+
+class MemmapSource(ActivateMixin, RasterSource):
+    """A RasterSource that memory-maps an uncompressed raster.
+
+    This supports uncompressed striped or tiled GeoTIFFs, and .npy files with
+    [height, width, channels] or [height, width] arrays. Chips are read-only
+    views of the file whenever the layout allows it, ie. when the window lies
+    inside the raster (and inside a single tile for tiled GeoTIFFs), and no
+    bands need to be dropped or reordered.
+    """
+
+    def __init__(self,
+                 uri,
+                 raster_transformers,
+                 temp_dir,
+                 channel_order=None,
+                 georef_uri=None):
+        """Constructor.
+
+        Args:
+            uri: URI of an uncompressed GeoTIFF or a .npy file
+            raster_transformers: RasterTransformers used to transform chips
+                whenever they are retrieved.
+            temp_dir: directory to download data to
+            channel_order: list of channel indices to use
+            georef_uri: optional URI of a JSON file with the georeference of
+                a .npy file, with the keys "crs" and "transform" (the six
+                coefficients of the affine transform from pixel to map
+                coordinates)
+        """
+        super().__init__(channel_order, raster_transformers)
+        self.uri = uri
+        self.georef_uri = georef_uri
+        self.path = download_if_needed(uri, temp_dir)
+        self.image = None
+        self.tiles = None
+        self._read_metadata()
+
+        with self.activate():
+            # Get 1x1 chip (after applying raster transformers) to test dtype
+            # and channel order if needed
+            test_chip = self.get_chip(Box.make_square(0, 0, 1))
+            self.dtype = test_chip.dtype
+
+            self.channel_order = self.channel_order or list(
+                range(0, test_chip.shape[2]))
+
+    def _is_npy(self):
+        return os.path.splitext(self.path)[1].lower() == '.npy'
+
+    def _read_metadata(self):
+        if not self._is_npy():
+            with rasterio.open(self.path) as image_dataset:
+                self.height = image_dataset.height
+                self.width = image_dataset.width
+                self.nodatavals = list(image_dataset.nodatavals)
+                self.channels = [
+                    i
+                    for i, color_interp in enumerate(image_dataset.colorinterp)
+                    if color_interp != ColorInterp.alpha
+                ]
+                self.crs_transformer = RasterioCRSTransformer.from_dataset(
+                    image_dataset)
+            return
+
+        shape = np.load(self.path, mmap_mode='r').shape
+        self.height, self.width = shape[0:2]
+        nb_channels = shape[2] if len(shape) == 3 else 1
+        self.nodatavals = [None] * nb_channels
+        self.channels = list(range(nb_channels))
+        self.crs_transformer = IdentityCRSTransformer()
+        if self.georef_uri:
+            georef = json.loads(file_to_str(self.georef_uri))
+            self.crs_transformer = RasterioCRSTransformer(
+                Affine(*georef['transform']), georef['crs'])
+
+    def get_crs_transformer(self):
+        return self.crs_transformer
+
+    def get_extent(self):
+        return Box(0, 0, self.height, self.width)
+
+    def get_dtype(self):
+        """Return the numpy.dtype of this scene"""
+        return self.dtype
+
+    def _read(self, ymin, xmin, ymax, xmax):
+        """Read a window that lies inside the raster, as a view if possible."""
+        if self.image is not None:
+            return self.image[ymin:ymax, xmin:xmax, :]
+
+        tiles = self.tiles
+        tile_height, tile_width = tiles.shape[2:4]
+        tile_row0, tile_row1 = ymin // tile_height, (ymax - 1) // tile_height
+        tile_col0, tile_col1 = xmin // tile_width, (xmax - 1) // tile_width
+        if tile_row0 == tile_row1 and tile_col0 == tile_col1:
+            y0, x0 = ymin % tile_height, xmin % tile_width
+            y1, x1 = y0 + ymax - ymin, x0 + xmax - xmin
+            return tiles[tile_row0, tile_col0, y0:y1, x0:x1, :]
+
+        chip = np.empty(
+            (ymax - ymin, xmax - xmin, tiles.shape[4]), dtype=tiles.dtype)
+        for tile_row in range(tile_row0, tile_row1 + 1):
+            for tile_col in range(tile_col0, tile_col1 + 1):
+                row_off = tile_row * tile_height
+                col_off = tile_col * tile_width
+                y0, y1 = max(ymin, row_off), min(ymax, row_off + tile_height)
+                x0, x1 = max(xmin, col_off), min(xmax, col_off + tile_width)
+                chip[y0 - ymin:y1 - ymin, x0 - xmin:x1 - xmin, :] = \
+                    tiles[tile_row, tile_col, y0 - row_off:y1 - row_off,
+                          x0 - col_off:x1 - col_off, :]
+        return chip
+
+    def _read_chip(self, window, bands):
+        if self.image is None and self.tiles is None:
+            raise ActivationError('RasterSource must be activated before use')
+
+        ymin, xmin, ymax, xmax = map(int, window.tuple_format())
+        y0, y1 = max(ymin, 0), min(ymax, self.height)
+        x0, x1 = max(xmin, 0), min(xmax, self.width)
+        if (y0, y1, x0, x1) == (ymin, ymax, xmin, xmax):
+            chip = self._read(ymin, xmin, ymax, xmax)
+        else:
+            dtype = self.image.dtype if self.image is not None \
+                else self.tiles.dtype
+            chip = np.zeros(
+                (ymax - ymin, xmax - xmin, len(self.nodatavals)), dtype=dtype)
+            if y0 < y1 and x0 < x1:
+                chip[y0 - ymin:y1 - ymin, x0 - xmin:x1 - xmin, :] = \
+                    self._read(y0, x0, y1, x1)
+
+        if list(bands) != list(range(chip.shape[2])):
+            chip = chip[:, :, bands]
+
+        # Handle non-zero NODATA values by setting the data to 0.
+        nodatavals = [self.nodatavals[band] for band in bands]
+        if any(nodata is not None and nodata != 0 for nodata in nodatavals):
+            chip = chip.copy()
+            for i, nodata in enumerate(nodatavals):
+                if nodata is not None and nodata != 0:
+                    chip[:, :, i][chip[:, :, i] == nodata] = 0
+        return chip
+
+    def _get_chip(self, window):
+        return self._read_chip(window, self.channels)
+
+    def _get_ordered_chip(self, window, out_shape=None):
+        if out_shape is not None:
+            return super()._get_ordered_chip(window, out_shape=out_shape)
+        # Select the non-alpha channels and channel_order in one step.
+        bands = self.channels
+        if self.channel_order:
+            bands = [self.channels[i] for i in self.channel_order]
+        return self._read_chip(window, bands)
+
+    def _activate(self):
+        if self._is_npy():
+            image = np.load(self.path, mmap_mode='r')
+            if image.ndim == 2:
+                image = image[:, :, np.newaxis]
+            self.image = image
+        else:
+            self.image, self.tiles = memmap_geotiff(self.path)
+
+    def _deactivate(self):
+        self.image = None
+        self.tiles = None
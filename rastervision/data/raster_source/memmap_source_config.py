@@ -0,0 +1,145 @@
+from copy import deepcopy
+import os
+
+import rastervision as rv
+from rastervision.data.raster_source.memmap_source import MemmapSource
+from rastervision.data.raster_source.raster_source_config \
+    import (RasterSourceConfig, RasterSourceConfigBuilder)
+from rastervision.protos.raster_source_pb2 \
+    import RasterSourceConfig as RasterSourceConfigMsg
+from rastervision.utils.files import (download_if_needed, file_exists)
+
+
+def get_georef_sidecar_uri(uri):
+    """Return the URI of the georeference JSON file next to a .npy file.
+
+    This is the URI of the .npy file with a .json extension, eg. img.json for
+    img.npy, or None if uri is not a .npy file or has no such file.
+    """
+    root, ext = os.path.splitext(uri)
+    if ext.lower() != '.npy':
+        return None
+    georef_uri = root + '.json'
+    if not file_exists(georef_uri):
+        return None
+    return georef_uri
+
+
+class MemmapSourceConfig(RasterSourceConfig):
+    def __init__(self,
+                 uri,
+                 transformers=None,
+                 channel_order=None,
+                 georef_uri=None):
+        super().__init__(
+            source_type=rv.MEMMAP_SOURCE,
+            transformers=transformers,
+            channel_order=channel_order)
+        self.uri = uri
+        self.georef_uri = georef_uri
+
+    def to_proto(self):
+        msg = super().to_proto()
+        memmap_file = RasterSourceConfigMsg.MemmapFile(uri=self.uri)
+        if self.georef_uri:
+            memmap_file.georef_uri = self.georef_uri
+        msg.memmap_file.CopyFrom(memmap_file)
+        return msg
+
+    def save_bundle_files(self, bundle_dir):
+        (conf, files) = super().save_bundle_files(bundle_dir)
+
+        # Replace the URI with a template value. The georeference belongs to
+        # the training image, so it is dropped as well.
+        new_config = conf.to_builder() \
+                         .with_uri('BUNDLE') \
+                         .with_georef_uri(None) \
+                         .build()
+        return (new_config, files)
+
+    def for_prediction(self, image_uri):
+        # Only use a georeference that is next to the new image.
+        return self.to_builder() \
+                   .with_uri(image_uri) \
+                   .with_georef_uri(get_georef_sidecar_uri(image_uri)) \
+                   .build()
+
+    def create_local(self, tmp_dir):
+        b = self.to_builder().with_uri(download_if_needed(self.uri, tmp_dir))
+        if self.georef_uri:
+            b = b.with_georef_uri(download_if_needed(self.georef_uri, tmp_dir))
+        return b.build()
+
+    def create_source(self, tmp_dir, extent=None, crs_transformer=None):
+        transformers = self.create_transformers()
+        return MemmapSource(
+            self.uri,
+            transformers,
+            tmp_dir,
+            self.channel_order,
+            georef_uri=self.georef_uri)
+
+    def update_for_command(self,
+                           command_type,
+                           experiment_config,
+                           context=None,
+                           io_def=None):
+        io_def = super().update_for_command(command_type, experiment_config,
+                                            context, io_def)
+        io_def.add_input(self.uri)
+        if self.georef_uri:
+            io_def.add_input(self.georef_uri)
+
+        return io_def
+
+
+class MemmapSourceConfigBuilder(RasterSourceConfigBuilder):
+    def __init__(self, prev=None):
+        config = {}
+        if prev:
+            config = {
+                'uri': prev.uri,
+                'transformers': prev.transformers,
+                'channel_order': prev.channel_order,
+                'georef_uri': prev.georef_uri
+            }
+
+        super().__init__(MemmapSourceConfig, config)
+
+    def validate(self):
+        super().validate()
+        if self.config.get('uri') is None:
+            raise rv.ConfigError(
+                'You must specify a uri for the MemmapSourceConfig. Use '
+                '"with_uri".')
+
+    def from_proto(self, msg):
+        b = super().from_proto(msg)
+
+        b = b.with_uri(msg.memmap_file.uri)
+        if msg.memmap_file.HasField('georef_uri'):
+            b = b.with_georef_uri(msg.memmap_file.georef_uri)
+        return b
+
+    def with_uri(self, uri):
+        """Set URI of an uncompressed GeoTIFF or .npy file.
+
+        .npy files must contain a [height, width, channels] or
+        [height, width] array.
+        """
+        b = deepcopy(self)
+        b.config['uri'] = uri
+        return b
+
+    def with_georef_uri(self, georef_uri):
+        """Set URI of a JSON file with the georeference of a .npy file.
+
+        The file has the keys "crs" (eg. "epsg:3857") and "transform", which
+        holds the six coefficients of the affine transform from pixel to map
+        coordinates. Without it, the pixel coordinates are used as map
+        coordinates. When predicting with a predict package, the file next
+        to the .npy file with a .json extension is used if there is one.
+        """
+        b = deepcopy(self)
+        b.config['georef_uri'] = georef_uri
+        return b
@@ -0,0 +1,250 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import rasterio
+from rasterio.transform import Affine
+from rasterio.windows import Window
+from shapely.geometry import box as ShapelyBox
+from shapely.strtree import STRtree
+
+
+class MosaicIndex():
+    """The layout of the GeoTIFF tiles of a Mosaic.
+
+    This is built once from the headers of the tiles, and is shared by the
+    Mosaics of all threads that read from a RasterSource, so that tiles are
+    only opened up front once, and the spatial index of their footprints is
+    only built once.
+
+    As with gdalbuildvrt, all tiles must have the same CRS, resolution and
+    number of bands, and tiles later in the list are drawn on top of earlier
+    ones.
+    """
+
+    def __init__(self, paths, max_workers=8, env_options=None):
+        """Read the headers of the tiles of a mosaic.
+
+        Args:
+            paths: list of paths (or GDAL virtual file system paths) of tiles
+            max_workers: (int) maximum number of tiles to open concurrently
+            env_options: optional dict of GDAL options to open tiles with
+        """
+        self.paths = paths
+        self.env_options = env_options or {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tiles = list(executor.map(self.open_tile, range(len(paths))))
+
+        try:
+            first = tiles[0]
+            res_x, res_y = first.transform.a, -first.transform.e
+            for tile in tiles[1:]:
+                if tile.crs != first.crs:
+                    raise ValueError(
+                        'All tiles of a mosaic must have the same '
+                        'CRS: {} != {}'.format(tile.crs, first.crs))
+                if not (np.isclose(tile.transform.a, res_x)
+                        and np.isclose(-tile.transform.e, res_y)):
+                    raise ValueError(
+                        'All tiles of a mosaic must have the same resolution.')
+                if tile.count != first.count:
+                    raise ValueError('All tiles of a mosaic must have the '
+                                     'same number of bands.')
+
+            xmin = min(tile.bounds.left for tile in tiles)
+            ymax = max(tile.bounds.top for tile in tiles)
+            xmax = max(tile.bounds.right for tile in tiles)
+            ymin = min(tile.bounds.bottom for tile in tiles)
+
+            self.crs = first.crs
+            self.transform = Affine(res_x, 0.0, xmin, 0.0, -res_y, ymax)
+            self.width = int(round((xmax - xmin) / res_x))
+            self.height = int(round((ymax - ymin) / res_y))
+            self.count = first.count
+            self.dtypes = first.dtypes
+            self.nodatavals = first.nodatavals
+            self.colorinterp = first.colorinterp
+            self.mask_flag_enums = first.mask_flag_enums
+            self.block_shapes = first.block_shapes
+
+            self.tile_shapes = [(tile.height, tile.width) for tile in tiles]
+            self.tile_nodatavals = [tile.nodatavals for tile in tiles]
+            # Pixel offsets of each tile within the mosaic.
+            self.tile_offsets = [(int(round((ymax - tile.bounds.top) / res_y)),
+                                  int(
+                                      round(
+                                          (tile.bounds.left - xmin) / res_x)))
+                                 for tile in tiles]
+        finally:
+            for tile in tiles:
+                tile.close()
+
+        footprints = []
+        self.footprint_to_tile = {}
+        for tile_ind, ((height, width), (row_off, col_off)) in enumerate(
+                zip(self.tile_shapes, self.tile_offsets)):
+            footprint = ShapelyBox(col_off, row_off, col_off + width,
+                                   row_off + height)
+            footprints.append(footprint)
+            self.footprint_to_tile[id(footprint)] = tile_ind
+        self.footprints = footprints
+        self.footprint_index = STRtree(footprints)
+
+    def open_tile(self, tile_ind):
+        """Open a new handle to a tile."""
+        with rasterio.Env(**self.env_options):
+            return rasterio.open(self.paths[tile_ind])
+
+    def get_intersecting_tiles(self, ymin, xmin, ymax, xmax):
+        """Return indices of tiles that intersect a window, in drawing order.
+
+        Args:
+            ymin, xmin, ymax, xmax: window in pixel coordinates of the mosaic
+        """
+        query = ShapelyBox(xmin, ymin, xmax, ymax)
+        tile_inds = []
+        for footprint in self.footprint_index.query(query):
+            # The query only compares bounding boxes, and tiles that only
+            # share an edge with the window do not contribute any pixels.
+            (fxmin, fymin, fxmax, fymax) = footprint.bounds
+            if fxmin < xmax and fxmax > xmin and fymin < ymax and fymax > ymin:
+                tile_inds.append(self.footprint_to_tile[id(footprint)])
+        return sorted(tile_inds)
+
+
+class Mosaic():
+    """A mosaic of GeoTIFF tiles that is read like a single dataset.
+
+    This mimics the parts of the Rasterio DatasetReader interface that are
+    used by RasterioRasterSource. Reading a window only reads from the tiles
+    whose footprints intersect it, which are found using the MosaicIndex.
+
+    Like Rasterio datasets, a Mosaic should only be used by one thread at a
+    time, but any number of Mosaics can share a MosaicIndex. Each Mosaic
+    opens the tiles it reads from the first time it reads from them.
+    """
+
+    def __init__(self, index):
+        """Construct a new Mosaic.
+
+        Args:
+            index: MosaicIndex of the tiles
+        """
+        self.index = index
+        self.tiles = {}
+
+        self.crs = index.crs
+        self.transform = index.transform
+        self.width = index.width
+        self.height = index.height
+        self.count = index.count
+        self.dtypes = index.dtypes
+        self.nodatavals = index.nodatavals
+        self.colorinterp = index.colorinterp
+        self.mask_flag_enums = index.mask_flag_enums
+        self.block_shapes = index.block_shapes
+
+    def get_tile(self, tile_ind):
+        """Return the handle to a tile, opening it if needed."""
+        tile = self.tiles.get(tile_ind)
+        if tile is None:
+            tile = self.index.open_tile(tile_ind)
+            self.tiles[tile_ind] = tile
+        return tile
+
+    def get_intersecting_tiles(self, ymin, xmin, ymax, xmax):
+        """See MosaicIndex.get_intersecting_tiles."""
+        return self.index.get_intersecting_tiles(ymin, xmin, ymax, xmax)
+
+    def read(self,
+             indexes=None,
+             window=None,
+             boundless=True,
+             masked=False,
+             out_shape=None):
+        """Read a window of the mosaic.
+
+        Pixels that are not covered by any tile are set to the NODATA value
+        (or zero if there is none), and are masked if masked is True.
+
+        Args:
+            indexes: optional list of 1-based band indices to read
+            window: ((row_start, row_stop), (col_start, col_stop)) or
+                rasterio Window. Defaults to the whole mosaic.
+            boundless: ignored since all reads are boundless
+            masked: if True, return a masked array
+            out_shape: optional (channels, height, width) or (height, width)
+                to read the window at. Each tile is read at the reduced
+                resolution, using its overviews if it has any.
+
+        Returns:
+            [channels, height, width] numpy array
+        """
+        if window is None:
+            window = ((0, self.height), (0, self.width))
+        elif isinstance(window, Window):
+            window = window.toranges()
+        (ymin, ymax), (xmin, xmax) = window
+        ymin, ymax, xmin, xmax = map(int, (ymin, ymax, xmin, xmax))
+
+        if indexes is None:
+            indexes = list(range(1, self.count + 1))
+        if out_shape is None:
+            out_shape = (ymax - ymin, xmax - xmin)
+        out_height, out_width = out_shape[-2:]
+        y_scale = out_height / (ymax - ymin)
+        x_scale = out_width / (xmax - xmin)
+        im = np.zeros(
+            (len(indexes), out_height, out_width), dtype=self.dtypes[0])
+        covered = np.zeros((out_height, out_width), dtype=bool)
+
+        for tile_ind in self.get_intersecting_tiles(ymin, xmin, ymax, xmax):
+            row_off, col_off = self.index.tile_offsets[tile_ind]
+            tile_height, tile_width = self.index.tile_shapes[tile_ind]
+
+            # Intersection of the tile and the window in mosaic coords.
+            y0 = max(row_off, ymin)
+            y1 = min(row_off + tile_height, ymax)
+            x0 = max(col_off, xmin)
+            x1 = min(col_off + tile_width, xmax)
+            tile_window = Window(x0 - col_off, y0 - row_off, x1 - x0, y1 - y0)
+
+            # Intersection in output array coords.
+            out_y0 = round((y0 - ymin) * y_scale)
+            out_y1 = round((y1 - ymin) * y_scale)
+            out_x0 = round((x0 - xmin) * x_scale)
+            out_x1 = round((x1 - xmin) * x_scale)
+            if out_y0 >= out_y1 or out_x0 >= out_x1:
+                continue
+            tile_im = self.get_tile(tile_ind).read(
+                indexes,
+                window=tile_window,
+                out_shape=(len(indexes), out_y1 - out_y0, out_x1 - out_x0))
+
+            # Treat NODATA pixels of a tile as transparent.
+            valid = np.ones(tile_im.shape, dtype=bool)
+            tile_nodatavals = self.index.tile_nodatavals[tile_ind]
+            for channel, band in enumerate(indexes):
+                nodata = tile_nodatavals[band - 1]
+                if nodata is not None:
+                    valid[channel] = tile_im[channel] != nodata
+
+            out = im[:, out_y0:out_y1, out_x0:out_x1]
+            out[valid] = tile_im[valid]
+            covered[out_y0:out_y1, out_x0:out_x1] |= valid.any(axis=0)
+
+        # Match the fill value of boundless reads of a single dataset.
+        for channel, band in enumerate(indexes):
+            nodata = self.nodatavals[band - 1]
+            if nodata is not None:
+                im[channel, ~covered] = nodata
+
+        if masked:
+            return np.ma.masked_array(
+                im, mask=np.broadcast_to(~covered, im.shape))
+        return im
+
+    def close(self):
+        """Close the tiles opened by this Mosaic."""
+        for tile in self.tiles.values():
+            tile.close()
+        self.tiles = {}
@@ -1,5 +1,10 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from rastervision.data.raster_transformer.noop_transformer import \
+    NoopTransformer
+
 
 class RasterSource(ABC):
     """A source of raster data.
@@ -51,46 +56,179 @@ class RasterSource(ABC):
         """
         pass
 
-    def get_chip(self, window):
-        """Return the transformed chip in the window.
+    def _get_resampled_chip(self, window, out_shape):
+        """Return the chip located in the window resampled to out_shape.
+
+        This reads the chip at full resolution and decimates it. Subclasses
+        that can read at reduced resolution should override this.
 
         Args:
             window: Box
+            out_shape: (height, width) of the chip to return
 
         Returns:
             [height, width, channels] numpy array
         """
         chip = self._get_chip(window)
+        rows = (np.arange(out_shape[0]) + 0.5) * chip.shape[0] / out_shape[0]
+        cols = (np.arange(out_shape[1]) + 0.5) * chip.shape[1] / out_shape[1]
+        return chip[rows.astype(int)][:, cols.astype(int)]
 
+    def _get_ordered_chip(self, window, out_shape=None):
+        """Return the chip located in the window with channel_order applied.
+
+        Subclasses can override this to only read the channels in
+        channel_order.
+
+        Args:
+            window: Box
+            out_shape: optional (height, width) to resample the chip to
+
+        Returns:
+            [height, width, channels] numpy array
+        """
+        if out_shape is None:
+            chip = self._get_chip(window)
+        else:
+            chip = self._get_resampled_chip(window, out_shape)
         if self.channel_order:
             chip = chip[:, :, self.channel_order]
+        return chip
+
+    def get_chip(self, window, out_shape=None):
+        """Return the transformed chip in the window.
+
+        Args:
+            window: Box
+            out_shape: optional (height, width) to read the chip at. This is
+                used to read windows at a lower resolution, which can be
+                much cheaper than reading them at full resolution.
+
+        Returns:
+            [height, width, channels] numpy array
+        """
+        chip = self._get_ordered_chip(window, out_shape=out_shape)
 
         for transformer in self.raster_transformers:
             chip = transformer.transform(chip, self.channel_order)
 
         return chip
 
-    def get_raw_chip(self, window):
+    def _get_chips(self, windows, out=None):
+        """Return the chips located in a list of windows.
+
+        Subclasses can override this to read chips more efficiently than one
+        window at a time.
+
+        Args:
+            windows: non-empty list of Box with the same height and width
+            out: optional [len(windows), height, width, channels] numpy array
+                to write the chips into
+
+        Returns:
+            [len(windows), height, width, channels] numpy array
+        """
+        chip = self._get_chip(windows[0])
+        if out is None:
+            out = np.empty((len(windows), ) + chip.shape, dtype=chip.dtype)
+        out[0] = chip
+        for i, window in enumerate(windows[1:], 1):
+            out[i] = self._get_chip(window)
+        return out
+
+    def _get_ordered_chips(self, windows, out=None):
+        """Return the chips located in a list of windows with channel_order
+        applied.
+
+        Args:
+            windows: non-empty list of Box with the same height and width
+            out: optional [len(windows), height, width, channels] numpy array
+                to write the chips into
+
+        Returns:
+            [len(windows), height, width, channels] numpy array
+        """
+        if not self.channel_order:
+            return self._get_chips(windows, out=out)
+        chips = self._get_chips(windows)
+        return np.take(chips, self.channel_order, axis=3, out=out)
+
+    def get_chips(self, windows, out=None):
+        """Return the transformed chips in a list of windows.
+
+        The channel order and raster transformers are applied to the whole
+        batch at once.
+
+        Args:
+            windows: non-empty list of Box with the same height and width
+            out: optional [len(windows), height, width, channels] numpy array
+                to write the chips into. Must have the dtype of get_dtype().
+                Without raster transformers, the chips are read directly
+                into it. Otherwise, the last transformer writes into it.
+
+        Returns:
+            [len(windows), height, width, channels] numpy array, which is out
+            if it is given
+        """
+        transformers = [
+            transformer for transformer in self.raster_transformers
+            if not isinstance(transformer, NoopTransformer)
+        ]
+        if not transformers:
+            return self._get_ordered_chips(windows, out=out)
+
+        chips = self._get_ordered_chips(windows)
+        for i, transformer in enumerate(transformers):
+            is_last = i == len(transformers) - 1
+            chips = transformer.transform_batch(
+                chips, self.channel_order, out=out if is_last else None)
+        return chips
+
+    def get_raw_chip(self, window, out_shape=None):
         """Return the untransformed chip in the window.
 
         Args:
             window: Box
+            out_shape: optional (height, width) to read the chip at
 
         Returns:
             [height, width, channels] numpy array
         """
-        return self._get_chip(window)
+        if out_shape is None:
+            return self._get_chip(window)
+        return self._get_resampled_chip(window, out_shape)
 
-    def get_image_array(self):
+    def get_image_array(self, out_shape=None):
         """Return entire transformed image array.
 
-        Not safe to call on very large RasterSources.
+        Not safe to call on very large RasterSources unless out_shape is set.
+
+        Args:
+            out_shape: optional (height, width) to read the image at
         """
-        return self.get_chip(self.get_extent())
+        return self.get_chip(self.get_extent(), out_shape=out_shape)
 
-    def get_raw_image_array(self):
+    def get_raw_image_array(self, out_shape=None):
         """Return entire untransformed image array.
 
-        Not safe to call on very large RasterSources.
+        Not safe to call on very large RasterSources unless out_shape is set.
+
+        Args:
+            out_shape: optional (height, width) to read the image at
+        """
+        return self.get_raw_chip(self.get_extent(), out_shape=out_shape)
+
+    def get_data_mask(self, out_shape):
+        """Return a reduced resolution mask of where there may be data.
+
+        This is used to build a CoverageIndex without reading the pixels of
+        the raster, eg. from the mask band of a dataset. Sources that cannot
+        do that return None.
+
+        Args:
+            out_shape: (height, width) of the mask, which covers the extent
+
+        Returns:
+            [height, width] boolean numpy array, or None
         """
-        return self.get_raw_chip(self.get_extent())
+        return None
@@ -6,39 +6,149 @@ from rasterio.enums import (ColorInterp, MaskFlags)
 
 from rastervision.data import (ActivateMixin, ActivationError)
 from rastervision.data.raster_source import RasterSource
+from rastervision.data.raster_source.block_cache import BlockCache
+from rastervision.data.raster_source.dataset_pool import DatasetPool
 from rastervision.core.box import Box
 
 
-def load_window(image_dataset, window=None, channels=None, is_masked=False):
+def read_window(image_dataset,
+                window=None,
+                indexes=None,
+                is_masked=False,
+                out_shape=None):
+    """Read a window of a dataset, padding it with zeros outside the dataset.
+
+    Rasterio implements boundless reads by building a temporary VRT, which is
+    slow. Instead, the part of the window that intersects the dataset is read
+    directly and padded in NumPy. A boundless read is only used for windows
+    with fractional coordinates, which Rasterio has to resample.
+
+    Args:
+        window: ((row_start, row_stop), (col_start, col_stop))
+        indexes: An optional list of 1-based indices of the bands to read.
+        is_masked: If True, read a masked array from rasterio and set masked
+            pixels to zero.
+        out_shape: An optional (height, width) to read the window at. When
+            this is smaller than the window, GDAL reads from the internal
+            overviews of the dataset if there are any, and otherwise
+            decimates the full resolution pixels.
+
+    Returns:
+        [channels, height, width] numpy array
+    """
+    if window is None:
+        window = ((0, image_dataset.height), (0, image_dataset.width))
+    (ymin, ymax), (xmin, xmax) = window
+    count = len(indexes) if indexes else image_dataset.count
+
+    def read(window, shape=None, boundless=False):
+        kwargs = {}
+        if shape is not None:
+            kwargs['out_shape'] = (count, ) + tuple(shape)
+        im = image_dataset.read(
+            indexes,
+            window=window,
+            boundless=boundless,
+            masked=is_masked,
+            **kwargs)
+        return np.ma.filled(im, fill_value=0) if is_masked else im
+
+    if not all(float(c).is_integer() for c in (ymin, ymax, xmin, xmax)):
+        return read(window, out_shape, boundless=True)
+    ymin, ymax, xmin, xmax = map(int, (ymin, ymax, xmin, xmax))
+
+    # Intersection of the window and the dataset.
+    y0, y1 = max(ymin, 0), min(ymax, image_dataset.height)
+    x0, x1 = max(xmin, 0), min(xmax, image_dataset.width)
+    if (y0, y1, x0, x1) == (ymin, ymax, xmin, xmax):
+        return read(((y0, y1), (x0, x1)), out_shape)
+
+    if out_shape is None:
+        out_shape = (ymax - ymin, xmax - xmin)
+    im = np.zeros((count, ) + tuple(out_shape), dtype=image_dataset.dtypes[0])
+
+    # Location of the intersection in the output array.
+    y_scale = out_shape[0] / (ymax - ymin)
+    x_scale = out_shape[1] / (xmax - xmin)
+    out_y0, out_y1 = round((y0 - ymin) * y_scale), round((y1 - ymin) * y_scale)
+    out_x0, out_x1 = round((x0 - xmin) * x_scale), round((x1 - xmin) * x_scale)
+    if out_y0 < out_y1 and out_x0 < out_x1:
+        im[:, out_y0:out_y1, out_x0:out_x1] = read(
+            ((y0, y1), (x0, x1)), (out_y1 - out_y0, out_x1 - out_x0))
+    return im
+
+
+def load_window(image_dataset,
+                window=None,
+                channels=None,
+                is_masked=False,
+                block_cache=None,
+                out_shape=None):
     """Load a window of an image from a TIFF file.
 
     Args:
         window: ((row_start, row_stop), (col_start, col_stop)) or
         ((y_min, y_max), (x_min, x_max))
-        channels: An optional list of bands to read.
+        channels: An optional list of 0-based indices of the bands to read,
+            in the order they should be returned. Only these bands are
+            read from the dataset.
         is_masked: If True, read a  masked array from rasterio
+        block_cache: An optional BlockCache to assemble the window from.
+            Ignored if is_masked is True or out_shape is set.
+        out_shape: An optional (height, width) to read the window at, using
+            the overviews of the image if it has any.
     """
-    if is_masked:
-        im = image_dataset.read(window=window, boundless=True, masked=True)
-        im = np.ma.filled(im, fill_value=0)
+    indexes = None
+    bands = range(image_dataset.count)
+    if channels:
+        indexes = [channel + 1 for channel in channels]
+        bands = channels
+
+    if block_cache is not None and not is_masked and out_shape is None:
+        im = block_cache.read(image_dataset, window, indexes=indexes)
     else:
-        im = image_dataset.read(window=window, boundless=True)
+        im = read_window(
+            image_dataset,
+            window,
+            indexes,
+            is_masked=is_masked,
+            out_shape=out_shape)
 
     # Handle non-zero NODATA values by setting the data to 0.
-    for channel, nodata in enumerate(image_dataset.nodatavals):
+    for i, band in enumerate(bands):
+        nodata = image_dataset.nodatavals[band]
         if nodata is not None and nodata != 0:
-            im[channel, im[channel] == nodata] = 0
+            im[i, im[i] == nodata] = 0
 
-    if channels:
-        im = im[channels, :]
     im = np.transpose(im, axes=[1, 2, 0])
     return im
 
 
 class RasterioRasterSource(ActivateMixin, RasterSource):
-    def __init__(self, raster_transformers, temp_dir, channel_order=None):
+    def __init__(self,
+                 raster_transformers,
+                 temp_dir,
+                 channel_order=None,
+                 block_cache_size=0):
+        """Constructor.
+
+        Args:
+            raster_transformers: RasterTransformers used to transform chips
+                whenever they are retrieved.
+            temp_dir: directory to download data to
+            channel_order: list of channel indices to use
+            block_cache_size: (int) byte budget of an LRU cache of decoded
+                internal blocks. Chips are assembled from cached blocks, so
+                overlapping windows only decode each block once. Hit and miss
+                counts are available through block_cache. If 0, no cache is
+                used.
+        """
         super().__init__(channel_order, raster_transformers)
 
+        self.block_cache = None
+        if block_cache_size:
+            self.block_cache = BlockCache(block_cache_size)
+
         self.temp_dir = temp_dir
         self.imagery_path = self._download_data(temp_dir)
 
@@ -82,15 +192,128 @@ class RasterioRasterSource(ActivateMixin, RasterSource):
         """Return the numpy.dtype of this scene"""
         return self.dtype
 
-    def _get_chip(self, window):
+    def _get_bands(self):
+        """Return the 0-based indices of the bands selected by channel_order."""
+        if not self.channel_order:
+            return self.channels
+        return [self.channels[i] for i in self.channel_order]
+
+    def _read_chip(self, window, bands, out_shape=None):
         if self.image_dataset is None:
             raise ActivationError('RasterSource must be activated before use')
-        return load_window(self.image_dataset, window.rasterio_format(),
-                           self.channels)
+        return load_window(
+            self.image_dataset,
+            window.rasterio_format(),
+            bands,
+            block_cache=self.block_cache,
+            out_shape=out_shape)
+
+    def _read_chips(self, windows, bands, out=None):
+        if self.image_dataset is None:
+            raise ActivationError('RasterSource must be activated before use')
+
+        # When the windows are packed closely together (eg. overlapping
+        # sliding windows), a single read of their union is cheaper than
+        # reading each window separately. Windows with fractional
+        # coordinates are left to Rasterio to round.
+        coords = [window.tuple_format() for window in windows]
+        if not all(float(c).is_integer() for coord in coords for c in coord):
+            return self._read_chips_separately(windows, bands, out=out)
+        ymin = int(min(c[0] for c in coords))
+        xmin = int(min(c[1] for c in coords))
+        ymax = int(max(c[2] for c in coords))
+        xmax = int(max(c[3] for c in coords))
+        windows_area = sum(window.get_area() for window in windows)
+        if (ymax - ymin) * (xmax - xmin) > windows_area:
+            return self._read_chips_separately(windows, bands, out=out)
+
+        im = load_window(
+            self.image_dataset, ((ymin, ymax), (xmin, xmax)),
+            bands,
+            block_cache=self.block_cache)
+        height = int(windows[0].get_height())
+        width = int(windows[0].get_width())
+        if out is None:
+            out = np.empty(
+                (len(windows), height, width, im.shape[2]), dtype=im.dtype)
+        for i, window in enumerate(windows):
+            row, col = int(window.ymin) - ymin, int(window.xmin) - xmin
+            out[i] = im[row:row + height, col:col + width]
+        return out
+
+    def _read_chips_separately(self, windows, bands, out=None):
+        chip = self._read_chip(windows[0], bands)
+        if out is None:
+            out = np.empty((len(windows), ) + chip.shape, dtype=chip.dtype)
+        out[0] = chip
+        for i, window in enumerate(windows[1:], 1):
+            out[i] = self._read_chip(window, bands)
+        return out
+
+    def _get_chip(self, window):
+        return self._read_chip(window, self.channels)
+
+    def _get_resampled_chip(self, window, out_shape):
+        # GDAL reads from the overviews of the image when there are any.
+        return self._read_chip(window, self.channels, out_shape=out_shape)
+
+    def _get_ordered_chip(self, window, out_shape=None):
+        # Only read and decode the bands in channel_order.
+        return self._read_chip(window, self._get_bands(), out_shape=out_shape)
+
+    def _get_chips(self, windows, out=None):
+        return self._read_chips(windows, self.channels, out=out)
+
+    def _get_ordered_chips(self, windows, out=None):
+        return self._read_chips(windows, self._get_bands(), out=out)
+
+    def get_data_mask(self, out_shape):
+        # Pixels are only masked if the dataset has NODATA values, an alpha
+        # band or a mask band.
+        read_masks = getattr(self.image_dataset, 'read_masks', None)
+        mask_flags = self.image_dataset.mask_flag_enums
+        bands = self.channels
+        if read_masks is None or all(
+                list(mask_flags[band]) == [MaskFlags.all_valid]
+                for band in bands):
+            return None
+        if all(MaskFlags.per_dataset in mask_flags[band] for band in bands):
+            bands = bands[:1]
+        mask = np.zeros(out_shape, dtype=bool)
+        for band in bands:
+            mask |= read_masks(band + 1, out_shape=out_shape) != 0
+        return mask
+
+    @property
+    def image_dataset(self):
+        """The Rasterio dataset handle of the current thread.
+
+        Each thread that reads from an activated RasterioRasterSource gets its
+        own handle, so get_chip and get_chips can be called concurrently,
+        eg. from a ThreadPoolExecutor. This is None when the RasterSource is
+        not activated.
+        """
+        dataset_pool = getattr(self, '_dataset_pool', None)
+        if dataset_pool is None:
+            return None
+        return dataset_pool.get()
+
+    @image_dataset.setter
+    def image_dataset(self, image_dataset):
+        self._dataset_pool.set(image_dataset)
+
+    def _open_dataset(self):
+        """Open a new handle to the dataset."""
+        return rasterio.open(self.imagery_path)
 
     def _activate(self):
-        self.image_dataset = rasterio.open(self.imagery_path)
+        self._dataset_pool = DatasetPool(self._open_dataset)
+        # Open the handle of the activating thread right away, so that
+        # errors are raised on activation.
+        self._dataset_pool.get()
 
     def _deactivate(self):
-        self.image_dataset.close()
-        self.image_dataset = None
+        self._dataset_pool.close()
+        self._dataset_pool = None
+        if self.block_cache is not None:
+            self.block_cache.clear()
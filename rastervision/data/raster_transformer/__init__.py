@@ -5,3 +5,5 @@ from rastervision.data.raster_transformer.raster_transformer_config import *
 from rastervision.data.raster_transformer.noop_transformer import *
 from rastervision.data.raster_transformer.stats_transformer import *
 from rastervision.data.raster_transformer.stats_transformer_config import *
+from rastervision.data.raster_transformer.percentile_transformer import *
+from rastervision.data.raster_transformer.percentile_transformer_config import *
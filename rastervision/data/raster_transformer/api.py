@@ -6,6 +6,7 @@ RASTER_TRANSFORMER = 'RASTER_TRANSFORMER'
 
 CHANNEL_TRANSFORMER = 'CHANNEL_TRANSFORMER'
 STATS_TRANSFORMER = 'STATS_TRANSFORMER'
+PERCENTILE_TRANSFORMER = 'PERCENTILE_TRANSFORMER'
 
 from rastervision.data.raster_transformer.raster_transformer_config \
     import RasterTransformerConfig
@@ -11,3 +11,9 @@ class NoopTransformer(RasterTransformer):
 
     def transform(self, chip, channel_order=None):
         return chip
+
+    def transform_batch(self, chips, channel_order=None, out=None):
+        if out is None or out is chips:
+            return chips
+        out[:] = chips
+        return out
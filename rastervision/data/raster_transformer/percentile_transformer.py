@@ -0,0 +1,101 @@
+import numpy as np
+
+from rastervision.core.raster_histogram import (get_bins, get_bin_values)
+from rastervision.data.raster_transformer.raster_transformer \
+    import RasterTransformer
+
+
+class PercentileTransformer(RasterTransformer):
+    """Transforms values to uint8 by clipping them to percentiles.
+
+    Each channel is mapped so that values between a lower and an upper
+    percentile of the RasterHistogram span 0 to 255, and NODATA zero values
+    stay zero. Unlike StatsTransformer, this does not assume the values are
+    normally distributed, which suits skewed bands such as SAR or thermal
+    imagery. The mapping of each channel is precomputed as a lookup table
+    over the bins of the histogram, so a chip is transformed with one gather
+    per channel.
+    """
+
+    def __init__(self,
+                 raster_histogram=None,
+                 lower_percentile=2.0,
+                 upper_percentile=98.0):
+        """Construct a new PercentileTransformer.
+
+        Args:
+            raster_histogram: (RasterHistogram) of the raw channels
+            lower_percentile: (float) percentile mapped to 0
+            upper_percentile: (float) percentile mapped to 255
+        """
+        self.raster_histogram = raster_histogram
+        self.lower_percentile = lower_percentile
+        self.upper_percentile = upper_percentile
+        self._luts = {}
+
+        self.lower_values = None
+        self.upper_values = None
+        if raster_histogram is not None:
+            self.lower_values = np.array(
+                raster_histogram.get_percentiles(lower_percentile))
+            self.upper_values = np.array(
+                raster_histogram.get_percentiles(upper_percentile))
+
+    def _get_lut(self, channel_order, dtype):
+        """Return a [channels, NB_BINS] uint8 lookup table indexed by bin."""
+        key = (tuple(channel_order), dtype)
+        lut = self._luts.get(key)
+        if lut is None:
+            # NaN values are mapped to zero like NODATA values.
+            values = np.nan_to_num(get_bin_values(dtype))
+            lower = self.lower_values[channel_order]
+            upper = self.upper_values[channel_order]
+            ranges = np.maximum(upper - lower, np.finfo(np.float64).eps)
+            lut = (values[np.newaxis, :] - lower[:, np.newaxis]) / \
+                ranges[:, np.newaxis]
+            lut = (np.clip(lut, 0, 1) * 255).astype(np.uint8)
+
+            # Don't transform NODATA zero values.
+            lut[:, values == 0] = 0
+            self._luts[key] = lut
+        return lut
+
+    def transform(self, chip, channel_order=None, out=None):
+        """Transform a chip.
+
+        Args:
+            chip: [height, width, channels] numpy array
+            channel_order: The channel order of the chip, used to select the
+                percentiles of each channel.
+            out: optional uint8 numpy array of the shape of chip to write the
+                transformed chip into
+
+        Returns:
+            [height, width, channels] uint8 numpy array
+        """
+        if self.raster_histogram is None:
+            raise ValueError('raster_histogram not defined.')
+        if channel_order is None:
+            channel_order = np.arange(chip.shape[-1])
+
+        lut = self._get_lut(channel_order, chip.dtype)
+        bins = get_bins(chip)
+        if out is None:
+            out = np.empty(chip.shape, dtype=np.uint8)
+        for i in range(chip.shape[-1]):
+            np.take(lut[i], bins[..., i], out=out[..., i], mode='clip')
+        return out
+
+    def transform_batch(self, chips, channel_order=None, out=None):
+        """Transform a batch of chips.
+
+        Args:
+            chips: [batch_size, height, width, channels] numpy array
+            channel_order: The channel order of the chips.
+            out: optional uint8 numpy array of the shape of chips to write the
+                transformed chips into
+
+        Returns:
+            [batch_size, height, width, channels] uint8 numpy array
+        """
+        return self.transform(chips, channel_order, out=out)
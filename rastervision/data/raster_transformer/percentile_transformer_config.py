@@ -0,0 +1,135 @@
+import os
+from copy import deepcopy
+
+import rastervision as rv
+from rastervision.core.raster_histogram import RasterHistogram
+from rastervision.data.raster_transformer import (
+    RasterTransformerConfig, RasterTransformerConfigBuilder,
+    PercentileTransformer, NoopTransformer)
+from rastervision.protos.raster_transformer_pb2 \
+    import RasterTransformerConfig as RasterTransformerConfigMsg
+
+
+class PercentileTransformerConfig(RasterTransformerConfig):
+    def __init__(self,
+                 histogram_uri=None,
+                 lower_percentile=2.0,
+                 upper_percentile=98.0):
+        super().__init__(rv.PERCENTILE_TRANSFORMER)
+        self.histogram_uri = histogram_uri
+        self.lower_percentile = lower_percentile
+        self.upper_percentile = upper_percentile
+
+    def to_proto(self):
+        transformer = RasterTransformerConfigMsg.PercentileTransformer(
+            lower_percentile=self.lower_percentile,
+            upper_percentile=self.upper_percentile)
+        if self.histogram_uri:
+            transformer.histogram_uri = self.histogram_uri
+        msg = RasterTransformerConfigMsg(
+            transformer_type=self.transformer_type,
+            percentile_transformer=transformer)
+        return msg
+
+    def save_bundle_files(self, bundle_dir):
+        if not self.histogram_uri:
+            raise rv.ConfigError('histogram_uri is not set.')
+        local_path, base_name = self.bundle_file(self.histogram_uri,
+                                                 bundle_dir)
+        new_config = self.to_builder() \
+                         .with_histogram_uri(base_name) \
+                         .build()
+        return (new_config, [local_path])
+
+    def load_bundle_files(self, bundle_dir):
+        if not self.histogram_uri:
+            raise rv.ConfigError('histogram_uri is not set.')
+        local_histogram_uri = os.path.join(bundle_dir, self.histogram_uri)
+        return self.to_builder() \
+                   .with_histogram_uri(local_histogram_uri) \
+                   .build()
+
+    def create_transformer(self):
+        if not self.histogram_uri:
+            return NoopTransformer()
+
+        return PercentileTransformer(
+            RasterHistogram.load(self.histogram_uri),
+            lower_percentile=self.lower_percentile,
+            upper_percentile=self.upper_percentile)
+
+    def update_for_command(self,
+                           command_type,
+                           experiment_config,
+                           context=None,
+                           io_def=None):
+        io_def = io_def or rv.core.CommandIODefinition()
+        if command_type != rv.ANALYZE:
+            if not self.histogram_uri:
+                # Find the histogram URI from a HistogramAnalyzer
+                for analyzer in experiment_config.analyzers:
+                    if analyzer.analyzer_type == rv.HISTOGRAM_ANALYZER:
+                        self.histogram_uri = analyzer.histogram_uri
+
+            if not self.histogram_uri:
+                io_def.add_missing(
+                    "PercentileTransformerConfig is missing 'histogram_uri' "
+                    'property in command {}. '
+                    'This must be set on the configuration, or a '
+                    'HistogramAnalyzerConfig must be added to '
+                    'this experiment.'.format(command_type))
+            else:
+                io_def.add_input(self.histogram_uri)
+
+        return io_def
+
+
+class PercentileTransformerConfigBuilder(RasterTransformerConfigBuilder):
+    def __init__(self, prev=None):
+        config = {}
+        if prev:
+            config = {
+                'histogram_uri': prev.histogram_uri,
+                'lower_percentile': prev.lower_percentile,
+                'upper_percentile': prev.upper_percentile
+            }
+        super().__init__(PercentileTransformerConfig, config)
+
+    def validate(self):
+        super().validate()
+        lower = self.config.get('lower_percentile', 2.0)
+        upper = self.config.get('upper_percentile', 98.0)
+        if not 0 <= lower < upper <= 100:
+            raise rv.ConfigError(
+                'Percentiles must satisfy 0 <= lower < upper <= 100, got '
+                '{} and {}'.format(lower, upper))
+
+    def from_proto(self, msg):
+        transformer = msg.percentile_transformer
+        b = self.with_percentiles(transformer.lower_percentile,
+                                  transformer.upper_percentile)
+        if transformer.HasField('histogram_uri'):
+            b = b.with_histogram_uri(transformer.histogram_uri)
+        return b
+
+    def with_histogram_uri(self, histogram_uri):
+        """Set the histogram_uri.
+
+            Args:
+                histogram_uri: URI to the histogram json to use
+        """
+        b = deepcopy(self)
+        b.config['histogram_uri'] = histogram_uri
+        return b
+
+    def with_percentiles(self, lower_percentile, upper_percentile):
+        """Set the percentiles that are mapped to 0 and 255.
+
+            Args:
+                lower_percentile: percentile mapped to 0, eg. 2
+                upper_percentile: percentile mapped to 255, eg. 98
+        """
+        b = deepcopy(self)
+        b.config['lower_percentile'] = lower_percentile
+        b.config['upper_percentile'] = upper_percentile
+        return b
@@ -1,5 +1,7 @@
 from abc import (ABC, abstractmethod)
 
+import numpy as np
+
 
 class RasterTransformer(ABC):
     """Transforms raw chips to be input to a neural network."""
@@ -16,3 +18,25 @@ class RasterTransformer(ABC):
 
         """
         pass
+
+    def transform_batch(self, chips, channel_order=None, out=None):
+        """Transform a batch of chips of a raster source.
+
+        Subclasses can override this to transform the whole batch at once.
+
+        Args:
+            chips: [batch_size, height, width, channels] numpy array
+            out: optional [batch_size, height, width, channels] numpy array to
+                write the transformed chips into
+
+        Returns:
+            [batch_size, height, width, channels] numpy array, which is out if
+            it is given
+        """
+        for i, chip in enumerate(chips):
+            out_chip = self.transform(chip, channel_order)
+            if out is None:
+                out = np.empty(
+                    (len(chips), ) + out_chip.shape, dtype=out_chip.dtype)
+            out[i] = out_chip
+        return out
@@ -6,6 +6,13 @@ from rastervision.data.raster_transformer.raster_transformer \
 
 class StatsTransformer(RasterTransformer):
     """Transforms non-uint8 to uint8 values using raster_stats.
+
+    Each channel is mapped so that z-scores between -3 and 3 span 0 to 255,
+    and NODATA zero values stay zero. For 16-bit integer chips, the mapping
+    of each channel is precomputed as a lookup table, so a chip is transformed
+    with one gather per channel. Other chips are transformed with a fused
+    multiply-add in float32 (or float64 for float64 chips), which can differ
+    by one from the exact mapping due to rounding.
     """
 
     def __init__(self, raster_stats=None):
@@ -17,7 +24,62 @@ class StatsTransformer(RasterTransformer):
         """
         self.raster_stats = raster_stats
 
-    def transform(self, chip, channel_order=None):
+    @property
+    def raster_stats(self):
+        return self._raster_stats
+
+    @raster_stats.setter
+    def raster_stats(self, raster_stats):
+        self._raster_stats = raster_stats
+        self._luts = {}
+
+    def _get_scale_and_offset(self, channel_order, dtype):
+        """Return a and b so that the transform is clip(a * x + b, 0, 255)."""
+        means = np.array(self.raster_stats.means, dtype=dtype)[channel_order]
+        stds = np.array(self.raster_stats.stds, dtype=dtype)[channel_order]
+        scale = 255 / (6 * stds)
+        offset = (3 - means / stds) * (255 / 6)
+        return scale.astype(dtype), offset.astype(dtype)
+
+    def _get_lut(self, channel_order, dtype):
+        """Return a [channels, 65536] uint8 lookup table for 16-bit chips.
+
+        The table is indexed by the bits of each value viewed as uint16.
+        """
+        key = (tuple(channel_order), dtype)
+        lut = self._luts.get(key)
+        if lut is None:
+            values = np.arange(2**16, dtype=np.uint16).view(dtype)
+            means = np.array(self.raster_stats.means)[channel_order]
+            stds = np.array(self.raster_stats.stds)[channel_order]
+
+            # Make zscores that fall between -3 and 3 span 0 to 255.
+            zscores = (values[np.newaxis, :] - means[:, np.newaxis]) / \
+                stds[:, np.newaxis]
+            lut = np.clip((zscores + 3) / 6, 0, 1) * 255
+            lut = lut.astype(np.uint8)
+
+            # Don't transform NODATA zero values.
+            lut[:, values == 0] = 0
+            self._luts[key] = lut
+        return lut
+
+    def _transform_float(self, chip, channel_order, dtype, out):
+        scale, offset = self._get_scale_and_offset(channel_order, dtype)
+        values = chip.astype(dtype)
+        values *= scale
+        values += offset
+        np.clip(values, 0, 255, out=values)
+        if out is None:
+            out = values.astype(np.uint8)
+        else:
+            np.copyto(out, values, casting='unsafe')
+
+        # Don't transform NODATA zero values.
+        out[chip == 0] = 0
+        return out
+
+    def transform(self, chip, channel_order=None, out=None):
         """Transform a chip.
 
         Transforms non-uint8 to uint8 values using raster_stats.
@@ -25,39 +87,46 @@ class StatsTransformer(RasterTransformer):
         Args:
             chip: [height, width, channels] numpy array
             channel_order: The channel order to use for these statistics.
+            out: optional uint8 numpy array of the shape of chip to write the
+                transformed chip into
 
         Returns:
             [height, width, channels] uint8 numpy array
         """
-        if chip.dtype != np.uint8:
-            if self.raster_stats:
-                if channel_order is None:
-                    channel_order = np.arange(chip.shape[2])
-
-                # Subtract mean and divide by std to get zscores.
-                means = np.array(self.raster_stats.means)
-                means = means[np.newaxis, np.newaxis, channel_order].astype(
-                    np.float)
-                stds = np.array(self.raster_stats.stds)
-                stds = stds[np.newaxis, np.newaxis, channel_order].astype(
-                    np.float)
-
-                # Don't transform NODATA zero values.
-                nodata = chip == 0
-
-                chip = chip - means
-                chip = chip / stds
-
-                # Make zscores that fall between -3 and 3 span 0 to 255.
-                chip += 3
-                chip /= 6
-
-                chip = np.clip(chip, 0, 1)
-                chip *= 255
-                chip = chip.astype(np.uint8)
-
-                chip[nodata] = 0
-            else:
-                raise ValueError('raster_stats not defined.')
-
-        return chip
+        if chip.dtype == np.uint8:
+            if out is None or out is chip:
+                return chip
+            out[:] = chip
+            return out
+        if not self.raster_stats:
+            raise ValueError('raster_stats not defined.')
+        if channel_order is None:
+            channel_order = np.arange(chip.shape[-1])
+
+        if chip.dtype in (np.uint16, np.int16):
+            lut = self._get_lut(channel_order, chip.dtype)
+            indices = chip.view(np.uint16)
+            if out is None:
+                out = np.empty(chip.shape, dtype=np.uint8)
+            for i in range(chip.shape[-1]):
+                np.take(lut[i], indices[..., i], out=out[..., i], mode='clip')
+            return out
+
+        dtype = np.float64 if chip.dtype == np.float64 else np.float32
+        return self._transform_float(chip, channel_order, dtype, out)
+
+    def transform_batch(self, chips, channel_order=None, out=None):
+        """Transform a batch of chips.
+
+        Args:
+            chips: [batch_size, height, width, channels] numpy array
+            channel_order: The channel order to use for these statistics.
+            out: optional uint8 numpy array of the shape of chips to write the
+                transformed chips into
+
+        Returns:
+            [batch_size, height, width, channels] uint8 numpy array
+        """
+        # The statistics broadcast along the last axis, so the batch can be
+        # transformed like a single chip.
+        return self.transform(chips, channel_order, out=out)
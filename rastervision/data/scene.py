@@ -1,4 +1,5 @@
 from rastervision.data import ActivateMixin
+from rastervision.data.raster_source import CoverageIndex
 
 
 class Scene(ActivateMixin):
@@ -27,6 +28,22 @@ class Scene(ActivateMixin):
             self.aoi_polygons = []
         else:
             self.aoi_polygons = aoi_polygons
+        self._coverage_index = None
+
+    def get_coverage_index(self, cache_uri=None):
+        """Return a CoverageIndex of where the raster source has data.
+
+        The index is loaded or built the first time this is called, which
+        requires the scene to be activated, and is then kept with the scene.
+
+        Args:
+            cache_uri: optional URI to load the index from, or to save it to
+                if it cannot be loaded (see CoverageIndex.build_cached)
+        """
+        if self._coverage_index is None:
+            self._coverage_index = CoverageIndex.build_cached(
+                self.raster_source, cache_uri)
+        return self._coverage_index
 
     def _subcomponents_to_activate(self):
         return [
@@ -1,6 +1,67 @@
+import numpy as np
 import shapely
 
 
+def _map_to_pixel_points(rings, crs_transformer):
+    """Transform the points of a list of rings with one batched call.
+
+    Returns:
+        (points, starts) where points is a numpy array of size nx2 with the
+        points of all the rings in pixel coords, and starts has the index of
+        the first point of each ring
+    """
+    lengths = [len(ring) for ring in rings]
+    starts = np.cumsum([0] + lengths[:-1], dtype=np.int64)
+    map_points = np.array(
+        [(p[0], p[1]) for ring in rings for p in ring],
+        dtype=np.float64).reshape(-1, 2)
+    return crs_transformer.map_to_pixel_many(map_points), starts
+
+
+def map_to_pixel_rings(rings, crs_transformer):
+    """Convert rings of points from map to pixel coords.
+
+    The points of all the rings are transformed with one call to
+    crs_transformer.map_to_pixel_many.
+
+    Args:
+        rings: list of lists of (x, y) points in map coords
+        crs_transformer: CRSTransformer used to convert from map to pixel
+            coords
+
+    Returns:
+        list of numpy arrays of size nx2 with the points of each ring in pixel
+        coords
+    """
+    if not rings:
+        return []
+    points, starts = _map_to_pixel_points(rings, crs_transformer)
+    return np.split(points, starts[1:])
+
+
+def map_to_pixel_bounds(rings, crs_transformer):
+    """Return the bounds in pixel coords of rings of points in map coords.
+
+    Args:
+        rings: list of non-empty lists of (x, y) points in map coords
+        crs_transformer: CRSTransformer used to convert from map to pixel
+            coords
+
+    Returns:
+        numpy array of size nx4 with the xmin, ymin, xmax, ymax of each ring in
+        pixel coords
+    """
+    if not rings:
+        return np.empty((0, 4))
+    points, starts = _map_to_pixel_points(rings, crs_transformer)
+    return np.concatenate(
+        [
+            np.minimum.reduceat(points, starts, axis=0),
+            np.maximum.reduceat(points, starts, axis=0)
+        ],
+        axis=1)
+
+
 def geojson_to_shapes(geojson, crs_transformer):
     """Convert GeoJSON into list of shapely.geometry shape.
 
@@ -13,10 +74,11 @@ def geojson_to_shapes(geojson, crs_transformer):
     Returns:
         List of (shapely.geometry, class_id) tuples
     """
-    features = geojson['features']
-    shapes = []
-
-    for feature in features:
+    # Gather the rings of all the features to transform them at once.
+    rings = []
+    ring_types = []
+    ring_class_ids = []
+    for feature in geojson['features']:
         properties = feature.get('properties', {})
         class_id = properties.get('class_id', 1)
         geom_type = feature['geometry']['type']
@@ -24,25 +86,32 @@ def geojson_to_shapes(geojson, crs_transformer):
 
         if geom_type == 'MultiPolygon':
             for polygon in coordinates:
-                shell = polygon[0]
-                shape = [crs_transformer.map_to_pixel(p) for p in shell]
-                # Trick to handle self-intersecting polygons using buffer(0)
-                shape = shapely.geometry.Polygon(shape).buffer(0)
-                shapes.append((shape, class_id))
+                rings.append(polygon[0])
+                ring_types.append('Polygon')
+                ring_class_ids.append(class_id)
         elif geom_type == 'Polygon':
-            shell = coordinates[0]
-            shape = [crs_transformer.map_to_pixel(p) for p in shell]
-            # Trick to handle self-intersecting polygons using buffer(0)
-            shape = shapely.geometry.Polygon(shape).buffer(0)
-            shapes.append((shape, class_id))
+            rings.append(coordinates[0])
+            ring_types.append('Polygon')
+            ring_class_ids.append(class_id)
         elif geom_type == 'LineString':
-            shape = [crs_transformer.map_to_pixel(p) for p in coordinates]
-            shape = shapely.geometry.LineString(shape)
-            shapes.append((shape, class_id))
+            rings.append(coordinates)
+            ring_types.append('LineString')
+            ring_class_ids.append(class_id)
         else:
             # TODO: logging warning that this type can't be parsed.
             pass
 
+    shapes = []
+    pixel_rings = map_to_pixel_rings(rings, crs_transformer)
+    for ring, ring_type, class_id in zip(pixel_rings, ring_types,
+                                         ring_class_ids):
+        if ring_type == 'Polygon':
+            # Trick to handle self-intersecting polygons using buffer(0)
+            shape = shapely.geometry.Polygon(ring).buffer(0)
+        else:
+            shape = shapely.geometry.LineString(ring)
+        shapes.append((shape, class_id))
+
     return shapes
 
 
@@ -63,10 +132,16 @@ def boxes_to_geojson(boxes, class_ids, crs_transformer, class_map,
     Returns:
         dict in GeoJSON format
     """
+    # Transform the corners of all the boxes at once.
+    corners = [box.geojson_coordinates() for box in boxes]
+    starts = np.cumsum([0] + [len(box_corners) for box_corners in corners])
+    map_points = crs_transformer.pixel_to_map_many(
+        np.array([p for box_corners in corners for p in box_corners]).reshape(
+            -1, 2)).tolist()
+
     features = []
-    for box_ind, box in enumerate(boxes):
-        polygon = box.geojson_coordinates()
-        polygon = [list(crs_transformer.pixel_to_map(p)) for p in polygon]
+    for box_ind in range(len(boxes)):
+        polygon = map_points[starts[box_ind]:starts[box_ind + 1]]
 
         class_id = int(class_ids[box_ind])
         class_name = class_map.get_by_id(class_id).name
@@ -3,6 +3,7 @@ from sklearn import metrics
 
 from rastervision.evaluation import ClassificationEvaluation
 from rastervision.evaluation import ClassEvaluationItem
+from rastervision.data.label.chip_classification_labels import NO_CLASS_ID
 
 
 class ChipClassificationEvaluation(ClassificationEvaluation):
@@ -21,17 +22,14 @@ class ChipClassificationEvaluation(ClassificationEvaluation):
         nb_classes = len(class_map)
         class_to_eval_item = {}
 
-        gt_class_ids = []
-        pred_class_ids = []
-
-        gt_cells = gt_labels.get_cells()
-        for gt_cell in gt_cells:
-            gt_class_id = gt_labels.get_cell_class_id(gt_cell)
-            pred_class_id = pred_labels.get_cell_class_id(gt_cell)
-
-            if gt_class_id is not None and pred_class_id is not None:
-                gt_class_ids.append(gt_class_id)
-                pred_class_ids.append(pred_class_id)
+        # Match the cells of the ground truth and predictions at once.
+        pred_inds = pred_labels.get_inds(gt_labels.get_npboxes())
+        gt_class_ids = gt_labels.class_ids[pred_inds >= 0]
+        pred_class_ids = pred_labels.class_ids[pred_inds[pred_inds >= 0]]
+        has_class_ids = ((gt_class_ids != NO_CLASS_ID)
+                         & (pred_class_ids != NO_CLASS_ID))
+        gt_class_ids = gt_class_ids[has_class_ids]
+        pred_class_ids = pred_class_ids[has_class_ids]
 
         # Add 1 because class_ids start at 1.
         sklabels = np.arange(1 + nb_classes)
@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 from rastervision.evaluation import ClassEvaluationItem
 from rastervision.evaluation import ClassificationEvaluation
 
@@ -15,32 +17,38 @@ class SemanticSegmentationEvaluation(ClassificationEvaluation):
     def compute(self, ground_truth_labels, prediction_labels):
         # Definitions of precision, recall, and f1 taken from
         # http://scikit-learn.org/stable/auto_examples/model_selection/plot_precision_recall.html  # noqa
-        ground_truth_labels = ground_truth_labels.to_array()
-        prediction_labels = prediction_labels.to_array()
         # This shouldn't happen, but just in case...
-        if ground_truth_labels.shape != prediction_labels.shape:
+        if ground_truth_labels.get_extent() != prediction_labels.get_extent():
             raise ValueError(
                 'ground_truth_labels and prediction_labels need to '
-                'have the same shape.')
+                'have the same extent.')
+
+        # Count the pixels of each pair of ground truth and predicted class
+        # ids a tile at a time. Pixels outside the tiles of the ground truth
+        # have the don't care class 0, so they are not counted.
+        nb_values = 256
+        confusion = np.zeros((nb_values, nb_values), dtype=np.int64)
+        for window, gt_array in ground_truth_labels.get_tiles():
+            pred_array = prediction_labels.get(window)
+            pairs = gt_array.astype(np.int64) * nb_values + pred_array
+            confusion += np.bincount(
+                pairs.ravel(), minlength=nb_values**2).reshape(
+                    nb_values, nb_values)
+        # By assumption, ground truth pixels with class 0 are don't care.
+        confusion[0, :] = 0
 
         evaluation_items = []
         for class_id in self.class_map.get_keys():
-            not_dont_care = (ground_truth_labels != 0)  # By assumption
-            gt = (ground_truth_labels == class_id)
-            pred = (prediction_labels == class_id)
-            not_gt = (ground_truth_labels != class_id)
-            not_pred = (prediction_labels != class_id)
-
-            true_positives = (gt * pred).sum()
-            false_positives = (not_gt * pred * not_dont_care).sum()
-            false_negatives = (gt * not_pred * not_dont_care).sum()
+            true_positives = confusion[class_id, class_id]
+            false_positives = confusion[:, class_id].sum() - true_positives
+            false_negatives = confusion[class_id, :].sum() - true_positives
 
             precision = float(true_positives) / (
                 true_positives + false_positives)
             recall = float(true_positives) / (true_positives + false_negatives)
             f1 = 2 * (precision * recall) / (precision + recall)
             count_error = int(false_positives + false_negatives)
-            gt_count = int(gt.sum())
+            gt_count = int(confusion[class_id, :].sum())
             class_name = self.class_map.get_by_id(class_id).name
 
             if math.isnan(precision):
@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='rastervision/protos/analyzer.proto',
   package='rv.protos',
   syntax='proto2',
-  serialized_pb=_b('\n\"rastervision/protos/analyzer.proto\x12\trv.protos\x1a\x1cgoogle/protobuf/struct.proto\"\x8b\x01\n\x0e\x41nalyzerConfig\x12\x15\n\ranalyzer_type\x18\x01 \x02(\t\x12\x13\n\tstats_uri\x18\x02 \x01(\tH\x00\x12\x30\n\rcustom_config\x18\x03 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x42\x1b\n\x19raster_transformer_config')
+  serialized_pb=_b('\n\"rastervision/protos/analyzer.proto\x12\trv.protos\x1a\x1cgoogle/protobuf/struct.proto\"\xa7\x02\n\x0e\x41nalyzerConfig\x12\x15\n\ranalyzer_type\x18\x01 \x02(\t\x12\x13\n\tstats_uri\x18\x02 \x01(\tH\x00\x12\x30\n\rcustom_config\x18\x03 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x12\x17\n\rhistogram_uri\x18\t \x01(\tH\x00\x12\x15\n\rsample_pixels\x18\x04 \x01(\x03\x12\x1b\n\x0bsample_mode\x18\x05 \x01(\t:\x06random\x12\x16\n\x0bnum_workers\x18\x06 \x01(\x05:\x01\x31\x12\x1c\n\x11\x64ownsample_factor\x18\x07 \x01(\x05:\x01\x31\x12\x17\n\x0fstats_cache_uri\x18\x08 \x01(\tB\x1b\n\x19raster_transformer_config')
   ,
   dependencies=[google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,])
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
@@ -56,6 +56,48 @@ _ANALYZERCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='histogram_uri', full_name='rv.protos.AnalyzerConfig.histogram_uri', index=3,
+      number=9, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='sample_pixels', full_name='rv.protos.AnalyzerConfig.sample_pixels', index=4,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='sample_mode', full_name='rv.protos.AnalyzerConfig.sample_mode', index=5,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=True, default_value=_b("random").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='num_workers', full_name='rv.protos.AnalyzerConfig.num_workers', index=6,
+      number=6, type=5, cpp_type=1, label=1,
+      has_default_value=True, default_value=1,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='downsample_factor', full_name='rv.protos.AnalyzerConfig.downsample_factor', index=7,
+      number=7, type=5, cpp_type=1, label=1,
+      has_default_value=True, default_value=1,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='stats_cache_uri', full_name='rv.protos.AnalyzerConfig.stats_cache_uri', index=8,
+      number=8, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -72,7 +114,7 @@ _ANALYZERCONFIG = _descriptor.Descriptor(
       index=0, containing_type=None, fields=[]),
   ],
   serialized_start=80,
-  serialized_end=219,
+  serialized_end=375,
 )
 
 _ANALYZERCONFIG.fields_by_name['custom_config'].message_type = google_dot_protobuf_dot_struct__pb2._STRUCT
@@ -82,6 +124,9 @@ _ANALYZERCONFIG.fields_by_name['stats_uri'].containing_oneof = _ANALYZERCONFIG.o
 _ANALYZERCONFIG.oneofs_by_name['raster_transformer_config'].fields.append(
   _ANALYZERCONFIG.fields_by_name['custom_config'])
 _ANALYZERCONFIG.fields_by_name['custom_config'].containing_oneof = _ANALYZERCONFIG.oneofs_by_name['raster_transformer_config']
+_ANALYZERCONFIG.oneofs_by_name['raster_transformer_config'].fields.append(
+  _ANALYZERCONFIG.fields_by_name['histogram_uri'])
+_ANALYZERCONFIG.fields_by_name['histogram_uri'].containing_oneof = _ANALYZERCONFIG.oneofs_by_name['raster_transformer_config']
 DESCRIPTOR.message_types_by_name['AnalyzerConfig'] = _ANALYZERCONFIG
 
 AnalyzerConfig = _reflection.GeneratedProtocolMessageType('AnalyzerConfig', (_message.Message,), dict(
@@ -21,7 +21,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='rastervision/protos/raster_source.proto',
   package='rv.protos',
   syntax='proto2',
-  serialized_pb=_b('\n\'rastervision/protos/raster_source.proto\x12\trv.protos\x1a\x1cgoogle/protobuf/struct.proto\x1a,rastervision/protos/raster_transformer.proto\"\x84\x05\n\x12RasterSourceConfig\x12\x13\n\x0bsource_type\x18\x01 \x02(\t\x12\x38\n\x0ctransformers\x18\x02 \x03(\x0b\x32\".rv.protos.RasterTransformerConfig\x12\x15\n\rchannel_order\x18\x03 \x03(\x05\x12\x43\n\rgeotiff_files\x18\x04 \x01(\x0b\x32*.rv.protos.RasterSourceConfig.GeoTiffFilesH\x00\x12=\n\nimage_file\x18\x05 \x01(\x0b\x32\'.rv.protos.RasterSourceConfig.ImageFileH\x00\x12\x41\n\x0cgeojson_file\x18\x06 \x01(\x0b\x32).rv.protos.RasterSourceConfig.GeoJSONFileH\x00\x12\x30\n\rcustom_config\x18\x07 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x1a\x1c\n\x0cGeoTiffFiles\x12\x0c\n\x04uris\x18\x01 \x03(\t\x1a\x18\n\tImageFile\x12\x0b\n\x03uri\x18\x01 \x02(\t\x1a\xbe\x01\n\x0bGeoJSONFile\x12\x0b\n\x03uri\x18\x01 \x02(\t\x12W\n\x12rasterizer_options\x18\x02 \x02(\x0b\x32;.rv.protos.RasterSourceConfig.GeoJSONFile.RasterizerOptions\x1aI\n\x11RasterizerOptions\x12\x1b\n\x13\x62\x61\x63kground_class_id\x18\x02 \x02(\x05\x12\x17\n\x0bline_buffer\x18\x03 \x01(\x05:\x02\x31\x35\x42\x16\n\x14raster_source_config')
+  serialized_pb=_b('\n\'rastervision/protos/raster_source.proto\x12\trv.protos\x1a\x1cgoogle/protobuf/struct.proto\x1a,rastervision/protos/raster_transformer.proto\"\xdd\x06\n\x12RasterSourceConfig\x12\x13\n\x0bsource_type\x18\x01 \x02(\t\x12\x38\n\x0ctransformers\x18\x02 \x03(\x0b\x32\".rv.protos.RasterTransformerConfig\x12\x15\n\rchannel_order\x18\x03 \x03(\x05\x12\x43\n\rgeotiff_files\x18\x04 \x01(\x0b\x32*.rv.protos.RasterSourceConfig.GeoTiffFilesH\x00\x12=\n\nimage_file\x18\x05 \x01(\x0b\x32\'.rv.protos.RasterSourceConfig.ImageFileH\x00\x12\x41\n\x0cgeojson_file\x18\x06 \x01(\x0b\x32).rv.protos.RasterSourceConfig.GeoJSONFileH\x00\x12\x30\n\rcustom_config\x18\x07 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x12?\n\x0bmemmap_file\x18\x08 \x01(\x0b\x32(.rv.protos.RasterSourceConfig.MemmapFileH\x00\x1aP\n\x0cGeoTiffFiles\x12\x0c\n\x04uris\x18\x01 \x03(\t\x12\x1b\n\x10\x62lock_cache_size\x18\x02 \x01(\x03:\x01\x30\x12\x15\n\x06stream\x18\x03 \x01(\x08:\x05\x66\x61lse\x1a\x18\n\tImageFile\x12\x0b\n\x03uri\x18\x01 \x02(\t\x1a-\n\nMemmapFile\x12\x0b\n\x03uri\x18\x01 \x02(\t\x12\x12\n\ngeoref_uri\x18\x02 \x01(\t\x1a\xf3\x01\n\x0bGeoJSONFile\x12\x0b\n\x03uri\x18\x01 \x02(\t\x12W\n\x12rasterizer_options\x18\x02 \x02(\x0b\x32;.rv.protos.RasterSourceConfig.GeoJSONFile.RasterizerOptions\x12\x17\n\x08windowed\x18\x03 \x01(\x08:\x05\x66\x61lse\x12\x1a\n\x0ftile_cache_size\x18\x04 \x01(\x03:\x01\x30\x1aI\n\x11RasterizerOptions\x12\x1b\n\x13\x62\x61\x63kground_class_id\x18\x02 \x02(\x05\x12\x17\n\x0bline_buffer\x18\x03 \x01(\x05:\x02\x31\x35\x42\x16\n\x14raster_source_config')
   ,
   dependencies=[google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,rastervision_dot_protos_dot_raster__transformer__pb2.DESCRIPTOR,])
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
@@ -43,6 +43,20 @@ _RASTERSOURCECONFIG_GEOTIFFFILES = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='block_cache_size', full_name='rv.protos.RasterSourceConfig.GeoTiffFiles.block_cache_size', index=1,
+      number=2, type=3, cpp_type=2, label=1,
+      has_default_value=True, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='stream', full_name='rv.protos.RasterSourceConfig.GeoTiffFiles.stream', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=True, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -55,8 +69,8 @@ _RASTERSOURCECONFIG_GEOTIFFFILES = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=504,
-  serialized_end=532,
+  serialized_start=569,
+  serialized_end=649,
 )
 
 _RASTERSOURCECONFIG_IMAGEFILE = _descriptor.Descriptor(
@@ -85,8 +99,45 @@ _RASTERSOURCECONFIG_IMAGEFILE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=534,
-  serialized_end=558,
+  serialized_start=651,
+  serialized_end=675,
+)
+
+_RASTERSOURCECONFIG_MEMMAPFILE = _descriptor.Descriptor(
+  name='MemmapFile',
+  full_name='rv.protos.RasterSourceConfig.MemmapFile',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='uri', full_name='rv.protos.RasterSourceConfig.MemmapFile.uri', index=0,
+      number=1, type=9, cpp_type=9, label=2,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='georef_uri', full_name='rv.protos.RasterSourceConfig.MemmapFile.georef_uri', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto2',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=677,
+  serialized_end=722,
 )
 
 _RASTERSOURCECONFIG_GEOJSONFILE_RASTERIZEROPTIONS = _descriptor.Descriptor(
@@ -122,8 +173,8 @@ _RASTERSOURCECONFIG_GEOJSONFILE_RASTERIZEROPTIONS = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=678,
-  serialized_end=751,
+  serialized_start=895,
+  serialized_end=968,
 )
 
 _RASTERSOURCECONFIG_GEOJSONFILE = _descriptor.Descriptor(
@@ -147,6 +198,20 @@ _RASTERSOURCECONFIG_GEOJSONFILE = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='windowed', full_name='rv.protos.RasterSourceConfig.GeoJSONFile.windowed', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=True, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='tile_cache_size', full_name='rv.protos.RasterSourceConfig.GeoJSONFile.tile_cache_size', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=True, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
@@ -159,8 +224,8 @@ _RASTERSOURCECONFIG_GEOJSONFILE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=561,
-  serialized_end=751,
+  serialized_start=725,
+  serialized_end=968,
 )
 
 _RASTERSOURCECONFIG = _descriptor.Descriptor(
@@ -219,10 +284,17 @@ _RASTERSOURCECONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='memmap_file', full_name='rv.protos.RasterSourceConfig.memmap_file', index=7,
+      number=8, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
-  nested_types=[_RASTERSOURCECONFIG_GEOTIFFFILES, _RASTERSOURCECONFIG_IMAGEFILE, _RASTERSOURCECONFIG_GEOJSONFILE, ],
+  nested_types=[_RASTERSOURCECONFIG_GEOTIFFFILES, _RASTERSOURCECONFIG_IMAGEFILE, _RASTERSOURCECONFIG_MEMMAPFILE, _RASTERSOURCECONFIG_GEOJSONFILE, ],
   enum_types=[
   ],
   options=None,
@@ -235,11 +307,12 @@ _RASTERSOURCECONFIG = _descriptor.Descriptor(
       index=0, containing_type=None, fields=[]),
   ],
   serialized_start=131,
-  serialized_end=775,
+  serialized_end=992,
 )
 
 _RASTERSOURCECONFIG_GEOTIFFFILES.containing_type = _RASTERSOURCECONFIG
 _RASTERSOURCECONFIG_IMAGEFILE.containing_type = _RASTERSOURCECONFIG
+_RASTERSOURCECONFIG_MEMMAPFILE.containing_type = _RASTERSOURCECONFIG
 _RASTERSOURCECONFIG_GEOJSONFILE_RASTERIZEROPTIONS.containing_type = _RASTERSOURCECONFIG_GEOJSONFILE
 _RASTERSOURCECONFIG_GEOJSONFILE.fields_by_name['rasterizer_options'].message_type = _RASTERSOURCECONFIG_GEOJSONFILE_RASTERIZEROPTIONS
 _RASTERSOURCECONFIG_GEOJSONFILE.containing_type = _RASTERSOURCECONFIG
@@ -248,6 +321,7 @@ _RASTERSOURCECONFIG.fields_by_name['geotiff_files'].message_type = _RASTERSOURCE
 _RASTERSOURCECONFIG.fields_by_name['image_file'].message_type = _RASTERSOURCECONFIG_IMAGEFILE
 _RASTERSOURCECONFIG.fields_by_name['geojson_file'].message_type = _RASTERSOURCECONFIG_GEOJSONFILE
 _RASTERSOURCECONFIG.fields_by_name['custom_config'].message_type = google_dot_protobuf_dot_struct__pb2._STRUCT
+_RASTERSOURCECONFIG.fields_by_name['memmap_file'].message_type = _RASTERSOURCECONFIG_MEMMAPFILE
 _RASTERSOURCECONFIG.oneofs_by_name['raster_source_config'].fields.append(
   _RASTERSOURCECONFIG.fields_by_name['geotiff_files'])
 _RASTERSOURCECONFIG.fields_by_name['geotiff_files'].containing_oneof = _RASTERSOURCECONFIG.oneofs_by_name['raster_source_config']
@@ -260,6 +334,9 @@ _RASTERSOURCECONFIG.fields_by_name['geojson_file'].containing_oneof = _RASTERSOU
 _RASTERSOURCECONFIG.oneofs_by_name['raster_source_config'].fields.append(
   _RASTERSOURCECONFIG.fields_by_name['custom_config'])
 _RASTERSOURCECONFIG.fields_by_name['custom_config'].containing_oneof = _RASTERSOURCECONFIG.oneofs_by_name['raster_source_config']
+_RASTERSOURCECONFIG.oneofs_by_name['raster_source_config'].fields.append(
+  _RASTERSOURCECONFIG.fields_by_name['memmap_file'])
+_RASTERSOURCECONFIG.fields_by_name['memmap_file'].containing_oneof = _RASTERSOURCECONFIG.oneofs_by_name['raster_source_config']
 DESCRIPTOR.message_types_by_name['RasterSourceConfig'] = _RASTERSOURCECONFIG
 
 RasterSourceConfig = _reflection.GeneratedProtocolMessageType('RasterSourceConfig', (_message.Message,), dict(
@@ -278,6 +355,13 @@ RasterSourceConfig = _reflection.GeneratedProtocolMessageType('RasterSourceConfi
     ))
   ,
 
+  MemmapFile = _reflection.GeneratedProtocolMessageType('MemmapFile', (_message.Message,), dict(
+    DESCRIPTOR = _RASTERSOURCECONFIG_MEMMAPFILE,
+    __module__ = 'rastervision.protos.raster_source_pb2'
+    # @@protoc_insertion_point(class_scope:rv.protos.RasterSourceConfig.MemmapFile)
+    ))
+  ,
+
   GeoJSONFile = _reflection.GeneratedProtocolMessageType('GeoJSONFile', (_message.Message,), dict(
 
     RasterizerOptions = _reflection.GeneratedProtocolMessageType('RasterizerOptions', (_message.Message,), dict(
@@ -298,6 +382,7 @@ RasterSourceConfig = _reflection.GeneratedProtocolMessageType('RasterSourceConfi
 _sym_db.RegisterMessage(RasterSourceConfig)
 _sym_db.RegisterMessage(RasterSourceConfig.GeoTiffFiles)
 _sym_db.RegisterMessage(RasterSourceConfig.ImageFile)
+_sym_db.RegisterMessage(RasterSourceConfig.MemmapFile)
 _sym_db.RegisterMessage(RasterSourceConfig.GeoJSONFile)
 _sym_db.RegisterMessage(RasterSourceConfig.GeoJSONFile.RasterizerOptions)
 
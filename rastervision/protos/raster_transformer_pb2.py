@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='rastervision/protos/raster_transformer.proto',
   package='rv.protos',
   syntax='proto2',
-  serialized_pb=_b('\n,rastervision/protos/raster_transformer.proto\x12\trv.protos\x1a\x1cgoogle/protobuf/struct.proto\"\x97\x01\n\x17RasterTransformerConfig\x12\x18\n\x10transformer_type\x18\x01 \x02(\t\x12\x13\n\tstats_uri\x18\x04 \x01(\tH\x00\x12\x30\n\rcustom_config\x18\x05 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x42\x1b\n\x19raster_transformer_config')
+  serialized_pb=_b('\n,rastervision/protos/raster_transformer.proto\x12\trv.protos\x1a\x1cgoogle/protobuf/struct.proto\"\xde\x02\n\x17RasterTransformerConfig\x12\x18\n\x10transformer_type\x18\x01 \x02(\t\x12\x13\n\tstats_uri\x18\x04 \x01(\tH\x00\x12\x30\n\rcustom_config\x18\x05 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x12Z\n\x16percentile_transformer\x18\x06 \x01(\x0b\x32\x38.rv.protos.RasterTransformerConfig.PercentileTransformerH\x00\x1ai\n\x15PercentileTransformer\x12\x15\n\rhistogram_uri\x18\x01 \x01(\t\x12\x1b\n\x10lower_percentile\x18\x02 \x01(\x02:\x01\x32\x12\x1c\n\x10upper_percentile\x18\x03 \x01(\x02:\x02\x39\x38\x42\x1b\n\x19raster_transformer_config')
   ,
   dependencies=[google_dot_protobuf_dot_struct__pb2.DESCRIPTOR,])
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
@@ -28,6 +28,50 @@ _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 
 
+_RASTERTRANSFORMERCONFIG_PERCENTILETRANSFORMER = _descriptor.Descriptor(
+  name='PercentileTransformer',
+  full_name='rv.protos.RasterTransformerConfig.PercentileTransformer',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='histogram_uri', full_name='rv.protos.RasterTransformerConfig.PercentileTransformer.histogram_uri', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='lower_percentile', full_name='rv.protos.RasterTransformerConfig.PercentileTransformer.lower_percentile', index=1,
+      number=2, type=2, cpp_type=6, label=1,
+      has_default_value=True, default_value=float(2),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='upper_percentile', full_name='rv.protos.RasterTransformerConfig.PercentileTransformer.upper_percentile', index=2,
+      number=3, type=2, cpp_type=6, label=1,
+      has_default_value=True, default_value=float(98),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto2',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=306,
+  serialized_end=411,
+)
+
 _RASTERTRANSFORMERCONFIG = _descriptor.Descriptor(
   name='RasterTransformerConfig',
   full_name='rv.protos.RasterTransformerConfig',
@@ -56,10 +100,17 @@ _RASTERTRANSFORMERCONFIG = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       options=None),
+    _descriptor.FieldDescriptor(
+      name='percentile_transformer', full_name='rv.protos.RasterTransformerConfig.percentile_transformer', index=3,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
   ],
   extensions=[
   ],
-  nested_types=[],
+  nested_types=[_RASTERTRANSFORMERCONFIG_PERCENTILETRANSFORMER, ],
   enum_types=[
   ],
   options=None,
@@ -72,24 +123,37 @@ _RASTERTRANSFORMERCONFIG = _descriptor.Descriptor(
       index=0, containing_type=None, fields=[]),
   ],
   serialized_start=90,
-  serialized_end=241,
+  serialized_end=440,
 )
 
+_RASTERTRANSFORMERCONFIG_PERCENTILETRANSFORMER.containing_type = _RASTERTRANSFORMERCONFIG
 _RASTERTRANSFORMERCONFIG.fields_by_name['custom_config'].message_type = google_dot_protobuf_dot_struct__pb2._STRUCT
+_RASTERTRANSFORMERCONFIG.fields_by_name['percentile_transformer'].message_type = _RASTERTRANSFORMERCONFIG_PERCENTILETRANSFORMER
 _RASTERTRANSFORMERCONFIG.oneofs_by_name['raster_transformer_config'].fields.append(
   _RASTERTRANSFORMERCONFIG.fields_by_name['stats_uri'])
 _RASTERTRANSFORMERCONFIG.fields_by_name['stats_uri'].containing_oneof = _RASTERTRANSFORMERCONFIG.oneofs_by_name['raster_transformer_config']
 _RASTERTRANSFORMERCONFIG.oneofs_by_name['raster_transformer_config'].fields.append(
   _RASTERTRANSFORMERCONFIG.fields_by_name['custom_config'])
 _RASTERTRANSFORMERCONFIG.fields_by_name['custom_config'].containing_oneof = _RASTERTRANSFORMERCONFIG.oneofs_by_name['raster_transformer_config']
+_RASTERTRANSFORMERCONFIG.oneofs_by_name['raster_transformer_config'].fields.append(
+  _RASTERTRANSFORMERCONFIG.fields_by_name['percentile_transformer'])
+_RASTERTRANSFORMERCONFIG.fields_by_name['percentile_transformer'].containing_oneof = _RASTERTRANSFORMERCONFIG.oneofs_by_name['raster_transformer_config']
 DESCRIPTOR.message_types_by_name['RasterTransformerConfig'] = _RASTERTRANSFORMERCONFIG
 
 RasterTransformerConfig = _reflection.GeneratedProtocolMessageType('RasterTransformerConfig', (_message.Message,), dict(
+
+  PercentileTransformer = _reflection.GeneratedProtocolMessageType('PercentileTransformer', (_message.Message,), dict(
+    DESCRIPTOR = _RASTERTRANSFORMERCONFIG_PERCENTILETRANSFORMER,
+    __module__ = 'rastervision.protos.raster_transformer_pb2'
+    # @@protoc_insertion_point(class_scope:rv.protos.RasterTransformerConfig.PercentileTransformer)
+    ))
+  ,
   DESCRIPTOR = _RASTERTRANSFORMERCONFIG,
   __module__ = 'rastervision.protos.raster_transformer_pb2'
   # @@protoc_insertion_point(class_scope:rv.protos.RasterTransformerConfig)
   ))
 _sym_db.RegisterMessage(RasterTransformerConfig)
+_sym_db.RegisterMessage(RasterTransformerConfig.PercentileTransformer)
 
 
 # @@protoc_insertion_point(module_scope)
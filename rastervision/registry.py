@@ -5,7 +5,7 @@ from rastervision.rv_config import RVConfig
 from rastervision.plugin import PluginRegistry
 from rastervision.data.raster_source.default import (
     GeoTiffSourceDefaultProvider, ImageSourceDefaultProvider,
-    GeoJSONSourceDefaultProvider)
+    GeoJSONSourceDefaultProvider, MemmapSourceDefaultProvider)
 from rastervision.data.label_source.default import (
     ObjectDetectionGeoJSONSourceDefaultProvider,
     ChipClassificationGeoJSONSourceDefaultProvider,
@@ -53,6 +53,8 @@ class Registry:
             # Raster Transformers
             (rv.RASTER_TRANSFORMER, rv.STATS_TRANSFORMER):
             rv.data.StatsTransformerConfigBuilder,
+            (rv.RASTER_TRANSFORMER, rv.PERCENTILE_TRANSFORMER):
+            rv.data.PercentileTransformerConfigBuilder,
 
             # Raster Sources
             (rv.RASTER_SOURCE, rv.GEOTIFF_SOURCE):
@@ -61,6 +63,8 @@ class Registry:
             rv.data.GeoJSONSourceConfigBuilder,
             (rv.RASTER_SOURCE, rv.IMAGE_SOURCE):
             rv.data.ImageSourceConfigBuilder,
+            (rv.RASTER_SOURCE, rv.MEMMAP_SOURCE):
+            rv.data.MemmapSourceConfigBuilder,
 
             # Label Sources
             (rv.LABEL_SOURCE, rv.OBJECT_DETECTION_GEOJSON):
@@ -81,6 +85,8 @@ class Registry:
             # Analyzers
             (rv.ANALYZER, rv.STATS_ANALYZER):
             rv.analyzer.StatsAnalyzerConfigBuilder,
+            (rv.ANALYZER, rv.HISTOGRAM_ANALYZER):
+            rv.analyzer.HistogramAnalyzerConfigBuilder,
 
             # Augmentors
             (rv.AUGMENTOR, rv.NODATA_AUGMENTOR):
@@ -98,6 +104,7 @@ class Registry:
         self._internal_default_raster_sources = [
             GeoTiffSourceDefaultProvider,
             GeoJSONSourceDefaultProvider,
+            MemmapSourceDefaultProvider,
             # This is the catch-all case, ensure it's on the bottom of the search stack.
             ImageSourceDefaultProvider
         ]
@@ -8,9 +8,20 @@ from rastervision.core import Box
 from rastervision.task import Task
 from rastervision.utils.files import (get_local_path, upload_or_copy, make_dir)
 
+# Debug images of larger scenes are drawn over a reduced resolution image.
+DEBUG_PREDICT_IMAGE_MAX_SIZE = 4096
 
-def draw_debug_predict_image(scene, class_map):
-    img = scene.raster_source.get_image_array()
+
+def draw_debug_predict_image(scene, class_map, max_size=None):
+    raster_source = scene.raster_source
+    extent = raster_source.get_extent()
+    scale = 1.0
+    out_shape = None
+    if max_size and max(extent.get_height(), extent.get_width()) > max_size:
+        scale = max_size / max(extent.get_height(), extent.get_width())
+        out_shape = (max(1, round(extent.get_height() * scale)),
+                     max(1, round(extent.get_width() * scale)))
+    img = raster_source.get_image_array(out_shape=out_shape)
     img = Image.fromarray(img)
     draw = ImageDraw.Draw(img, 'RGB')
     labels = scene.prediction_label_store.get_labels()
@@ -19,6 +30,8 @@ def draw_debug_predict_image(scene, class_map):
         'red', 'orange', 'yellow', 'green', 'brown', 'pink', 'purple'
     ]
     for cell, class_id in zip(labels.get_cells(), labels.get_class_ids()):
+        if scale != 1.0:
+            cell = Box(*[c * scale for c in cell.tuple_format()])
         cell = cell.make_eroded(line_width // 2)
         coords = cell.geojson_coordinates()
         color = class_map.get_by_id(class_id).color
@@ -37,6 +50,7 @@ class ChipClassification(Task):
         windows = extent.get_windows(chip_size, stride)
         if scene.aoi_polygons:
             windows = Box.filter_by_aoi(windows, scene.aoi_polygons)
+        windows = self.filter_windows_with_data(scene, windows)
         for window in windows:
             chip = scene.raster_source.get_chip(window)
             if np.sum(chip.ravel()) > 0:
@@ -55,7 +69,10 @@ class ChipClassification(Task):
         return extent.get_windows(chip_size, stride)
 
     def save_debug_predict_image(self, scene, debug_dir_uri):
-        img = draw_debug_predict_image(scene, self.config.class_map)
+        img = draw_debug_predict_image(
+            scene,
+            self.config.class_map,
+            max_size=DEBUG_PREDICT_IMAGE_MAX_SIZE)
         # Saving to a jpg leads to segfault for unknown reasons.
         debug_image_uri = join(debug_dir_uri, scene.id + '.png')
         with RVConfig.get_tmp_dir() as temp_dir:
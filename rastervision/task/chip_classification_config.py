@@ -16,9 +16,12 @@ class ChipClassificationConfig(TaskConfig):
                  predict_package_uri=None,
                  debug=False,
                  predict_debug_uri=None,
-                 chip_size=300):
+                 chip_size=300,
+                 use_coverage_index=True,
+                 coverage_index_uri=None):
         super().__init__(rv.CHIP_CLASSIFICATION, predict_batch_size,
-                         predict_package_uri, debug, predict_debug_uri)
+                         predict_package_uri, debug, predict_debug_uri,
+                         use_coverage_index, coverage_index_uri)
         self.class_map = class_map
         self.chip_size = chip_size
 
@@ -29,10 +32,14 @@ class ChipClassificationConfig(TaskConfig):
         conf = TaskConfigMsg.ChipClassificationConfig(
             chip_size=self.chip_size, class_items=self.class_map.to_proto())
         return TaskConfigMsg(
-            task_type=rv.CHIP_CLASSIFICATION, chip_classification_config=conf)
+            task_type=rv.CHIP_CLASSIFICATION,
+            use_coverage_index=self.use_coverage_index,
+            coverage_index_uri=self.coverage_index_uri,
+            chip_classification_config=conf)
 
     def save_bundle_files(self, bundle_dir):
-        return (self, [])
+        # Coverage indexes are only saved for the scenes of the experiment.
+        return (self.to_builder().with_coverage_index_uri(None).build(), [])
 
     def load_bundle_files(self, bundle_dir):
         return self
@@ -48,7 +55,9 @@ class ChipClassificationConfigBuilder(TaskConfigBuilder):
                 'predict_batch_size': prev.predict_batch_size,
                 'predict_package_uri': prev.predict_package_uri,
                 'debug': prev.debug,
-                'predict_debug_uri': prev.predict_debug_uri
+                'predict_debug_uri': prev.predict_debug_uri,
+                'use_coverage_index': prev.use_coverage_index,
+                'coverage_index_uri': prev.coverage_index_uri
             }
         super().__init__(ChipClassificationConfig, config)
 
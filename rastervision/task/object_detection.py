@@ -1,8 +1,9 @@
 import numpy as np
 import logging
 
-from rastervision.task import Task
+from rastervision.task import (Task, PredictionsMerger)
 from rastervision.data import ObjectDetectionLabels
+from rastervision.data.label import box_ops
 from rastervision.core import Box
 
 log = logging.getLogger(__name__)
@@ -67,12 +68,13 @@ def make_neg_windows(raster_source, label_store, chip_size, nb_windows,
             window = extent.make_random_square(chip_size)
             if any(filter_windows([window])):
                 break
-        chip = raster_source.get_chip(window)
         labels = ObjectDetectionLabels.get_overlapping(
             label_store.get_labels(), window, ioa_thresh=0.2)
 
-        # If no labels and not blank, append the chip
-        if len(labels) == 0 and np.sum(chip.ravel()) > 0:
+        # If no labels and not blank, append the chip. The chip is only read
+        # if the window has no labels.
+        if len(labels) == 0 and np.sum(
+                raster_source.get_chip(window).ravel()) > 0:
             neg_windows.append(window)
 
         if len(neg_windows) == nb_windows:
@@ -81,6 +83,73 @@ def make_neg_windows(raster_source, label_store, chip_size, nb_windows,
     return list(neg_windows)
 
 
+class NMSPredictionsMerger(PredictionsMerger):
+    """Runs non-maximum suppression on predictions as they are added.
+
+    The prediction windows are in row-major order and predicted boxes lie
+    within their windows, so once a window starting at row y has been added,
+    no box added later can overlap a box that ends above y. Such boxes are
+    run through non-maximum suppression and set aside, unless they are
+    linked through a chain of overlapping boxes to a box that may still
+    overlap later boxes. Only the boxes of the last rows of windows are kept
+    pending, and the result is the same as running non-maximum suppression
+    over all the predictions at the end.
+    """
+
+    def __init__(self, task, scene):
+        super().__init__(task, scene)
+        self.score_thresh = task.config.predict_options.score_thresh
+        self.merge_thresh = task.config.predict_options.merge_thresh
+        self.pending = ObjectDetectionLabels.make_empty()
+        self.done = []
+
+    def add(self, labels, windows):
+        # Boxes under the score threshold are dropped by non-maximum
+        # suppression without suppressing other boxes.
+        labels = labels.get_subset(labels.get_scores() > self.score_thresh)
+        self.pending = self.pending + labels
+        if windows:
+            self._prune_pending(windows[-1].ymin)
+
+    def _get_held(self, ymin):
+        """Return a mask of the pending boxes that may overlap later boxes.
+
+        Args:
+            ymin: rows above this cannot contain later boxes
+        """
+        npboxes = self.pending.get_npboxes()
+        is_held = npboxes[:, 2] > ymin
+        # Boxes ending above ymin can only overlap held boxes that start
+        # above ymin.
+        frontier = np.flatnonzero(is_held & (npboxes[:, 0] < ymin))
+        while len(frontier) > 0:
+            candidates = np.flatnonzero(~is_held)
+            candidates = candidates[
+                npboxes[candidates, 2] > npboxes[frontier, 0].min()]
+            if len(candidates) == 0:
+                break
+            ious = box_ops.get_ious(npboxes[frontier], npboxes[candidates])
+            frontier = candidates[(ious > self.merge_thresh).any(axis=0)]
+            is_held[frontier] = True
+        return is_held
+
+    def _prune_pending(self, ymin):
+        is_held = self._get_held(ymin)
+        if is_held.all():
+            return
+        self.done.append(
+            ObjectDetectionLabels.prune_duplicates(
+                self.pending.get_subset(~is_held),
+                score_thresh=self.score_thresh,
+                merge_thresh=self.merge_thresh))
+        self.pending = self.pending.get_subset(is_held)
+
+    def get_labels(self):
+        self._prune_pending(np.inf)
+        return ObjectDetectionLabels.concatenate_all(
+            [ObjectDetectionLabels.make_empty()] + self.done)
+
+
 class ObjectDetection(Task):
     def get_train_windows(self, scene):
         raster_source = scene.raster_source
@@ -91,6 +160,10 @@ class ObjectDetection(Task):
                 windows = Box.filter_by_aoi(windows, scene.aoi_polygons)
             return windows
 
+        def filter_empty_windows(windows):
+            windows = filter_windows(windows)
+            return self.filter_windows_with_data(scene, windows)
+
         window_method = self.config.chip_options.window_method
         if window_method == 'sliding':
             chip_size = self.config.chip_size
@@ -120,7 +193,7 @@ class ObjectDetection(Task):
         max_attempts = 100 * nb_neg_windows
         neg_windows = make_neg_windows(raster_source, label_store,
                                        self.config.chip_size, nb_neg_windows,
-                                       max_attempts, filter_windows)
+                                       max_attempts, filter_empty_windows)
 
         return pos_windows + neg_windows
 
@@ -144,6 +217,14 @@ class ObjectDetection(Task):
             score_thresh=self.config.predict_options.score_thresh,
             merge_thresh=self.config.predict_options.merge_thresh)
 
+    def get_predictions_merger(self, scene):
+        # Running non-maximum suppression as predictions are added is only
+        # the same as post_process_predictions if it is not overridden.
+        if type(self).post_process_predictions is not \
+                ObjectDetection.post_process_predictions:
+            return super().get_predictions_merger(scene)
+        return NMSPredictionsMerger(self, scene)
+
     def save_debug_predict_image(self, scene, debug_dir_uri):
         # TODO implement this
         pass
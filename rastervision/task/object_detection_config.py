@@ -34,9 +34,12 @@ class ObjectDetectionConfig(TaskConfig):
                  predict_debug_uri=None,
                  chip_size=300,
                  chip_options=ChipOptions(),
-                 predict_options=PredictOptions()):
+                 predict_options=PredictOptions(),
+                 use_coverage_index=True,
+                 coverage_index_uri=None):
         super().__init__(rv.OBJECT_DETECTION, predict_batch_size,
-                         predict_package_uri, debug, predict_debug_uri)
+                         predict_package_uri, debug, predict_debug_uri,
+                         use_coverage_index, coverage_index_uri)
         self.class_map = class_map
         self.chip_size = chip_size
         self.chip_options = chip_options
@@ -67,7 +70,8 @@ class ObjectDetectionConfig(TaskConfig):
         return msg
 
     def save_bundle_files(self, bundle_dir):
-        return (self, [])
+        # Coverage indexes are only saved for the scenes of the experiment.
+        return (self.to_builder().with_coverage_index_uri(None).build(), [])
 
     def load_bundle_files(self, bundle_dir):
         return self
@@ -82,6 +86,8 @@ class ObjectDetectionConfigBuilder(TaskConfigBuilder):
                 'predict_package_uri': prev.predict_package_uri,
                 'debug': prev.debug,
                 'predict_debug_uri': prev.predict_debug_uri,
+                'use_coverage_index': prev.use_coverage_index,
+                'coverage_index_uri': prev.coverage_index_uri,
                 'class_map': prev.class_map,
                 'chip_size': prev.chip_size,
                 'chip_options': prev.chip_options,
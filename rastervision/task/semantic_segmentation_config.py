@@ -33,9 +33,16 @@ class SemanticSegmentationConfig(TaskConfig):
                  predict_package_uri=None,
                  debug=True,
                  chip_size=300,
-                 chip_options=None):
-        super().__init__(rv.SEMANTIC_SEGMENTATION, predict_batch_size,
-                         predict_package_uri, debug)
+                 chip_options=None,
+                 use_coverage_index=True,
+                 coverage_index_uri=None):
+        super().__init__(
+            rv.SEMANTIC_SEGMENTATION,
+            predict_batch_size,
+            predict_package_uri,
+            debug,
+            use_coverage_index=use_coverage_index,
+            coverage_index_uri=coverage_index_uri)
         self.class_map = class_map
         self.chip_size = chip_size
         if chip_options is None:
@@ -43,7 +50,8 @@ class SemanticSegmentationConfig(TaskConfig):
         self.chip_options = chip_options
 
     def save_bundle_files(self, bundle_dir):
-        return (self, [])
+        # Coverage indexes are only saved for the scenes of the experiment.
+        return (self.to_builder().with_coverage_index_uri(None).build(), [])
 
     def load_bundle_files(self, bundle_dir):
         return self
@@ -80,6 +88,8 @@ class SemanticSegmentationConfigBuilder(TaskConfigBuilder):
                 'predict_batch_size': prev.predict_batch_size,
                 'predict_package_uri': prev.predict_package_uri,
                 'debug': prev.debug,
+                'use_coverage_index': prev.use_coverage_index,
+                'coverage_index_uri': prev.coverage_index_uri,
                 'class_map': prev.class_map,
                 'chip_size': prev.chip_size,
                 'chip_options': prev.chip_options
@@ -89,6 +99,8 @@ class SemanticSegmentationConfigBuilder(TaskConfigBuilder):
     def from_proto(self, msg):
         conf = msg.semantic_segmentation_config
         b = SemanticSegmentationConfigBuilder()
+        if msg.HasField('coverage_index_uri'):
+            b = b.with_coverage_index_uri(msg.coverage_index_uri)
 
         negative_survival_probability = conf.chip_options \
                                             .negative_survival_probability
@@ -97,6 +109,7 @@ class SemanticSegmentationConfigBuilder(TaskConfigBuilder):
                 .with_predict_batch_size(msg.predict_batch_size) \
                 .with_predict_package_uri(msg.predict_package_uri) \
                 .with_debug(msg.debug) \
+                .with_coverage_index(msg.use_coverage_index) \
                 .with_chip_size(conf.chip_size) \
                 .with_chip_options(
                     window_method=conf.chip_options.window_method,
@@ -1,9 +1,11 @@
 from abc import abstractmethod
 
-import numpy as np
 import logging
 
+import numpy as np
+
 from rastervision.core.training_data import TrainingData
+from rastervision.data.label import LabelsBuilder
 
 # TODO: DRY... same keys as in ml_backends/tf_object_detection_api.py
 TRAIN = 'train'
@@ -12,6 +14,37 @@ VALIDATION = 'validation'
 log = logging.getLogger(__name__)
 
 
+class PredictionsMerger(object):
+    """Combines the predictions made for the windows of a scene.
+
+    Predictions are added one batch of windows at a time, in the order of
+    the windows returned by Task.get_predict_windows. By default, they are
+    accumulated and post-processed with Task.post_process_predictions once
+    they have all been added. Subclasses can post-process them as they
+    arrive instead.
+    """
+
+    def __init__(self, task, scene):
+        self.task = task
+        self.scene = scene
+        self.builder = LabelsBuilder(
+            scene.prediction_label_store.empty_labels())
+
+    def add(self, labels, windows):
+        """Add the predictions for a batch of windows.
+
+        Args:
+            labels: Labels predicted for the windows
+            windows: list of Box, the windows of the batch
+        """
+        self.builder.add(labels)
+
+    def get_labels(self):
+        """Return the post-processed predictions for the scene."""
+        return self.task.post_process_predictions(self.builder.build(),
+                                                  self.scene)
+
+
 class Task(object):
     """Functionality for a specific machine learning task.
 
@@ -65,6 +98,29 @@ class Task(object):
         """
         pass
 
+    def filter_windows_with_data(self, scene, windows):
+        """Drop windows without data if the coverage index is enabled.
+
+        Args:
+            scene: Scene whose raster source is activated
+            windows: list of Boxes
+
+        Returns:
+            list of Boxes
+        """
+        if not self.config.use_coverage_index:
+            return windows
+        cache_uri = self.config.get_coverage_index_uri(scene.id)
+        return scene.get_coverage_index(cache_uri).filter_windows(windows)
+
+    def get_predictions_merger(self, scene):
+        """Return a PredictionsMerger for the predictions of a scene.
+
+        The labels it returns must be those of post_process_predictions on
+        all the predictions of the scene.
+        """
+        return PredictionsMerger(self, scene)
+
     @abstractmethod
     def get_predict_windows(self, extent):
         """Return windows to compute predictions for.
@@ -105,8 +161,17 @@ class Task(object):
                 log.info('Making {} chips for scene: {}'.format(
                     type_, scene.id))
                 windows = self.get_train_windows(scene)
-                for window in windows:
-                    chip = scene.raster_source.get_chip(window)
+                # Windows of the same size can be read as a single batch.
+                sizes = set((window.get_height(), window.get_width())
+                            for window in windows)
+                if len(sizes) == 1:
+                    chips = scene.raster_source.get_chips(windows)
+                else:
+                    chips = [
+                        scene.raster_source.get_chip(window)
+                        for window in windows
+                    ]
+                for chip, window in zip(chips, windows):
                     labels = self.get_train_labels(window, scene)
                     data.append(chip, window, labels)
                 # Shuffle data so the first N samples which are displayed in
@@ -161,34 +226,42 @@ class Task(object):
         """Predict on a single scene, and return the labels."""
         log.info('Making predictions for scene')
         raster_source = scene.raster_source
-        label_store = scene.prediction_label_store
-        labels = label_store.empty_labels()
+        merger = self.get_predictions_merger(scene)
 
         with scene.activate():
             windows = self.get_predict_windows(raster_source.get_extent())
-
-            def predict_batch(predict_chips, predict_windows):
-                nonlocal labels
-                new_labels = self.backend.predict(
-                    np.array(predict_chips), predict_windows, tmp_dir)
-                labels += new_labels
-                print('.' * len(predict_chips), end='', flush=True)
-
-            batch_chips, batch_windows = [], []
-            for window in windows:
-                chip = raster_source.get_chip(window)
-                if np.any(chip):
-                    batch_chips.append(chip)
-                    batch_windows.append(window)
-
-                # Predict on batch
-                if len(batch_chips) >= self.config.predict_batch_size:
-                    predict_batch(batch_chips, batch_windows)
-                    batch_chips, batch_windows = [], []
+            windows = self.filter_windows_with_data(scene, windows)
+
+            batch_size = self.config.predict_batch_size
+            out = None
+            for i in range(0, len(windows), batch_size):
+                batch_windows = windows[i:i + batch_size]
+                # Read every batch but the first into the same buffer, which
+                # is allocated once the shape of the chips is known.
+                if out is None:
+                    chips = raster_source.get_chips(batch_windows)
+                    out = np.empty(
+                        (batch_size, ) + chips.shape[1:],
+                        dtype=raster_source.get_dtype())
+                else:
+                    chips = raster_source.get_chips(
+                        batch_windows, out=out[:len(batch_windows)])
+
+                # Skip chips without any data.
+                nonempty = chips.reshape(len(chips), -1).any(axis=1)
+                if not nonempty.any():
+                    continue
+                if not nonempty.all():
+                    chips = chips[nonempty]
+                    batch_windows = [
+                        window for window, keep in zip(batch_windows, nonempty)
+                        if keep
+                    ]
+
+                merger.add(
+                    self.backend.predict(chips, batch_windows, tmp_dir),
+                    batch_windows)
+                print('.' * len(chips), end='', flush=True)
             print()
 
-            # Predict on remaining batch
-            if len(batch_chips) > 0:
-                predict_batch(batch_chips, batch_windows)
-
-            return self.post_process_predictions(labels, scene)
+            return merger.get_labels()
@@ -13,12 +13,16 @@ class TaskConfig(BundledConfigMixin, Config):
                  predict_batch_size=10,
                  predict_package_uri=None,
                  debug=True,
-                 predict_debug_uri=None):
+                 predict_debug_uri=None,
+                 use_coverage_index=True,
+                 coverage_index_uri=None):
         self.task_type = task_type
         self.predict_batch_size = predict_batch_size
         self.predict_package_uri = predict_package_uri
         self.debug = debug
         self.predict_debug_uri = predict_debug_uri
+        self.use_coverage_index = use_coverage_index
+        self.coverage_index_uri = coverage_index_uri
 
     @abstractmethod
     def create_task(self, backend):
@@ -38,7 +42,9 @@ class TaskConfig(BundledConfigMixin, Config):
             predict_batch_size=self.predict_batch_size,
             predict_package_uri=self.predict_package_uri,
             debug=self.debug,
-            predict_debug_uri=self.predict_debug_uri)
+            predict_debug_uri=self.predict_debug_uri,
+            use_coverage_index=self.use_coverage_index,
+            coverage_index_uri=self.coverage_index_uri)
 
     @staticmethod
     def builder(task_type):
@@ -63,8 +69,18 @@ class TaskConfig(BundledConfigMixin, Config):
                 self.predict_package_uri = os.path.join(
                     experiment_config.bundle_uri, 'predict_package.zip')
             io_def.add_output(self.predict_package_uri)
+        if command_type in [rv.CHIP, rv.PREDICT]:
+            if self.use_coverage_index and not self.coverage_index_uri:
+                self.coverage_index_uri = os.path.join(
+                    experiment_config.analyze_uri, 'coverage_index')
         return io_def
 
+    def get_coverage_index_uri(self, scene_id):
+        """Return the URI to save the coverage index of a scene to, or None."""
+        if not self.coverage_index_uri:
+            return None
+        return os.path.join(self.coverage_index_uri, '{}.npz'.format(scene_id))
+
 
 class TaskConfigBuilder(ConfigBuilder):
     def from_proto(self, msg):
@@ -72,6 +88,9 @@ class TaskConfigBuilder(ConfigBuilder):
         b = b.with_predict_package_uri(msg.predict_package_uri)
         b = b.with_debug(msg.debug)
         b = b.with_predict_debug_uri(msg.predict_debug_uri)
+        b = b.with_coverage_index(msg.use_coverage_index)
+        if msg.HasField('coverage_index_uri'):
+            b = b.with_coverage_index_uri(msg.coverage_index_uri)
         return b
 
     def with_predict_batch_size(self, predict_batch_size):
@@ -97,3 +116,23 @@ class TaskConfigBuilder(ConfigBuilder):
         b = deepcopy(self)
         b.config['predict_debug_uri'] = predict_debug_uri
         return b
+
+    def with_coverage_index(self, use_coverage_index=True):
+        """Skip windows without data using a coverage index of each scene.
+
+        The index is built from the mask of the imagery if it has one, and
+        otherwise by reading the imagery once. Defaults to True.
+        """
+        b = deepcopy(self)
+        b.config['use_coverage_index'] = use_coverage_index
+        return b
+
+    def with_coverage_index_uri(self, coverage_index_uri):
+        """Set the directory to save the coverage index of each scene to.
+
+        Indexes saved there are reused by later commands. Defaults to a
+        directory in the analyze URI of the experiment.
+        """
+        b = deepcopy(self)
+        b.config['coverage_index_uri'] = coverage_index_uri
+        return b
@@ -2,6 +2,7 @@ import os
 import shutil
 from threading import Timer
 import logging
+from urllib.parse import urlparse
 
 from google.protobuf import json_format
 
@@ -37,6 +38,32 @@ def get_local_path(uri, download_dir, fs=None):
     return path
 
 
+def get_vsi_path(uri):
+    """Convert a URI into a path in one of GDAL's virtual file systems.
+
+    Files opened through these paths are streamed, so only the byte ranges
+    that are needed are read. For an S3 URI of form s3://<bucket>/<key>, the
+    path is /vsis3/<bucket>/<key>. GCS URIs map to /vsigs/ and HTTP(S) URIs
+    map to /vsicurl/. Local paths are returned unchanged.
+
+    Args:
+        uri: (string) URI of file
+
+    Returns:
+        (string) a path that can be opened by GDAL, or None if the URI cannot
+        be streamed
+    """
+    parsed_uri = urlparse(uri)
+    if parsed_uri.scheme in ['s3', 'gs']:
+        return '/vsi{}/{}{}'.format(parsed_uri.scheme, parsed_uri.netloc,
+                                    parsed_uri.path)
+    elif parsed_uri.scheme in ['http', 'https']:
+        return '/vsicurl/{}'.format(uri)
+    elif parsed_uri.scheme == '':
+        return uri
+    return None
+
+
 def sync_to_dir(src_dir_uri, dest_dir_uri, delete=False, fs=None):
     """Synchronize a local to a local or remote directory.
 
@@ -158,6 +185,13 @@ def file_exists(uri, fs=None):
     return fs.file_exists(uri)
 
 
+def last_modified(uri, fs=None):
+    """Return the last modified time of a file, or None if it is unknown."""
+    if not fs:
+        fs = FileSystem.get_file_system(uri, 'r')
+    return fs.last_modified(uri)
+
+
 def list_paths(uri, ext='', fs=None):
     if uri is None:
         return None
@@ -1,5 +1,7 @@
 from shapely import geometry
 
+from rastervision.data.utils import map_to_pixel_rings
+
 
 def aoi_json_to_shapely(geojson_dict, crs_transformer):
     """Load geojson as shapely polygon
@@ -27,32 +29,26 @@ def aoi_geojson_to_shapely_polygons(geojson_dict, crs_transformer):
     if not geojson_dict:
         return None
 
-    features = geojson_dict['features']
-    polygons = []
-
-    for feature in features:
-        json_polygons = []
-        # Convert polygon to pixel coords.
+    # Gather the polygons of all the features to transform them at once.
+    shells = []
+    for feature in geojson_dict['features']:
         geom_type = feature['geometry']['type']
         coordinates = feature['geometry']['coordinates']
         if geom_type == 'MultiPolygon':
             for polygon in coordinates:
-                shell = polygon[0]
-                json_polygons.append(
-                    [crs_transformer.map_to_pixel(p) for p in shell])
+                shells.append(polygon[0])
         elif geom_type == 'Polygon':
-            shell = coordinates[0]
-            json_polygons.append(
-                [crs_transformer.map_to_pixel(p) for p in shell])
+            shells.append(coordinates[0])
         else:
             raise Exception('Geometries of type {} are not supported in AOIs'
                             .format(geom_type))
 
-        for json_polygon in json_polygons:
-            polygon = geometry.Polygon([(p[0], p[1]) for p in json_polygon])
-            # Trick to handle self-intersecting polygons which otherwise cause an
-            # error.
-            polygon = polygon.buffer(0)
-            polygons.append(polygon)
+    polygons = []
+    for shell in map_to_pixel_rings(shells, crs_transformer):
+        polygon = geometry.Polygon(shell)
+        # Trick to handle self-intersecting polygons which otherwise cause an
+        # error.
+        polygon = polygon.buffer(0)
+        polygons.append(polygon)
 
     return polygons
@@ -0,0 +1,72 @@
+"""Micro-benchmark of reading interior and edge windows of a GeoTIFF.
+
+Compares Rasterio boundless reads with read_window, which reads the part of
+the window inside the dataset and pads it in NumPy.
+
+Usage: python scripts/benchmark_load_window.py [--size 4096] [--chip-size 300]
+"""
+import os
+import tempfile
+import timeit
+
+import click
+import numpy as np
+import rasterio
+
+from rastervision.data.raster_source.rasterio_source import read_window
+
+
+def make_image(path, size):
+    with rasterio.open(
+            path,
+            'w',
+            driver='GTiff',
+            height=size,
+            width=size,
+            count=3,
+            dtype=np.uint8,
+            tiled=True,
+            blockxsize=256,
+            blockysize=256) as image_dataset:
+        image_dataset.write(
+            np.random.randint(0, 256, (3, size, size), dtype=np.uint8))
+
+
+def get_windows(size, chip_size, interior):
+    """Return a row of windows inside the image, or hanging off its edge."""
+    row = (size - chip_size) // 2 if interior else size - chip_size // 2
+    return [((row, row + chip_size), (col, col + chip_size))
+            for col in range(0, size - chip_size, chip_size)]
+
+
+@click.command()
+@click.option('--size', default=4096, help='Height and width of the image')
+@click.option('--chip-size', default=300, help='Size of the windows')
+@click.option('--repeat', default=5, help='Number of timing runs')
+def main(size, chip_size, repeat):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'image.tif')
+        make_image(path, size)
+
+        with rasterio.open(path) as image_dataset:
+
+            def boundless(windows):
+                for window in windows:
+                    image_dataset.read(window=window, boundless=True)
+
+            def padded(windows):
+                for window in windows:
+                    read_window(image_dataset, window)
+
+            for name, interior in [('interior', True), ('edge', False)]:
+                windows = get_windows(size, chip_size, interior)
+                for func in [boundless, padded]:
+                    secs = min(
+                        timeit.repeat(
+                            lambda: func(windows), number=1, repeat=repeat))
+                    print('{:<8} {:<9}: {:8.2f} ms/window'.format(
+                        name, func.__name__, 1000 * secs / len(windows)))
+
+
+if __name__ == '__main__':
+    main()
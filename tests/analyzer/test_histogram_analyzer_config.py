@@ -0,0 +1,43 @@
+import unittest
+
+import rastervision as rv
+
+
+class TestHistogramAnalyzerConfig(unittest.TestCase):
+    def test_to_and_from_proto(self):
+        config = rv.AnalyzerConfig.builder(rv.HISTOGRAM_ANALYZER) \
+                                  .with_histogram_uri('histogram.json') \
+                                  .with_sample_pixels(10**6, 'strided') \
+                                  .with_num_workers(4) \
+                                  .build()
+        config = rv.AnalyzerConfig.from_proto(config.to_proto())
+        self.assertEqual(config.analyzer_type, rv.HISTOGRAM_ANALYZER)
+        self.assertEqual(config.histogram_uri, 'histogram.json')
+        self.assertEqual(config.sample_pixels, 10**6)
+        self.assertEqual(config.sample_mode, 'strided')
+        self.assertEqual(config.num_workers, 4)
+        self.assertEqual(config.downsample_factor, 1)
+
+        analyzer = config.create_analyzer()
+        self.assertEqual(analyzer.histogram_uri, 'histogram.json')
+
+    def test_missing_histogram_uri(self):
+        config = rv.AnalyzerConfig.builder(rv.HISTOGRAM_ANALYZER).build()
+        with self.assertRaises(rv.ConfigError):
+            config.create_analyzer()
+
+    def test_invalid_num_workers(self):
+        with self.assertRaises(rv.ConfigError):
+            rv.AnalyzerConfig.builder(rv.HISTOGRAM_ANALYZER) \
+                             .with_num_workers(0) \
+                             .build()
+
+    def test_invalid_downsample_factor(self):
+        with self.assertRaises(rv.ConfigError):
+            rv.AnalyzerConfig.builder(rv.HISTOGRAM_ANALYZER) \
+                             .with_downsample_factor(0) \
+                             .build()
+
+
+if __name__ == '__main__':
+    unittest.main()
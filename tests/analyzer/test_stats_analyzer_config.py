@@ -0,0 +1,56 @@
+import unittest
+
+import rastervision as rv
+
+
+class TestStatsAnalyzerConfig(unittest.TestCase):
+    def test_to_and_from_proto(self):
+        config = rv.AnalyzerConfig.builder(rv.STATS_ANALYZER) \
+                                  .with_stats_uri('stats.json') \
+                                  .with_sample_pixels(10**6, 'strided') \
+                                  .with_num_workers(4) \
+                                  .with_downsample_factor(2) \
+                                  .with_stats_cache_uri('cache.json') \
+                                  .build()
+        config = rv.AnalyzerConfig.from_proto(config.to_proto())
+        self.assertEqual(config.stats_uri, 'stats.json')
+        self.assertEqual(config.sample_pixels, 10**6)
+        self.assertEqual(config.sample_mode, 'strided')
+        self.assertEqual(config.num_workers, 4)
+        self.assertEqual(config.downsample_factor, 2)
+        self.assertEqual(config.stats_cache_uri, 'cache.json')
+
+        analyzer = config.create_analyzer()
+        self.assertEqual(analyzer.num_workers, 4)
+
+    def test_defaults_from_proto(self):
+        config = rv.AnalyzerConfig.builder(rv.STATS_ANALYZER) \
+                                  .with_stats_uri('stats.json') \
+                                  .build()
+        config = rv.AnalyzerConfig.from_proto(config.to_proto())
+        self.assertIsNone(config.sample_pixels)
+        self.assertEqual(config.num_workers, 1)
+        self.assertEqual(config.downsample_factor, 1)
+        self.assertIsNone(config.stats_cache_uri)
+
+    def test_invalid_sample_mode(self):
+        with self.assertRaises(rv.ConfigError):
+            rv.AnalyzerConfig.builder(rv.STATS_ANALYZER) \
+                             .with_sample_pixels(100, 'every_other') \
+                             .build()
+
+    def test_invalid_num_workers(self):
+        with self.assertRaises(rv.ConfigError):
+            rv.AnalyzerConfig.builder(rv.STATS_ANALYZER) \
+                             .with_num_workers(0) \
+                             .build()
+
+    def test_invalid_downsample_factor(self):
+        with self.assertRaises(rv.ConfigError):
+            rv.AnalyzerConfig.builder(rv.STATS_ANALYZER) \
+                             .with_downsample_factor(0) \
+                             .build()
+
+
+if __name__ == '__main__':
+    unittest.main()
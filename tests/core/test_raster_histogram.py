@@ -0,0 +1,83 @@
+import unittest
+import os
+
+import numpy as np
+import rasterio
+
+import rastervision as rv
+from rastervision.core import RasterHistogram
+from rastervision.core.raster_histogram import (get_bins, get_bin_values)
+from rastervision.rv_config import RVConfig
+
+
+class TestRasterHistogram(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_bins(self):
+        values = {
+            np.uint8: [0, 1, 7, 255],
+            np.uint16: [0, 1, 300, 65535],
+            np.int16: [-32768, -300, -1, 0, 1, 32767],
+            np.float32: [-300, -2.5, -1, 0, 1e-3, 1, 2.5, 300, 6e4]
+        }
+        for dtype, dtype_values in values.items():
+            dtype_values = np.array(dtype_values, dtype=dtype)
+            bins = get_bins(dtype_values)
+            self.assertEqual(bins.dtype, np.uint16)
+            # Bins are ordered like the values.
+            self.assertTrue(np.all(np.diff(bins.astype(np.int64)) > 0))
+            np.testing.assert_allclose(
+                get_bin_values(dtype)[bins], dtype_values, rtol=1e-3)
+
+    def test_percentiles(self):
+        chip = np.random.randint(-1000, 1000, (50, 50, 2)).astype(np.int16)
+        histogram = RasterHistogram()
+        histogram.update(chip[0:20])
+        histogram.update(chip[20:])
+
+        for channel in range(2):
+            values = chip[:, :, channel]
+            values = values[values != 0]
+            for percentile in [0, 2, 50, 98, 100]:
+                self.assertEqual(
+                    histogram.get_percentiles(percentile)[channel],
+                    np.percentile(values, percentile, interpolation='lower'))
+
+    def test_compute(self):
+        img = np.random.rand(2, 400, 300).astype(np.float32) * 1000
+        img[:, 0:100, :] = 0
+        path = os.path.join(self.tmp_dir.name, 'img.tif')
+        with rasterio.open(
+                path,
+                'w',
+                driver='GTiff',
+                height=400,
+                width=300,
+                count=2,
+                dtype=np.float32) as image_dataset:
+            image_dataset.write(img)
+        raster_source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                             .with_uri(path) \
+                                             .build() \
+                                             .create_source(self.tmp_dir.name)
+
+        histogram = RasterHistogram()
+        histogram.compute([raster_source], num_workers=2)
+        histogram_uri = os.path.join(self.tmp_dir.name, 'histogram.json')
+        histogram.save(histogram_uri)
+        histogram = RasterHistogram.load(histogram_uri)
+
+        self.assertEqual(histogram.dtype, 'float32')
+        np.testing.assert_equal(histogram.counts.sum(axis=1), 300 * 300)
+        for percentile in [5, 50, 95]:
+            expected = np.percentile(img[:, 100:, :], percentile, axis=(1, 2))
+            np.testing.assert_allclose(
+                histogram.get_percentiles(percentile), expected, rtol=0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+from unittest.mock import patch
+import os
+
+import numpy as np
+import rasterio
+
+import rastervision as rv
+from rastervision.core import RasterStats
+from rastervision.core.raster_stats import (ChannelMoments, StatsCache,
+                                            STRIDED_SAMPLE)
+from rastervision.rv_config import RVConfig
+
+
+class TestRasterStats(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+        self.imgs = []
+        self.raster_sources = []
+        for ind, size in enumerate([500, 700]):
+            img = np.random.randint(0, 1000, (3, size, size)).astype(np.uint16)
+            img[:, 0:100, :] = 0
+            self.imgs.append(img)
+
+            path = os.path.join(self.tmp_dir.name, '{}.tif'.format(ind))
+            with rasterio.open(
+                    path,
+                    'w',
+                    driver='GTiff',
+                    height=size,
+                    width=size,
+                    count=3,
+                    dtype=np.uint16) as image_dataset:
+                image_dataset.write(img)
+            self.raster_sources.append(
+                rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE)
+                .with_uri(path).with_channel_order([2, 0]).build()
+                .create_source(self.tmp_dir.name))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_channel_moments(self):
+        chip = np.random.rand(30, 30, 2) * 100
+        chip[0:10, :, 0] = 0
+        moments = ChannelMoments()
+        moments.update(chip[0:15])
+        moments.update(chip[15:20])
+        moments.merge(ChannelMoments())
+        other = ChannelMoments()
+        other.update(chip[20:])
+        moments.merge(other)
+
+        values = [chip[10:, :, 0], chip[:, :, 1]]
+        np.testing.assert_equal(moments.counts, [600, 900])
+        np.testing.assert_allclose(moments.means, [np.mean(v) for v in values])
+        np.testing.assert_allclose(moments.get_stds(),
+                                   [np.std(v) for v in values])
+
+    def test_compute(self):
+        stats = RasterStats()
+        stats.compute(self.raster_sources, num_workers=2)
+
+        values = np.concatenate(
+            [img.reshape(3, -1) for img in self.imgs], axis=1)
+        expected_means = []
+        expected_stds = []
+        for channel_values in values:
+            channel_values = channel_values[channel_values != 0]
+            expected_means.append(np.mean(channel_values))
+            expected_stds.append(np.std(channel_values))
+        # The stats are over all the raw channels, not only channel_order.
+        np.testing.assert_allclose(stats.means, expected_means)
+        np.testing.assert_allclose(stats.stds, expected_stds)
+
+    def test_sample_windows(self):
+        windows = RasterStats.get_sample_windows(self.raster_sources, 300)
+        self.assertEqual(list(map(len, windows)), [4, 9])
+
+        for sample_mode in ['random', STRIDED_SAMPLE]:
+            windows = RasterStats.get_sample_windows(
+                self.raster_sources, 300, 5, sample_mode=sample_mode)
+            self.assertEqual(sum(map(len, windows)), 5)
+            # Samples are reproducible.
+            self.assertEqual(
+                windows,
+                RasterStats.get_sample_windows(
+                    self.raster_sources, 300, 5, sample_mode=sample_mode))
+
+        windows = RasterStats.get_sample_windows(
+            self.raster_sources, 300, 13, sample_mode=STRIDED_SAMPLE)
+        self.assertEqual(list(map(len, windows)), [4, 9])
+
+    def test_compute_sampled(self):
+        stats = RasterStats()
+        stats.compute(
+            self.raster_sources,
+            sample_pixels=4 * 300 * 300,
+            sample_mode=STRIDED_SAMPLE)
+        # Uniformly random values have a mean of about 500.
+        np.testing.assert_allclose(stats.means, 500, rtol=0.05)
+        self.assertEqual(len(stats.stds), 3)
+
+    def test_cache(self):
+        cache_uri = os.path.join(self.tmp_dir.name, 'stats_cache.json')
+        cache = StatsCache.load(cache_uri)
+        RasterStats().compute(self.raster_sources[0:1], cache=cache)
+        cache.save(cache_uri)
+
+        cache = StatsCache.load(cache_uri)
+        stats = RasterStats()
+        with patch.object(
+                RasterStats, 'compute_moments',
+                wraps=RasterStats.compute_moments) as compute_moments:
+            stats.compute(self.raster_sources, cache=cache)
+        # Only the new raster source is read.
+        self.assertEqual(compute_moments.call_count, 1)
+        self.assertIs(compute_moments.call_args[0][0], self.raster_sources[1])
+
+        expected_stats = RasterStats()
+        expected_stats.compute(self.raster_sources)
+        np.testing.assert_allclose(stats.means, expected_stats.means)
+        np.testing.assert_allclose(stats.stds, expected_stats.stds)
+
+        # The cache is cleared when the options change.
+        stats.compute(self.raster_sources, cache=cache, downsample_factor=2)
+        self.assertEqual(cache.options['downsample_factor'], 2)
+
+    def test_cache_overwritten_file(self):
+        cache = StatsCache()
+        RasterStats().compute(self.raster_sources[0:1], cache=cache)
+
+        # Overwrite the file in place with the same size, but another mtime.
+        img = self.imgs[0] // 2
+        path = self.raster_sources[0].uris[0]
+        with rasterio.open(path, 'r+') as image_dataset:
+            image_dataset.write(img)
+        mtime = os.path.getmtime(path) + 10
+        os.utime(path, (mtime, mtime))
+
+        stats = RasterStats()
+        stats.compute(self.raster_sources[0:1], cache=cache)
+        expected_stats = RasterStats()
+        expected_stats.compute(self.raster_sources[0:1])
+        np.testing.assert_allclose(stats.means, expected_stats.means)
+        self.assertEqual(len(cache.source_moments), 2)
+
+    def test_compute_no_valid_pixels(self):
+        self.imgs[0][:] = 0
+        path = self.raster_sources[0].uris[0]
+        with rasterio.open(path, 'r+') as image_dataset:
+            image_dataset.write(self.imgs[0])
+
+        with self.assertRaises(ValueError):
+            RasterStats().compute(self.raster_sources[0:1])
+
+    def test_scaled_sample_moments(self):
+        # Sample more windows from the second raster, whose values are larger.
+        self.imgs[1][:] = 100
+        with rasterio.open(self.raster_sources[1].uris[0], 'r+') as dataset:
+            dataset.write(self.imgs[1])
+
+        stats = RasterStats()
+        stats.compute(
+            self.raster_sources,
+            sample_pixels=5 * 300 * 300,
+            sample_mode=STRIDED_SAMPLE)
+        expected_stats = RasterStats()
+        expected_stats.compute(self.raster_sources)
+        np.testing.assert_allclose(
+            stats.means, expected_stats.means, rtol=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+from rasterio.transform import from_origin, rowcol
+
+from rastervision.data import IdentityCRSTransformer, RasterioCRSTransformer
+from rastervision.data.crs_transformer.rasterio_crs_transformer import (
+    LegacyProjTransformer, get_pyproj_transformer)
+
+
+class TestRasterioCRSTransformer(unittest.TestCase):
+    def setUp(self):
+        self.transform = from_origin(500000, 4000000, 0.5, 0.5)
+        self.crs_transformer = RasterioCRSTransformer(
+            self.transform, 'epsg:32616', map_crs='epsg:32616')
+        self.lonlat_transformer = RasterioCRSTransformer(
+            self.transform, 'epsg:32616')
+
+    def test_map_to_pixel(self):
+        self.assertEqual(
+            self.crs_transformer.map_to_pixel((500010.2, 3999989.9)), (20, 20))
+        pixel_points = self.crs_transformer.map_to_pixel_many(
+            np.array([[500010.2, 3999989.9], [500000.1, 3999999.6]]))
+        np.testing.assert_array_equal(pixel_points, [[20, 20], [0, 0]])
+
+    def test_map_to_pixel_edges(self):
+        # Points on the edges of pixels are in the pixels to their bottom
+        # right, like with rasterio.transform.rowcol.
+        map_points = np.array([[500010.0, 3999990.0], [500000.0, 4000000.0],
+                               [500000.5, 3999999.5], [500000.3, 3999999.7]])
+        pixel_points = self.crs_transformer.map_to_pixel_many(map_points)
+        np.testing.assert_array_equal(pixel_points,
+                                      [[20, 20], [0, 0], [1, 1], [0, 0]])
+        for map_point, pixel_point in zip(map_points, pixel_points):
+            row, col = rowcol(self.transform, *map_point)
+            self.assertEqual((col, row), tuple(pixel_point))
+
+        # Edges that are not exactly representable.
+        crs_transformer = RasterioCRSTransformer(
+            from_origin(0, 1, 0.1, 0.1), 'epsg:32616', map_crs='epsg:32616')
+        pixel_points = crs_transformer.map_to_pixel_many(
+            np.array([[0.3, 0.7], [0.7, 0.3]]))
+        np.testing.assert_array_equal(pixel_points, [[3, 3], [7, 7]])
+
+    def test_legacy_proj_transformer(self):
+        xs, ys = np.array([500000.0, 510000.0]), np.array([4e6, 4.1e6])
+        transformer = get_pyproj_transformer('epsg:32616', 'epsg:4326')
+        legacy_transformer = LegacyProjTransformer('epsg:32616', 'epsg:4326')
+        np.testing.assert_allclose(
+            legacy_transformer.transform(xs, ys), transformer.transform(
+                xs, ys))
+
+    def test_pixel_to_map(self):
+        map_point = self.crs_transformer.pixel_to_map((20, 10))
+        np.testing.assert_allclose(map_point, (500010.25, 3999994.75))
+        map_points = self.crs_transformer.pixel_to_map_many(
+            np.array([[20, 10], [0.7, 0.2]]))
+        np.testing.assert_allclose(
+            map_points, [[500010.25, 3999994.75], [500000.25, 3999999.75]])
+
+    def test_many_same_as_single(self):
+        pixel_points = np.random.RandomState(0).randint(0, 1000, (20, 2))
+        map_points = self.lonlat_transformer.pixel_to_map_many(pixel_points)
+        for pixel_point, map_point in zip(pixel_points, map_points):
+            self.assertEqual(
+                self.lonlat_transformer.pixel_to_map(pixel_point),
+                tuple(map_point))
+
+        # Map points at the centers of pixels go back to the same pixels.
+        np.testing.assert_array_equal(
+            self.lonlat_transformer.map_to_pixel_many(map_points),
+            pixel_points)
+        for pixel_point, map_point in zip(pixel_points, map_points):
+            self.assertEqual(
+                self.lonlat_transformer.map_to_pixel(map_point),
+                tuple(pixel_point))
+
+    def test_identity(self):
+        crs_transformer = IdentityCRSTransformer()
+        points = np.array([[1.5, 2], [3, 4]])
+        np.testing.assert_array_equal(
+            crs_transformer.map_to_pixel_many(points), points)
+        np.testing.assert_array_equal(
+            crs_transformer.pixel_to_map_many(points), points)
+
+
+if __name__ == '__main__':
+    unittest.main()
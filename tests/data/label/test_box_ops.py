@@ -0,0 +1,106 @@
+import unittest
+
+import numpy as np
+from shapely.geometry import (LineString, box as ShapelyBox)
+
+from rastervision.data.label import box_ops
+
+
+class TestBoxOps(unittest.TestCase):
+    def setUp(self):
+        self.npboxes = np.array([[0., 0., 2., 2.], [1., 1., 3., 3.],
+                                 [0., 0., 1., 4.], [5., 5., 5., 6.]])
+
+    def test_get_areas(self):
+        np.testing.assert_array_equal(
+            box_ops.get_areas(self.npboxes), [4., 4., 4., 0.])
+
+    def test_get_ioas_and_ious(self):
+        window = np.array([[0., 0., 2., 2.]])
+        np.testing.assert_allclose(
+            box_ops.get_ioas(window, self.npboxes), [[1., 0.25, 0.5, 0.]])
+        np.testing.assert_allclose(
+            box_ops.get_ious(window, self.npboxes), [[1., 1 / 7, 2 / 6, 0.]])
+        self.assertEqual(
+            box_ops.get_ious(window, np.empty((0, 4))).shape, (1, 0))
+
+    def test_clip_to_window(self):
+        npboxes, inds = box_ops.clip_to_window(
+            self.npboxes.astype(np.float32), np.array([0., 0., 2., 2.]))
+        self.assertEqual(npboxes.dtype, np.float32)
+        np.testing.assert_array_equal(inds, [0, 1, 2])
+        np.testing.assert_array_equal(
+            npboxes, [[0., 0., 2., 2.], [1., 1., 2., 2.], [0., 0., 1., 2.]])
+
+    def test_non_max_suppression(self):
+        scores = np.array([0.5, 0.9, 0.8, 0.1])
+        inds = box_ops.non_max_suppression(
+            self.npboxes, scores, iou_thresh=0.1)
+        # The first box overlaps the second, which has a higher score.
+        np.testing.assert_array_equal(inds, [1, 2, 3])
+
+        inds = box_ops.non_max_suppression(
+            self.npboxes, scores, iou_thresh=0.1, score_thresh=0.2)
+        np.testing.assert_array_equal(inds, [1, 2])
+
+        inds = box_ops.non_max_suppression(
+            self.npboxes, scores, iou_thresh=0.5, max_output_size=2)
+        np.testing.assert_array_equal(inds, [1, 2])
+
+        # Later boxes win ties.
+        inds = box_ops.non_max_suppression(
+            self.npboxes[0:2], np.array([0.5, 0.5]), iou_thresh=0.1)
+        np.testing.assert_array_equal(inds, [1])
+
+        inds = box_ops.non_max_suppression(
+            np.empty((0, 4)), np.empty((0, )), iou_thresh=0.5)
+        self.assertEqual(len(inds), 0)
+
+    def test_box_index(self):
+        yx = np.random.rand(1000, 2) * 1000
+        hw = np.random.rand(1000, 2) * 50
+        npboxes = np.hstack([yx, yx + hw]).astype(np.float32)
+        # Add a large box, a box with zero area and a box on a cell edge.
+        npboxes[0] = [100, 100, 900, 900]
+        npboxes[1] = [500, 500, 500, 500]
+        npboxes[2] = [300, 300, 310, 310]
+        index = box_ops.BoxIndex(npboxes, cell_size=20)
+
+        windows = np.random.rand(100, 2) * 1200 - 100
+        windows = np.hstack([windows, windows + 300])
+        windows = np.vstack(
+            [windows, [[310, 310, 400, 400], [-50, -50, 0, 0]]])
+        for window in windows:
+            ymin, xmin, ymax, xmax = window
+            intersects = ((npboxes[:, 0] <= ymax) & (npboxes[:, 2] >= ymin)
+                          & (npboxes[:, 1] <= xmax) & (npboxes[:, 3] >= xmin))
+            inds = index.query(window)
+            self.assertTrue(np.all(np.diff(inds) > 0))
+            self.assertTrue(set(np.flatnonzero(intersects)) <= set(inds))
+
+        self.assertEqual(
+            len(box_ops.BoxIndex(np.empty((0, 4))).query([0, 0, 10, 10])), 0)
+
+    def test_intersects_segment(self):
+        random_state = np.random.RandomState(0)
+        yx = random_state.randint(0, 20, size=(500, 2))
+        hw = random_state.randint(1, 5, size=(500, 2))
+        npboxes = np.hstack([yx, yx + hw]).astype(np.float64)
+        # Include segments along box edges, and degenerate segments.
+        segments = np.vstack([
+            random_state.randint(-2, 24, size=(30, 4)),
+            [[0, 0, 0, 10], [3, 3, 3, 3], [5, 0, 5, 30]]
+        ])
+        for y0, x0, y1, x1 in segments:
+            line = LineString([(x0, y0), (x1, y1)])
+            expected = [
+                ShapelyBox(xmin, ymin, xmax, ymax).intersects(line)
+                for ymin, xmin, ymax, xmax in npboxes
+            ]
+            np.testing.assert_array_equal(
+                box_ops.intersects_segment(npboxes, (y0, x0, y1, x1)),
+                expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
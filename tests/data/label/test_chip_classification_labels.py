@@ -1,6 +1,10 @@
 import unittest
 
+import numpy as np
+from shapely.geometry import Polygon
+
 from rastervision.core.box import Box
+from rastervision.data.label import LabelsBuilder
 from rastervision.data.label.chip_classification_labels import ChipClassificationLabels
 
 
@@ -63,6 +67,93 @@ class TestChipClassificationLabels(unittest.TestCase):
         self.assertEqual(len(cells), 3)
         self.assertTrue(cell3 in cells)
 
+    def test_labels_builder(self):
+        builder = LabelsBuilder(ChipClassificationLabels())
+        builder.add(self.labels)
+        labels = ChipClassificationLabels()
+        cell3 = Box.make_square(0, 4, 2)
+        labels.set_cell(cell3, 1, [0.8, 0.2])
+        builder.add(labels)
+
+        new_labels = builder.build()
+        self.assertEqual(len(new_labels), 3)
+        np.testing.assert_allclose(
+            new_labels.get_cell_scores(cell3), [0.8, 0.2], rtol=1e-6)
+        self.assertEqual(
+            new_labels.get_cell_class_id(self.cell2), self.class_id2)
+        self.assertEqual(len(self.labels), 2)
+
+    def test_set_cell_overwrites(self):
+        self.labels.set_cell(self.cell1, 2, [0.1, 0.9])
+        self.assertEqual(len(self.labels), 2)
+        self.assertEqual(self.labels.get_cell_class_id(self.cell1), 2)
+        self.assertEqual(self.labels.get_cell_scores(self.cell2), None)
+
+    def test_set_cell_scores_length(self):
+        cell3 = Box.make_square(0, 4, 2)
+        self.labels.set_cell(cell3, 1, [0.1, 0.9])
+        with self.assertRaises(ValueError):
+            self.labels.set_cell(self.cell1, 1, [0.1, 0.2, 0.7])
+        # The length is also checked against cells that were already added.
+        self.assertEqual(len(self.labels), 3)
+        with self.assertRaises(ValueError):
+            self.labels.set_cell(self.cell1, 1, [1.0])
+
+    def test_class_id_none(self):
+        cell3 = Box.make_square(0, 4, 2)
+        self.labels.set_cell(cell3, None)
+        self.assertEqual(self.labels.get_class_ids(), [1, 2, None])
+        self.assertEqual(self.labels.get_cell_values(cell3), (None, None))
+
+    def test_get_inds(self):
+        npboxes = np.array([[0, 2, 2, 4], [5, 5, 6, 6], [0, 0, 2, 2]])
+        inds = self.labels.get_inds(npboxes)
+        np.testing.assert_array_equal(inds, [1, -1, 0])
+
+    def test_get_singleton_labels_missing(self):
+        labels = self.labels.get_singleton_labels(Box.make_square(5, 5, 2))
+        self.assertEqual(len(labels), 0)
+
+    def test_eq(self):
+        labels = ChipClassificationLabels()
+        labels.set_cell(self.cell2, self.class_id2)
+        labels.set_cell(self.cell1, self.class_id1)
+        self.assertEqual(labels, self.labels)
+        labels.set_cell(self.cell1, self.class_id2)
+        self.assertNotEqual(labels, self.labels)
+
+    def test_filter_by_aoi(self):
+        aoi = Box.make_square(0, 0, 3).to_shapely()
+        labels = self.labels.filter_by_aoi([aoi])
+        self.assertEqual(labels.get_cells(), [self.cell1])
+
+        # A triangle that contains cell1 but only part of cell2.
+        aoi = Polygon([(0, 0), (5, 0), (0, 5)])
+        labels = self.labels.filter_by_aoi([aoi])
+        self.assertEqual(labels.get_cells(), [self.cell1])
+        aoi = Polygon([(0, 0), (6, 0), (0, 6)])
+        labels = self.labels.filter_by_aoi([aoi])
+        self.assertEqual(len(labels), 2)
+
+    def test_filter_by_aoi_polygons(self):
+        labels = ChipClassificationLabels()
+        for cell in Box(0, 0, 100, 100).get_windows(5, 5):
+            labels.set_cell(cell, 1)
+        # A concave polygon with a hole, whose edges run along some cells.
+        aoi = Polygon(
+            [(2, 3), (90, 10), (40, 40), (95, 95), (10, 80), (2, 3)],
+            holes=[[(20, 20), (30, 20), (30, 35), (20, 20)]])
+        triangle = Polygon([(50, 0), (100, 0), (100, 50)])
+
+        cells = labels.filter_by_aoi([aoi, triangle]).get_cells()
+        expected_cells = [
+            cell for cell in labels.get_cells()
+            if aoi.contains(cell.to_shapely())
+            or triangle.contains(cell.to_shapely())
+        ]
+        self.assertGreater(len(expected_cells), 0)
+        self.assertEqual(cells, expected_cells)
+
 
 if __name__ == '__main__':
     unittest.main()
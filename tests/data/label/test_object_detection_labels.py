@@ -4,6 +4,7 @@ import numpy as np
 
 from rastervision.core.box import Box
 from rastervision.core.class_map import ClassMap, ClassItem
+from rastervision.data.label import LabelsBuilder
 from rastervision.data.label.object_detection_labels import (
     ObjectDetectionLabels)
 
@@ -61,6 +62,22 @@ class ObjectDetectionLabelsTest(unittest.TestCase):
         np.testing.assert_array_equal(boxes[1].npbox_format(),
                                       self.npboxes[1, :])
 
+    def test_dtypes(self):
+        self.assertEqual(self.labels.get_npboxes().dtype, np.float32)
+        labels = self.labels + ObjectDetectionLabels.make_empty()
+        self.assertEqual(labels.get_class_ids().dtype, np.int32)
+        labels.assert_equal(self.labels)
+
+        with self.assertRaises(ValueError):
+            ObjectDetectionLabels(self.npboxes, self.class_ids[0:1])
+
+    def test_get_overlapping_empty(self):
+        labels = ObjectDetectionLabels.get_overlapping(
+            ObjectDetectionLabels.make_empty(),
+            Box.make_square(0, 0, 3),
+            clip=True)
+        self.assertEqual(len(labels), 0)
+
     def test_len(self):
         nb_labels = len(self.labels)
         self.assertEqual(self.npboxes.shape[0], nb_labels)
@@ -129,6 +146,24 @@ class ObjectDetectionLabelsTest(unittest.TestCase):
             expected_npboxes, self.class_ids, scores=self.scores)
         labels.assert_equal(expected_labels)
 
+    def test_get_overlapping_with_index(self):
+        yx = np.random.rand(500, 2) * 1000
+        npboxes = np.hstack([yx, yx + np.random.rand(500, 2) * 50])
+        labels = ObjectDetectionLabels(npboxes, np.ones(500),
+                                       np.random.rand(500))
+        indexed_labels = ObjectDetectionLabels(npboxes, np.ones(500),
+                                               labels.get_scores())
+        indexed_labels.build_index()
+
+        for window in Box(0, 0, 1000, 1000).get_windows(200, 150):
+            for ioa_thresh, clip in [(0.000001, False), (0.5, True), (0.0,
+                                                                      False)]:
+                expected_labels = ObjectDetectionLabels.get_overlapping(
+                    labels, window, ioa_thresh=ioa_thresh, clip=clip)
+                ObjectDetectionLabels.get_overlapping(
+                    indexed_labels, window, ioa_thresh=ioa_thresh,
+                    clip=clip).assert_equal(expected_labels)
+
     def test_concatenate(self):
         npboxes = np.array([[4., 4., 5., 5.]])
         class_ids = np.array([2])
@@ -144,6 +179,23 @@ class ObjectDetectionLabelsTest(unittest.TestCase):
             npboxes, class_ids, scores=scores)
         new_labels.assert_equal(expected_labels)
 
+    def test_labels_builder(self):
+        builder = LabelsBuilder(ObjectDetectionLabels.make_empty())
+        builder.add(self.labels)
+        npboxes = np.array([[4., 4., 5., 5.]])
+        builder.add(ObjectDetectionLabels(npboxes, [2], scores=[0.3]))
+        builder.add(ObjectDetectionLabels.make_empty())
+        new_labels = builder.build()
+
+        npboxes = np.array([[0., 0., 2., 2.], [2., 2., 4., 4.],
+                            [4., 4., 5., 5.]])
+        class_ids = np.array([1, 2, 2])
+        scores = np.array([0.9, 0.9, 0.3])
+        expected_labels = ObjectDetectionLabels(
+            npboxes, class_ids, scores=scores)
+        new_labels.assert_equal(expected_labels)
+        builder.build().assert_equal(expected_labels)
+
     def test_prune_duplicates(self):
         # This first box has a score below score_thresh so it should get
         # pruned. The third box overlaps with the second, but has higher score,
@@ -161,8 +213,9 @@ class ObjectDetectionLabelsTest(unittest.TestCase):
 
         self.assertEqual(len(pruned_labels), 2)
 
-        expected_npboxes = np.array([[2.1, 2.1, 4.1, 4.1],
-                                     [3.5, 3.5, 5.5, 5.5]])
+        # Boxes are stored as float32.
+        expected_npboxes = np.array(
+            [[2.1, 2.1, 4.1, 4.1], [3.5, 3.5, 5.5, 5.5]], dtype=np.float32)
         expected_class_ids = np.array([1, 2])
         expected_scores = np.array([0.9, 1.0])
 
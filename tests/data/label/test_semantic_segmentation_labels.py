@@ -3,7 +3,7 @@ import unittest
 import numpy as np
 
 from rastervision.core.box import Box
-from rastervision.data.label import SemanticSegmentationLabels
+from rastervision.data.label import (SemanticSegmentationLabels, LabelsBuilder)
 
 
 class TestSemanticSegmentationLabels(unittest.TestCase):
@@ -18,7 +18,7 @@ class TestSemanticSegmentationLabels(unittest.TestCase):
             (Box.make_square(100, 100, 100), labels)
         ]
         # yapf: enable
-        self.labels = SemanticSegmentationLabels(label_pairs)
+        self.labels = SemanticSegmentationLabels(label_pairs, tile_size=100)
 
     def test_get_extent(self):
         extent = self.labels.get_extent()
@@ -45,6 +45,67 @@ class TestSemanticSegmentationLabels(unittest.TestCase):
         for pair, expected_pair in zip(pairs, expected_pairs):
             self.assertTupleEqual(pair, expected_pair)
 
+    def test_labels_builder(self):
+        builder = LabelsBuilder(SemanticSegmentationLabels(tile_size=100))
+        for window, label_array in self.labels.get_label_pairs():
+            builder.add(
+                SemanticSegmentationLabels(
+                    [(window, label_array)], tile_size=100))
+        labels = builder.build()
+        self.assertEqual(labels, self.labels)
+        self.assertEqual(len(labels.get_label_pairs()), 4)
+
+    def test_get(self):
+        labels = SemanticSegmentationLabels(tile_size=4)
+        arr = np.arange(36).reshape(6, 6)
+        labels.add_label_pair(Box(1, 2, 7, 8), arr)
+        self.assertEqual(labels.get_extent(), Box(0, 0, 7, 8))
+        self.assertEqual(len(labels.tiles), 4)
+        np.testing.assert_array_equal(labels.get(Box(1, 2, 7, 8)), arr)
+
+        expected_arr = np.zeros((10, 10), dtype=np.uint8)
+        expected_arr[1:7, 2:8] = arr
+        np.testing.assert_array_equal(
+            labels.get(Box(0, 0, 10, 10)), expected_arr)
+
+    def test_get_tiles(self):
+        labels = SemanticSegmentationLabels(tile_size=4)
+        labels.add_label_pair(Box(1, 2, 7, 6), np.ones((6, 4)))
+        windows = [window for window, _ in labels.get_tiles()]
+        expected_windows = [
+            Box(0, 0, 4, 4),
+            Box(0, 4, 4, 6),
+            Box(4, 0, 7, 4),
+            Box(4, 4, 7, 6)
+        ]
+        self.assertListEqual(windows, expected_windows)
+        tile_arrays = [arr for _, arr in labels.get_tiles()]
+        self.assertEqual(tile_arrays[3].shape, (3, 2))
+        self.assertEqual(tile_arrays[3].dtype, np.uint8)
+
+    def test_add_does_not_overwrite_unset_pixels(self):
+        labels1 = SemanticSegmentationLabels(tile_size=4)
+        labels1.add_label_pair(Box(0, 0, 2, 4), np.full((2, 4), 1))
+        labels2 = SemanticSegmentationLabels(tile_size=4)
+        labels2.add_label_pair(Box(1, 0, 3, 4), np.full((2, 4), 2))
+        labels2.add_label_pair(Box(3, 0, 4, 4), np.zeros((1, 4)))
+
+        labels = labels1 + labels2
+        expected_arr = np.array([[1] * 4, [2] * 4, [2] * 4, [0] * 4])
+        np.testing.assert_array_equal(labels.to_array(), expected_arr)
+        # The last tile of labels2 was completely set.
+        self.assertEqual(len(labels.masks), 0)
+
+        labels = labels2 + labels1
+        expected_arr = np.array([[1] * 4, [1] * 4, [2] * 4, [0] * 4])
+        np.testing.assert_array_equal(labels.to_array(), expected_arr)
+
+    def test_eq(self):
+        labels = SemanticSegmentationLabels.from_array(self.labels.to_array())
+        self.assertEqual(labels, self.labels)
+        labels.add_label_pair(Box(199, 199, 200, 200), np.ones((1, 1)))
+        self.assertNotEqual(labels, self.labels)
+
     def test_from_array(self):
         arr = np.zeros((5, 5))
         labels = SemanticSegmentationLabels.from_array(arr)
@@ -68,6 +129,18 @@ class TestSemanticSegmentationLabels(unittest.TestCase):
         expected_arr[0:2, 0:2] = 1
         np.testing.assert_array_equal(arr, expected_arr)
 
+    def test_filter_by_aoi_tiles(self):
+        labels = SemanticSegmentationLabels(tile_size=4)
+        labels.add_label_pair(Box(0, 0, 10, 10), np.ones((10, 10)))
+        aoi_polygons = [Box(2, 3, 6, 5).to_shapely()]
+        labels = labels.filter_by_aoi(aoi_polygons)
+        # Only the tiles that intersect the AOI are kept.
+        self.assertEqual(len(labels.tiles), 4)
+        self.assertEqual(labels.get_extent(), Box(0, 0, 10, 10))
+        expected_arr = np.zeros((10, 10))
+        expected_arr[2:6, 3:5] = 1
+        np.testing.assert_array_equal(labels.to_array(), expected_arr)
+
 
 if __name__ == '__main__':
     unittest.main()
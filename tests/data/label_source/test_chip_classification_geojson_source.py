@@ -3,11 +3,13 @@ import os
 import json
 import copy
 
+import numpy as np
 import shapely
+from shapely.strtree import STRtree
 
 import rastervision as rv
-from rastervision.data.label_source import (infer_cell, infer_labels,
-                                            read_labels)
+from rastervision.data.label_source import (infer_cell, infer_grid,
+                                            infer_labels, read_labels)
 from rastervision.core.box import Box
 from rastervision.core.class_map import ClassMap, ClassItem
 from rastervision.rv_config import RVConfig
@@ -16,6 +18,41 @@ from rastervision.data.utils import geojson_to_shapes
 from tests.data.mock_crs_transformer import DoubleCRSTransformer
 
 
+def baseline_infer_cell(shapes, cell, ioa_thresh, use_intersection_over_cell,
+                        background_class_id, pick_min_class_id):
+    """Infer the class_id of a cell by querying an STRtree of the polygons.
+
+    This is the original implementation of infer_cell, which infer_grid and
+    infer_cell are checked against. Candidates are visited in the order of
+    shapes, so that ties go to the first polygon.
+    """
+    shape_inds = {id(shape): ind for ind, (shape, _) in enumerate(shapes)}
+    str_tree = STRtree([shape for shape, _ in shapes])
+    cell_geom = cell.to_shapely()
+    inds = sorted(shape_inds[id(shape)] for shape in str_tree.query(cell_geom))
+
+    intersection_over_cells = []
+    class_ids = []
+    for ind in inds:
+        polygon, class_id = shapes[ind]
+        intersection = polygon.intersection(cell_geom)
+        intersection_over_cell = intersection.area / cell_geom.area
+        intersection_over_polygon = intersection.area / polygon.area
+        if use_intersection_over_cell:
+            enough_intersection = intersection_over_cell >= ioa_thresh
+        else:
+            enough_intersection = intersection_over_polygon >= ioa_thresh
+        if enough_intersection:
+            intersection_over_cells.append(intersection_over_cell)
+            class_ids.append(class_id)
+
+    if len(class_ids) == 0:
+        return None if background_class_id == 0 else background_class_id
+    if pick_min_class_id:
+        return min(class_ids)
+    return class_ids[np.argmax(intersection_over_cells)]
+
+
 class TestChipClassificationGeoJSONSource(unittest.TestCase):
     def setUp(self):
         self.crs_transformer = DoubleCRSTransformer()
@@ -243,6 +280,38 @@ class TestChipClassificationGeoJSONSource(unittest.TestCase):
         class_id = labels.get_cell_class_id(Box.make_square(2, 0, 2))
         self.assertEqual(class_id, self.background_class_id)
 
+    def test_infer_grid(self):
+        random_state = np.random.RandomState(0)
+        shapes = []
+        for _ in range(30):
+            x, y = random_state.uniform(-5, 45, size=2)
+            radius = random_state.uniform(1, 8)
+            shape = shapely.geometry.Point(x, y).buffer(radius, resolution=2)
+            shapes.append((shape, int(random_state.randint(1, 4))))
+        # Add a polygon that exactly matches a cell, and so touches others.
+        shapes.append((Box.make_square(10, 10, 5).to_shapely(), 2))
+
+        extent = Box(0, 0, 40, 37)
+        cell_size = 5
+        cells = extent.get_windows(cell_size, cell_size)
+        for ioa_thresh in [0.0, 0.3]:
+            for use_intersection_over_cell in [False, True]:
+                for pick_min_class_id in [False, True]:
+                    for background_class_id in [None, 0, 4]:
+                        args = (ioa_thresh, use_intersection_over_cell,
+                                background_class_id, pick_min_class_id)
+                        labels = infer_grid(shapes, extent, cell_size, *args)
+                        self.assertEqual(labels.get_cells(), cells)
+                        expected_class_ids = [
+                            baseline_infer_cell(shapes, cell, *args)
+                            for cell in cells
+                        ]
+                        self.assertEqual(labels.get_class_ids(),
+                                         expected_class_ids)
+                        self.assertEqual([
+                            infer_cell(shapes, cell, *args) for cell in cells
+                        ], expected_class_ids)
+
     def test_read_labels1(self):
         # Extent only has enough of first box in it.
         extent = Box.make_square(0, 0, 0.5)
@@ -33,6 +33,41 @@ class TestSegmentationClassTransformer(unittest.TestCase):
         expected_rgb_image = self.rgb_image
         np.testing.assert_array_equal(rgb_image, expected_rgb_image)
 
+    def test_rgb_to_class_unknown_color(self):
+        rgb_image = np.array(
+            [[[255, 0, 0], [1, 2, 3], [0, 0, 255]]], dtype=np.uint8)
+        class_image = self.transformer.rgb_to_class(rgb_image)
+        self.assertEqual(class_image.dtype, np.uint8)
+        np.testing.assert_array_equal(class_image, [[1, 0, 3]])
+
+    def test_class_to_rgb_unknown_class(self):
+        class_image = np.array([[0, 3, 4, 1000, -1]])
+        rgb_image = self.transformer.class_to_rgb(class_image)
+        expected_rgb_image = np.zeros((1, 5, 3))
+        expected_rgb_image[0, 1, :] = color_to_triple('blue')
+        np.testing.assert_array_equal(rgb_image, expected_rgb_image)
+
+        rgb_image = self.transformer.class_to_rgb(class_image.astype(np.uint8))
+        np.testing.assert_array_equal(rgb_image[0, :3],
+                                      expected_rgb_image[0, :3])
+
+    def test_filter_class_ids(self):
+        class_image = np.array([[0, 1, 3, 4, 255]], dtype=np.uint8)
+        np.testing.assert_array_equal(
+            self.transformer.filter_class_ids(class_image), [[0, 1, 3, 0, 0]])
+        np.testing.assert_array_equal(
+            self.transformer.filter_class_ids(class_image.astype(np.int64)),
+            [[0, 1, 3, 0, 0]])
+
+    def test_has_color(self):
+        class_map = ClassMap(
+            [ClassItem(id=1, color='black'),
+             ClassItem(id=2, color='red')])
+        transformer = SegmentationClassTransformer(class_map)
+        np.testing.assert_array_equal(
+            transformer.has_color(np.array([0, 1, 2, 3])),
+            [False, False, True, False])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -88,8 +88,7 @@ class TestChipClassificationGeoJSONStore(unittest.TestCase):
 
         labels2 = label_store.get_labels()
 
-        self.assertDictEqual(labels1.cell_to_class_id,
-                             labels2.cell_to_class_id)
+        self.assertEqual(labels1, labels2)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,148 @@
+import unittest
+from unittest.mock import patch
+import os
+
+import numpy as np
+import rasterio
+
+import rastervision as rv
+from rastervision.core import Box
+from rastervision.data import (CoverageIndex, Scene)
+from rastervision.rv_config import RVConfig
+
+
+class TestCoverageIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+        # The left 128 columns are a NODATA collar.
+        self.img = np.random.randint(1, 256, (3, 200, 256)).astype(np.uint8)
+        self.img[:, :, 0:128] = 0
+        self.img_path = os.path.join(self.tmp_dir.name, 'img.tif')
+        with rasterio.open(
+                self.img_path,
+                'w',
+                driver='GTiff',
+                height=200,
+                width=256,
+                count=3,
+                dtype=np.uint8) as image_dataset:
+            image_dataset.write(self.img)
+
+        self.raster_source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                                  .with_uri(self.img_path) \
+                                                  .build() \
+                                                  .create_source(
+                                                      self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_build(self):
+        with self.raster_source.activate():
+            index = CoverageIndex.build(self.raster_source, cell_size=32)
+
+        self.assertEqual(index.mask.shape, (7, 8))
+        np.testing.assert_equal(index.mask[:, 0:4], False)
+        np.testing.assert_equal(index.mask[:, 4:], True)
+
+    def test_build_from_mask(self):
+        # With a NODATA value, the index is built from the dataset mask
+        # without reading the pixels.
+        with rasterio.open(self.img_path, 'r+') as image_dataset:
+            image_dataset.nodata = 0
+        raster_source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                             .with_uri(self.img_path) \
+                                             .build() \
+                                             .create_source(self.tmp_dir.name)
+
+        with raster_source.activate():
+            with patch.object(raster_source, 'get_raw_chip') as get_raw_chip:
+                index = CoverageIndex.build(raster_source, cell_size=32)
+            self.assertFalse(get_raw_chip.called)
+
+        self.assertEqual(index.mask.shape, (7, 8))
+        # The mask is dilated by one cell.
+        np.testing.assert_equal(index.mask[:, 0:3], False)
+        np.testing.assert_equal(index.mask[:, 3:], True)
+
+    def test_build_cached(self):
+        cache_uri = os.path.join(self.tmp_dir.name, 'coverage', 'img.npz')
+        with self.raster_source.activate():
+            index = CoverageIndex.build_cached(self.raster_source, cache_uri)
+            with patch.object(CoverageIndex, 'build') as build:
+                cached_index = CoverageIndex.build_cached(
+                    self.raster_source, cache_uri)
+            self.assertFalse(build.called)
+        np.testing.assert_equal(cached_index.mask, index.mask)
+        self.assertEqual(cached_index.cell_size, 32)
+
+        # The index is built again when the image is overwritten.
+        self.img[:, :, :] = 1
+        with rasterio.open(self.img_path, 'r+') as image_dataset:
+            image_dataset.write(self.img)
+        mtime = os.path.getmtime(self.img_path) + 10
+        os.utime(self.img_path, (mtime, mtime))
+        with self.raster_source.activate():
+            index = CoverageIndex.build_cached(self.raster_source, cache_uri)
+        np.testing.assert_equal(index.mask, True)
+        np.testing.assert_equal(CoverageIndex.load(cache_uri).mask, True)
+
+    def test_build_sparse_data(self):
+        # A single pixel and a thin line would be missed by a decimated read.
+        img = np.zeros((1, 200, 256), dtype=np.uint8)
+        img[0, 77, 45] = 1
+        img[0, 150:200, 201] = 1
+        img_path = os.path.join(self.tmp_dir.name, 'sparse.tif')
+        with rasterio.open(
+                img_path,
+                'w',
+                driver='GTiff',
+                height=200,
+                width=256,
+                count=1,
+                dtype=np.uint8) as image_dataset:
+            image_dataset.write(img)
+        raster_source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                             .with_uri(img_path) \
+                                             .build() \
+                                             .create_source(self.tmp_dir.name)
+
+        with raster_source.activate():
+            # Read a few rows at a time to check the strips are stitched.
+            index = CoverageIndex.build(
+                raster_source, cell_size=32, strip_pixels=32 * 32 * 8 * 2)
+
+        expected_mask = np.zeros((7, 8), dtype=bool)
+        expected_mask[2, 1] = True
+        expected_mask[4:7, 6] = True
+        np.testing.assert_equal(index.mask, expected_mask)
+        self.assertTrue(index.has_data(Box(70, 40, 80, 50)))
+        self.assertFalse(index.has_data(Box(0, 0, 64, 32)))
+
+    def test_filter_windows(self):
+        with self.raster_source.activate():
+            index = CoverageIndex.build(self.raster_source, cell_size=32)
+
+        windows = Box(0, 0, 200, 256).get_windows(50, 50)
+        filtered_windows = index.filter_windows(windows)
+        with self.raster_source.activate():
+            nonempty_windows = [
+                w for w in windows if np.any(self.raster_source.get_chip(w))
+            ]
+
+        self.assertLess(len(filtered_windows), len(windows))
+        for window in nonempty_windows:
+            self.assertIn(window, filtered_windows)
+        self.assertFalse(index.has_data(Box(0, 0, 200, 50)))
+        self.assertTrue(index.has_data(Box(0, 120, 10, 130)))
+        self.assertFalse(index.has_data(Box(300, 300, 400, 400)))
+
+    def test_scene_caches_index(self):
+        scene = Scene('test', self.raster_source)
+        with scene.activate():
+            index = scene.get_coverage_index()
+            self.assertIs(scene.get_coverage_index(), index)
+
+
+if __name__ == '__main__':
+    unittest.main()
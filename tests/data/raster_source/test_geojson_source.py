@@ -22,12 +22,14 @@ class TestGeoJSONSource(unittest.TestCase):
         self.line_buffer = 1
         self.uri = os.path.join(self.tmp_dir.name, 'temp.json')
 
-    def build_source(self, geojson):
+    def build_source(self, geojson, windowed=False, tile_cache_size=0):
         str_to_file(json.dumps(geojson), self.uri)
 
         config = RasterSourceConfig.builder(rv.GEOJSON_SOURCE) \
             .with_uri(self.uri) \
             .with_rasterizer_options(self.background_class_id, self.line_buffer) \
+            .with_windowed(windowed) \
+            .with_tile_cache(tile_cache_size) \
             .build()
 
         # Convert to proto and back as a test.
@@ -42,8 +44,8 @@ class TestGeoJSONSource(unittest.TestCase):
     def tearDown(self):
         self.tmp_dir.cleanup()
 
-    def test_get_chip(self):
-        geojson = {
+    def get_geojson(self):
+        return {
             'type':
             'FeatureCollection',
             'features': [{
@@ -69,28 +71,74 @@ class TestGeoJSONSource(unittest.TestCase):
             }]
         }
 
-        source = self.build_source(geojson)
-        with source.activate():
-            self.assertEqual(source.get_extent(), self.extent)
-            chip = source.get_image_array()
-            self.assertEqual(chip.shape, (10, 10, 1))
-
-            expected_chip = self.background_class_id * np.ones((10, 10, 1))
-            expected_chip[0:5, 0:5, 0] = self.class_id
-            expected_chip[0:10, 6:8] = self.class_id
-            np.testing.assert_array_equal(chip, expected_chip)
+    def test_get_chip(self):
+        for windowed in [False, True]:
+            source = self.build_source(self.get_geojson(), windowed=windowed)
+            with source.activate():
+                self.assertEqual(source.get_extent(), self.extent)
+                chip = source.get_image_array()
+                self.assertEqual(chip.shape, (10, 10, 1))
+
+                expected_chip = self.background_class_id * np.ones((10, 10, 1))
+                expected_chip[0:5, 0:5, 0] = self.class_id
+                expected_chip[0:10, 6:8] = self.class_id
+                np.testing.assert_array_equal(chip, expected_chip)
+
+    def test_windowed_same_as_full(self):
+        # Use an extent that spans several tiles of the tile cache.
+        self.extent = Box(0, 0, 1100, 700)
+        random_state = np.random.RandomState(0)
+        features = []
+        for _ in range(50):
+            x, y = random_state.uniform(0, 1100, size=2)
+            polygon = Box.make_square(x, y, random_state.uniform(5, 200))
+            features.append({
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'Polygon',
+                    'coordinates': [polygon.geojson_coordinates()]
+                },
+                'properties': {
+                    'class_id': int(random_state.randint(1, 5))
+                }
+            })
+        geojson = {'type': 'FeatureCollection', 'features': features}
+        windows = [
+            Box(0, 0, 300, 300),
+            Box(500, 400, 600, 520),
+            Box(1000, 600, 1200, 800),
+            Box(200, 150, 1000, 650),
+            Box(200, 150, 1000, 650)
+        ]
+
+        full_source = self.build_source(geojson)
+        with full_source.activate():
+            expected_chips = [full_source.get_chip(w) for w in windows]
+        for tile_cache_size in [0, 2 * 512 * 512]:
+            source = self.build_source(
+                geojson, windowed=True, tile_cache_size=tile_cache_size)
+            with source.activate():
+                for window, expected_chip in zip(windows, expected_chips):
+                    chip = source.get_chip(window)
+                    self.assertEqual(chip.dtype, np.uint8)
+                    np.testing.assert_array_equal(chip, expected_chip)
+                if tile_cache_size:
+                    self.assertGreater(len(source.tile_cache), 0)
+                    self.assertLessEqual(source.tile_cache_nbytes,
+                                         tile_cache_size)
 
     def test_get_chip_no_polygons(self):
         geojson = {'type': 'FeatureCollection', 'features': []}
 
-        source = self.build_source(geojson)
-        with source.activate():
-            self.assertEqual(source.get_extent(), self.extent)
-            chip = source.get_image_array()
-            self.assertEqual(chip.shape, (10, 10, 1))
+        for windowed in [False, True]:
+            source = self.build_source(geojson, windowed=windowed)
+            with source.activate():
+                self.assertEqual(source.get_extent(), self.extent)
+                chip = source.get_image_array()
+                self.assertEqual(chip.shape, (10, 10, 1))
 
-            expected_chip = self.background_class_id * np.ones((10, 10, 1))
-            np.testing.assert_array_equal(chip, expected_chip)
+                expected_chip = self.background_class_id * np.ones((10, 10, 1))
+                np.testing.assert_array_equal(chip, expected_chip)
 
 
 if __name__ == '__main__':
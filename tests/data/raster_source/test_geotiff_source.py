@@ -1,18 +1,81 @@
 import unittest
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import (HTTPServer, SimpleHTTPRequestHandler)
 
 import numpy as np
 import rasterio
+from rasterio.enums import Resampling
 
 import rastervision as rv
-from rastervision.core import Box
+from rastervision.core import (Box, RasterStats)
 from rastervision.utils.misc import save_img
-from rastervision.data.raster_source.rasterio_source import load_window
+from rastervision.data.raster_source.rasterio_source import (load_window,
+                                                             read_window)
+from rastervision.data.raster_transformer import StatsTransformer
 from rastervision.rv_config import RVConfig
 
 from tests import data_file_path
 
 
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files from root_dir, honoring Range headers."""
+    root_dir = None
+    requested_bytes = 0
+
+    def translate_path(self, path):
+        return os.path.join(self.root_dir, path.lstrip('/'))
+
+    def send_head(self):
+        range_header = self.headers.get('Range')
+        if range_header is None:
+            return super().send_head()
+
+        path = self.translate_path(self.path)
+        size = os.path.getsize(path)
+        start, end = range_header.split('=')[1].split('-')
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+
+        f = open(path, 'rb')
+        f.seek(start)
+        self.send_response(206)
+        self.send_header('Content-Type', 'image/tiff')
+        self.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+            start, end, size))
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        RangeRequestHandler.requested_bytes += end - start + 1
+        self.range_length = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        if hasattr(self, 'range_length'):
+            outputfile.write(source.read(self.range_length))
+        else:
+            super().copyfile(source, outputfile)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReadRecorder():
+    """Wraps a dataset and records the band indexes of each read."""
+
+    def __init__(self, image_dataset):
+        self.image_dataset = image_dataset
+        self.read_indexes = []
+
+    def __getattr__(self, name):
+        return getattr(self.image_dataset, name)
+
+    def read(self, indexes=None, **kwargs):
+        self.read_indexes.append(indexes)
+        return self.image_dataset.read(indexes, **kwargs)
+
+
 class TestGeoTiffSource(unittest.TestCase):
     def test_load_window(self):
         with RVConfig.get_tmp_dir() as temp_dir:
@@ -41,6 +104,401 @@ class TestGeoTiffSource(unittest.TestCase):
                 chip = load_window(image_dataset, window=window)
             np.testing.assert_equal(chip, np.zeros(chip.shape))
 
+    def test_load_window_channels(self):
+        with RVConfig.get_tmp_dir() as temp_dir:
+            image_path = os.path.join(temp_dir, 'temp.tif')
+            im = np.random.randint(2, 10, (8, 20, 20)).astype(np.uint8)
+            im[4, 0:10, :] = 1
+            with rasterio.open(
+                    image_path,
+                    'w',
+                    driver='GTiff',
+                    height=20,
+                    width=20,
+                    count=8,
+                    dtype=np.uint8,
+                    nodata=1) as image_dataset:
+                image_dataset.write(im)
+
+            window = Box.make_square(0, 0, 20).rasterio_format()
+            expected_chip = np.transpose(im[[4, 1], :, :], axes=[1, 2, 0])
+            expected_chip[expected_chip == 1] = 0
+            with rasterio.open(image_path) as image_dataset:
+                chip = load_window(image_dataset, window, channels=[4, 1])
+            np.testing.assert_equal(chip, expected_chip)
+
+    def test_reads_only_channel_order_bands(self):
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            img_path = os.path.join(tmp_dir, 'img.tif')
+            img = np.random.randint(0, 256, size=(10, 10, 8)).astype(np.uint8)
+            with rasterio.open(
+                    img_path,
+                    'w',
+                    driver='GTiff',
+                    height=10,
+                    width=10,
+                    count=8,
+                    dtype=np.uint8) as image_dataset:
+                image_dataset.write(np.transpose(img, axes=[2, 0, 1]))
+
+            source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                          .with_uri(img_path) \
+                                          .with_channel_order([6, 2, 3]) \
+                                          .build() \
+                                          .create_source(tmp_dir)
+            with source.activate():
+                recorder = ReadRecorder(source.image_dataset)
+                source.image_dataset = recorder
+                window = Box.make_square(0, 0, 10)
+                chip = source.get_chip(window)
+                chips = source.get_chips([window, window])
+                raw_chip = source.get_raw_chip(window)
+
+            np.testing.assert_equal(chip, img[:, :, [6, 2, 3]])
+            np.testing.assert_equal(chips, np.stack([chip, chip]))
+            np.testing.assert_equal(raw_chip, img)
+            self.assertEqual(
+                recorder.read_indexes,
+                [[7, 3, 4], [7, 3, 4], list(range(1, 9))])
+
+    def test_read_window(self):
+        img_path = data_file_path('small-rgb-tile.tif')
+        windows = [
+            Box.make_square(10, 20, 100),
+            Box.make_square(200, 200, 100),
+            Box.make_square(-10, -20, 100),
+            Box.make_square(300, 300, 100),
+            Box(-10, -10, 300, 300),
+            Box(0.5, 0.5, 10.5, 10.5)
+        ]
+        with rasterio.open(img_path) as image_dataset:
+            for window in windows:
+                window = window.rasterio_format()
+                expected_im = image_dataset.read(
+                    [1, 3], window=window, boundless=True)
+                im = read_window(image_dataset, window, indexes=[1, 3])
+                np.testing.assert_equal(im, expected_im)
+
+                expected_im = np.ma.filled(
+                    image_dataset.read(
+                        window=window, boundless=True, masked=True),
+                    fill_value=0)
+                im = read_window(image_dataset, window, is_masked=True)
+                np.testing.assert_equal(im, expected_im)
+
+    def test_get_chip_out_shape(self):
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            img_path = os.path.join(tmp_dir, 'img.tif')
+            img = np.random.randint(1, 256, (3, 256, 256)).astype(np.uint8)
+            with rasterio.open(
+                    img_path,
+                    'w',
+                    driver='GTiff',
+                    height=256,
+                    width=256,
+                    count=3,
+                    dtype=np.uint8) as image_dataset:
+                image_dataset.write(img)
+
+            source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                          .with_uri(img_path) \
+                                          .with_channel_order([2, 0]) \
+                                          .build() \
+                                          .create_source(tmp_dir)
+
+            # Without overviews, reduced resolution reads are decimated.
+            with source.activate():
+                chip = source.get_chip(
+                    Box.make_square(0, 0, 256), out_shape=(64, 64))
+                edge_chip = source.get_raw_chip(
+                    Box.make_square(128, 192, 128), out_shape=(32, 32))
+            expected_chip = np.transpose(img[[2, 0], 2::4, 2::4], [1, 2, 0])
+            np.testing.assert_equal(chip, expected_chip)
+            expected_edge_chip = np.zeros((32, 32, 3), dtype=np.uint8)
+            expected_edge_chip[:, 0:16, :] = np.transpose(
+                img[:, 130::4, 194::4], [1, 2, 0])
+            np.testing.assert_equal(edge_chip, expected_edge_chip)
+
+            # Overviews are used when they exist. They are not updated when
+            # the image is overwritten, which shows where the pixels are read
+            # from.
+            with rasterio.open(img_path, 'r+') as image_dataset:
+                image_dataset.build_overviews([2, 4], Resampling.nearest)
+                image_dataset.write(np.zeros_like(img))
+            with source.activate():
+                chip = source.get_raw_chip(
+                    Box.make_square(0, 0, 256), out_shape=(64, 64))
+                full_chip = source.get_raw_chip(Box.make_square(0, 0, 256))
+            self.assertTrue(np.all(chip > 0))
+            self.assertFalse(np.any(full_chip))
+
+    def test_block_cache(self):
+        img_path = data_file_path('small-rgb-tile.tif')
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            source = rv.data.GeoTiffSourceConfig(uris=[img_path]) \
+                            .create_source(tmp_dir)
+            cached_source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                                 .with_uri(img_path) \
+                                                 .with_block_cache(10**6) \
+                                                 .build() \
+                                                 .create_source(tmp_dir)
+
+            windows = Box.make_square(-10, -10, 300).get_windows(100, 50)
+            with source.activate():
+                expected_chips = [source.get_chip(w) for w in windows]
+            with cached_source.activate():
+                cache = cached_source.block_cache
+                cache.reset_counters()
+                chips = [cached_source.get_chip(w) for w in windows]
+                # The image has 26 strips of 10 rows, and each one should be
+                # decoded once.
+                self.assertEqual(cache.misses, 26)
+                self.assertGreater(cache.hits, 0)
+
+            for chip, expected_chip in zip(chips, expected_chips):
+                np.testing.assert_equal(chip, expected_chip)
+
+    def test_block_cache_evicts(self):
+        img_path = data_file_path('small-rgb-tile.tif')
+        # Each strip is 10 * 256 * 3 bytes.
+        max_bytes = 2 * 10 * 256 * 3
+        source = rv.data.GeoTiffSourceConfig(uris=[img_path],
+                                             block_cache_size=max_bytes) \
+                        .create_source(tmp_dir=None)
+
+        with source.activate():
+            source.get_chip(Box.make_square(0, 0, 100))
+            self.assertEqual(len(source.block_cache), 2)
+            self.assertLessEqual(source.block_cache.nbytes, max_bytes)
+
+            # The most recently used strips are still cached.
+            source.block_cache.reset_counters()
+            source.get_chip(Box.make_square(80, 0, 20))
+            self.assertEqual(source.block_cache.misses, 0)
+        self.assertEqual(len(source.block_cache), 0)
+
+    def test_block_cache_from_proto(self):
+        msg = rv.data.GeoTiffSourceConfig(uris=['dummy'],
+                                          block_cache_size=1000) \
+                     .to_proto()
+        config = rv.RasterSourceConfig.from_proto(msg)
+        self.assertEqual(config.block_cache_size, 1000)
+
+    def test_stream(self):
+        with RVConfig.get_tmp_dir() as temp_dir:
+            # make a tiled geotiff that is much bigger than a single tile
+            image_path = os.path.join(temp_dir, 'tiled.tif')
+            im = np.random.randint(0, 256, (3, 1024, 1024)).astype(np.uint8)
+            with rasterio.open(
+                    image_path,
+                    'w',
+                    driver='GTiff',
+                    height=1024,
+                    width=1024,
+                    count=3,
+                    dtype=np.uint8,
+                    tiled=True,
+                    blockxsize=256,
+                    blockysize=256) as image_dataset:
+                image_dataset.write(im)
+
+            RangeRequestHandler.root_dir = temp_dir
+            RangeRequestHandler.requested_bytes = 0
+            server = HTTPServer(('127.0.0.1', 0), RangeRequestHandler)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.daemon = True
+            thread.start()
+            try:
+                uri = 'http://127.0.0.1:{}/tiled.tif'.format(
+                    server.server_port)
+                window = Box.make_square(50, 50, 20)
+
+                with RVConfig.get_tmp_dir() as tmp_dir:
+                    source = rv.RasterSourceConfig \
+                               .builder(rv.GEOTIFF_SOURCE) \
+                               .with_uri(uri) \
+                               .with_stream() \
+                               .build() \
+                               .create_source(tmp_dir)
+                    with source.activate():
+                        chip = source.get_chip(window)
+                    # Nothing should have been downloaded.
+                    self.assertEqual(os.listdir(tmp_dir), [])
+            finally:
+                server.shutdown()
+                server.server_close()
+
+            self.assertLess(RangeRequestHandler.requested_bytes,
+                            os.path.getsize(image_path) / 4)
+            expected_chip = np.transpose(im[:, 50:70, 50:70], (1, 2, 0))
+            np.testing.assert_equal(chip, expected_chip)
+
+    def test_stream_from_proto(self):
+        msg = rv.data.GeoTiffSourceConfig(uris=['dummy'], stream=True) \
+                     .to_proto()
+        config = rv.RasterSourceConfig.from_proto(msg)
+        self.assertTrue(config.stream)
+        self.assertIs(config.create_local('/tmp'), config)
+
+    def test_mosaic(self):
+        with RVConfig.get_tmp_dir() as temp_dir:
+            # Split an image into a 2x2 grid of georeferenced tiles.
+            im = np.random.randint(1, 256, (3, 100, 120)).astype(np.uint8)
+            transform = rasterio.transform.from_origin(1000, 2000, 0.5, 0.5)
+            image_paths = []
+            for row in [0, 50]:
+                for col in [0, 60]:
+                    image_path = os.path.join(
+                        temp_dir, 'tile-{}-{}.tif'.format(row, col))
+                    tile_transform = transform * \
+                        rasterio.transform.Affine.translation(col, row)
+                    with rasterio.open(
+                            image_path,
+                            'w',
+                            driver='GTiff',
+                            height=50,
+                            width=60,
+                            count=3,
+                            dtype=np.uint8,
+                            crs='epsg:3857',
+                            transform=tile_transform) as image_dataset:
+                        image_dataset.write(im[:, row:row + 50, col:col + 60])
+                    image_paths.append(image_path)
+
+            source = rv.data.GeoTiffSourceConfig(uris=image_paths) \
+                            .create_source(tmp_dir=temp_dir)
+            self.assertEqual(source.get_extent(), Box(0, 0, 100, 120))
+            with source.activate():
+                np.testing.assert_equal(source.get_raw_image_array(),
+                                        np.transpose(im, (1, 2, 0)))
+
+                window = Box(40, -10, 60, 40)
+                chip = source.get_raw_chip(window)
+                np.testing.assert_equal(chip[:, 0:10, :], 0)
+                np.testing.assert_equal(
+                    chip[:, 10:, :], np.transpose(im[:, 40:60, 0:40],
+                                                  (1, 2, 0)))
+
+                # Only the tiles on the left overlap the window.
+                mosaic = source.image_dataset
+                self.assertEqual(
+                    mosaic.get_intersecting_tiles(40, -10, 60, 40), [0, 2])
+
+                # Reduced resolution reads are decimated within each tile.
+                chip = source.get_raw_image_array(out_shape=(50, 60))
+                np.testing.assert_equal(
+                    chip, np.transpose(im[:, 1::2, 1::2], (1, 2, 0)))
+
+                # The Mosaic of another thread shares the index, and only
+                # opens the tiles it reads from.
+                def read_top_left():
+                    chip = source.get_raw_chip(Box(0, 0, 10, 10))
+                    return source.image_dataset, chip
+
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    other_mosaic, chip = executor.submit(
+                        read_top_left).result()
+                np.testing.assert_equal(
+                    chip, np.transpose(im[:, 0:10, 0:10], (1, 2, 0)))
+                self.assertIsNot(other_mosaic, mosaic)
+                self.assertIs(other_mosaic.index, mosaic.index)
+                self.assertIs(mosaic.index, source.mosaic_index)
+                self.assertEqual(list(other_mosaic.tiles), [0])
+            self.assertEqual(other_mosaic.tiles, {})
+
+            # The index is only built once per source.
+            index = source.mosaic_index
+            with source.activate():
+                self.assertIs(source.image_dataset.index, index)
+
+    def test_get_chips(self):
+        img_path = data_file_path('small-rgb-tile.tif')
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                          .with_uri(img_path) \
+                                          .with_channel_order([2, 0]) \
+                                          .build() \
+                                          .create_source(tmp_dir)
+
+            # Overlapping windows are read with a single read of their
+            # union, and sparse windows are read one at a time.
+            overlapping = Box.make_square(-10, -10, 300).get_windows(100, 50)
+            sparse = [Box.make_square(0, 0, 10), Box.make_square(200, 200, 10)]
+            with source.activate():
+                for windows in [overlapping, sparse]:
+                    expected_chips = np.stack(
+                        [source.get_chip(w) for w in windows])
+                    chips = source.get_chips(windows)
+                    np.testing.assert_equal(chips, expected_chips)
+
+                    out = np.zeros_like(expected_chips)
+                    self.assertIs(source.get_chips(windows, out=out), out)
+                    np.testing.assert_equal(out, expected_chips)
+
+    def test_get_chips_with_stats_transformer(self):
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            img_path = os.path.join(tmp_dir, 'img.tif')
+            img = np.random.randint(
+                0, 1000, size=(40, 40, 3)).astype(np.uint16)
+            save_img(img, img_path)
+
+            stats = RasterStats()
+            stats.means = [500.0, 400.0, 300.0]
+            stats.stds = [100.0, 200.0, 300.0]
+            source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                          .with_uri(img_path) \
+                                          .with_channel_order([1, 2]) \
+                                          .build() \
+                                          .create_source(tmp_dir)
+            source.raster_transformers = [StatsTransformer(stats)]
+
+            windows = Box.make_square(0, 0, 40).get_windows(20, 10)
+            with source.activate():
+                expected_chips = np.stack(
+                    [source.get_chip(w) for w in windows])
+                chips = source.get_chips(windows)
+                out = np.zeros_like(expected_chips)
+                self.assertIs(source.get_chips(windows, out=out), out)
+            self.assertEqual(chips.dtype, np.uint8)
+            np.testing.assert_equal(chips, expected_chips)
+            np.testing.assert_equal(out, expected_chips)
+
+    def test_concurrent_reads(self):
+        img_path = data_file_path('small-rgb-tile.tif')
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                          .with_uri(img_path) \
+                                          .with_block_cache(10**6) \
+                                          .build() \
+                                          .create_source(tmp_dir)
+
+            windows = Box.make_square(-10, -10, 300).get_windows(50, 25)
+            nb_workers = 4
+            barrier = threading.Barrier(nb_workers)
+
+            def get_handle(_):
+                # Make sure that each worker thread is in use at once.
+                barrier.wait()
+                return source.image_dataset
+
+            with source.activate():
+                expected_chips = [source.get_chip(w) for w in windows]
+                with ThreadPoolExecutor(max_workers=nb_workers) as executor:
+                    handles = list(executor.map(get_handle, range(nb_workers)))
+                    chips = list(executor.map(source.get_chip, windows))
+                    batches = list(
+                        executor.map(source.get_chips,
+                                     [windows[0:10], windows[10:20]]))
+
+            # Each thread reads from its own handle, which is closed on
+            # deactivation.
+            self.assertEqual(len(set(map(id, handles))), nb_workers)
+            self.assertTrue(all(handle.closed for handle in handles))
+            for chip, expected_chip in zip(chips, expected_chips):
+                np.testing.assert_equal(chip, expected_chip)
+            np.testing.assert_equal(
+                np.concatenate(batches), np.stack(expected_chips[0:20]))
+
     def test_get_dtype(self):
         img_path = data_file_path('small-rgb-tile.tif')
         with RVConfig.get_tmp_dir() as tmp_dir:
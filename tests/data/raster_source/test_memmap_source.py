@@ -0,0 +1,206 @@
+import unittest
+import os
+import json
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+import rastervision as rv
+from rastervision.core import Box
+from rastervision.rv_config import RVConfig
+
+
+class TestMemmapSource(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = RVConfig.get_tmp_dir()
+        self.img = np.random.randint(0, 1000, (3, 100, 70)).astype(np.uint16)
+        self.windows = [
+            Box.make_square(0, 0, 10),
+            Box.make_square(40, 33, 25),
+            Box.make_square(90, 60, 20),
+            Box.make_square(-10, -10, 30),
+            Box(0, 0, 100, 70)
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_tif(self, **kwargs):
+        path = os.path.join(self.tmp_dir.name, 'img.tif')
+        with rasterio.open(
+                path,
+                'w',
+                driver='GTiff',
+                height=100,
+                width=70,
+                count=3,
+                dtype=np.uint16,
+                crs='epsg:3857',
+                transform=from_origin(1000, 2000, 0.5, 0.5),
+                **kwargs) as image_dataset:
+            image_dataset.write(self.img)
+        return path
+
+    def create_source(self, uri, georef_uri=None, channel_order=None):
+        b = rv.RasterSourceConfig.builder(rv.MEMMAP_SOURCE) \
+                                 .with_uri(uri) \
+                                 .with_channel_order(channel_order)
+        if georef_uri:
+            b = b.with_georef_uri(georef_uri)
+        return b.build().create_source(self.tmp_dir.name)
+
+    def assert_same_chips(self, path, channel_order=None):
+        source = self.create_source(path, channel_order=channel_order)
+        geotiff_source = rv.RasterSourceConfig.builder(rv.GEOTIFF_SOURCE) \
+                                              .with_uri(path) \
+                                              .with_channel_order(
+                                                  channel_order) \
+                                              .build() \
+                                              .create_source(
+                                                  self.tmp_dir.name)
+
+        self.assertEqual(source.get_extent(), geotiff_source.get_extent())
+        self.assertEqual(source.get_dtype(), geotiff_source.get_dtype())
+        with source.activate(), geotiff_source.activate():
+            for window in self.windows:
+                np.testing.assert_equal(
+                    source.get_chip(window), geotiff_source.get_chip(window))
+                np.testing.assert_equal(
+                    source.get_raw_chip(window),
+                    geotiff_source.get_raw_chip(window))
+
+            crs_transformer = source.get_crs_transformer()
+            self.assertEqual(
+                crs_transformer.pixel_to_map((10, 20)),
+                geotiff_source.get_crs_transformer().pixel_to_map((10, 20)))
+        return source
+
+    def test_striped_geotiff(self):
+        path = self.write_tif()
+        source = self.assert_same_chips(path)
+        self.assert_same_chips(path, channel_order=[2, 0])
+
+        # Chips inside the image are views of the file.
+        with source.activate():
+            chip = source.get_chip(Box.make_square(10, 10, 20))
+            self.assertTrue(np.shares_memory(chip, source.image))
+
+    def test_band_interleaved_geotiff(self):
+        path = self.write_tif(interleave='band')
+        source = self.assert_same_chips(path)
+
+        with source.activate():
+            chip = source.get_chip(Box.make_square(10, 10, 20))
+            self.assertTrue(np.shares_memory(chip, source.image))
+
+    def test_tiled_geotiff(self):
+        path = self.write_tif(tiled=True, blockxsize=32, blockysize=32)
+        source = self.assert_same_chips(path)
+        self.assert_same_chips(path, channel_order=[1])
+
+        with source.activate():
+            self.assertIsNone(source.image)
+            chip = source.get_chip(Box.make_square(33, 33, 20))
+            self.assertTrue(np.shares_memory(chip, source.tiles))
+
+    def test_nodata(self):
+        self.img[:, 0:10, :] = 7
+        path = self.write_tif(nodata=7)
+        self.assert_same_chips(path)
+
+    def test_compressed_geotiff(self):
+        path = self.write_tif(compress='deflate')
+        with self.assertRaises(ValueError):
+            self.create_source(path)
+
+    def test_npy(self):
+        path = os.path.join(self.tmp_dir.name, 'img.npy')
+        img = np.transpose(self.img, (1, 2, 0))
+        np.save(path, img)
+        georef_path = os.path.join(self.tmp_dir.name, 'img.json')
+        with open(georef_path, 'w') as georef_file:
+            json.dump({
+                'crs': 'epsg:3857',
+                'transform': list(from_origin(1000, 2000, 0.5, 0.5))[0:6]
+            }, georef_file)
+        source = self.create_source(
+            path, georef_uri=georef_path, channel_order=[0, 2])
+
+        self.assertEqual(source.get_extent(), Box(0, 0, 100, 70))
+        # Pixels outside the image are zero.
+        padded_img = np.pad(img, ((10, 20), (10, 20), (0, 0)), 'constant')
+        with source.activate():
+            for window in self.windows:
+                ymin, xmin, ymax, xmax = [
+                    c + 10 for c in window.tuple_format()
+                ]
+                np.testing.assert_equal(
+                    source.get_chip(window),
+                    padded_img[ymin:ymax, xmin:xmax, [0, 2]])
+            raw_chip = source.get_raw_chip(Box.make_square(10, 10, 20))
+            self.assertTrue(np.shares_memory(raw_chip, source.image))
+
+        map_point = source.get_crs_transformer().pixel_to_map((0, 0))
+        geotiff_source = self.create_source(self.write_tif())
+        np.testing.assert_almost_equal(
+            map_point,
+            geotiff_source.get_crs_transformer().pixel_to_map((0, 0)))
+
+    def test_from_proto(self):
+        config = rv.RasterSourceConfig.builder(rv.MEMMAP_SOURCE) \
+                                      .with_uri('img.npy') \
+                                      .with_georef_uri('img.json') \
+                                      .build()
+        msg = config.to_proto()
+        config = rv.RasterSourceConfig.from_proto(msg)
+        self.assertEqual(config.uri, 'img.npy')
+        self.assertEqual(config.georef_uri, 'img.json')
+
+        config = rv.RasterSourceConfig.builder(rv.MEMMAP_SOURCE) \
+                                      .with_uri('img.npy') \
+                                      .build()
+        config = rv.RasterSourceConfig.from_proto(config.to_proto())
+        self.assertIsNone(config.georef_uri)
+
+    def test_for_prediction(self):
+        train_georef_path = os.path.join(self.tmp_dir.name, 'train.json')
+        config = rv.RasterSourceConfig.builder(rv.MEMMAP_SOURCE) \
+                                      .with_uri('/data/train.npy') \
+                                      .with_georef_uri(train_georef_path) \
+                                      .build()
+        config, _ = config.save_bundle_files(self.tmp_dir.name)
+        self.assertIsNone(config.georef_uri)
+
+        # The georeference next to the image is used if there is one.
+        path = os.path.join(self.tmp_dir.name, 'img.npy')
+        np.save(path, np.transpose(self.img, (1, 2, 0)))
+        self.assertIsNone(config.for_prediction(path).georef_uri)
+        georef_path = os.path.join(self.tmp_dir.name, 'img.json')
+        with open(georef_path, 'w') as georef_file:
+            json.dump({
+                'crs': 'epsg:3857',
+                'transform': list(from_origin(1000, 2000, 0.5, 0.5))[0:6]
+            }, georef_file)
+        predict_config = config.for_prediction(path)
+        self.assertEqual(predict_config.uri, path)
+        self.assertEqual(predict_config.georef_uri, georef_path)
+        source = predict_config.create_local(self.tmp_dir.name) \
+                               .create_source(self.tmp_dir.name)
+        expected_source = self.create_source(path, georef_uri=georef_path)
+        np.testing.assert_almost_equal(
+            source.get_crs_transformer().pixel_to_map((0, 0)),
+            expected_source.get_crs_transformer().pixel_to_map((0, 0)))
+
+    def test_default_provider(self):
+        config = rv._registry.get_raster_source_default_provider(
+            'img.npy').construct('img.npy')
+        self.assertEqual(config.source_type, rv.MEMMAP_SOURCE)
+
+    def test_missing_config_uri(self):
+        with self.assertRaises(rv.ConfigError):
+            rv.data.RasterSourceConfig.builder(rv.MEMMAP_SOURCE).build()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,9 @@ import numpy as np
 
 import rastervision as rv
 from rastervision.core.raster_stats import RasterStats
+from rastervision.core.raster_histogram import RasterHistogram
+from rastervision.data.raster_transformer import (StatsTransformer,
+                                                  PercentileTransformer)
 from rastervision.rv_config import RVConfig
 
 
@@ -29,6 +32,107 @@ class TestRasterTransformer(unittest.TestCase):
             expected_out_chip = np.ones((2, 2, 4)) * 170
             np.testing.assert_equal(out_chip, expected_out_chip)
 
+    def test_stats_transformer_dtypes(self):
+        raster_stats = RasterStats()
+        raster_stats.means = [500.0, 400.0, 300.0]
+        raster_stats.stds = [100.0, 200.0, 300.0]
+        transformer = StatsTransformer(raster_stats)
+        channel_order = [2, 0]
+
+        def expected_transform(chip):
+            means = np.array(raster_stats.means)[channel_order]
+            stds = np.array(raster_stats.stds)[channel_order]
+            zscores = (chip - means) / stds
+            out_chip = (np.clip(
+                (zscores + 3) / 6, 0, 1) * 255).astype(np.uint8)
+            out_chip[chip == 0] = 0
+            return out_chip
+
+        for dtype in [np.uint16, np.int16, np.int32, np.float32, np.float64]:
+            low = 0 if dtype == np.uint16 else -1000
+            chip = np.random.randint(low, 2000, (20, 20, 2)).astype(dtype)
+            chip[0:5, :, :] = 0
+            out_chip = transformer.transform(chip, channel_order)
+            expected_out_chip = expected_transform(chip)
+            self.assertEqual(out_chip.dtype, np.uint8)
+            np.testing.assert_equal(out_chip[0:5], 0)
+            if dtype in [np.uint16, np.int16]:
+                # Lookup tables reproduce the exact mapping.
+                np.testing.assert_equal(out_chip, expected_out_chip)
+            else:
+                np.testing.assert_allclose(out_chip, expected_out_chip, atol=1)
+
+            chips = np.stack([chip, chip[::-1]])
+            np.testing.assert_equal(
+                transformer.transform_batch(chips, channel_order),
+                np.stack([out_chip, out_chip[::-1]]))
+            out = np.empty(chips.shape, dtype=np.uint8)
+            self.assertIs(
+                transformer.transform_batch(chips, channel_order, out=out),
+                out)
+            np.testing.assert_equal(out, np.stack([out_chip, out_chip[::-1]]))
+
+    def test_stats_transformer_uint8(self):
+        transformer = StatsTransformer(RasterStats())
+        chip = np.random.randint(0, 256, (4, 4, 3)).astype(np.uint8)
+        np.testing.assert_equal(transformer.transform(chip), chip)
+
+    def test_percentile_transformer(self):
+        chip = np.random.randint(1, 1001, (20, 20, 3)).astype(np.uint16)
+        chip[0:5] = 0
+        raster_histogram = RasterHistogram()
+        raster_histogram.update(chip)
+
+        with RVConfig.get_tmp_dir() as tmp_dir:
+            histogram_uri = os.path.join(tmp_dir, 'histogram.json')
+            raster_histogram.save(histogram_uri)
+            config = rv.RasterTransformerConfig.builder(
+                rv.PERCENTILE_TRANSFORMER) \
+                .with_histogram_uri(histogram_uri) \
+                .with_percentiles(10, 90) \
+                .build()
+            config = rv.RasterTransformerConfig.from_proto(config.to_proto())
+            transformer = config.create_transformer()
+
+        channel_order = [2, 0]
+        out_chip = transformer.transform(chip[:, :, channel_order],
+                                         channel_order)
+        for i, channel in enumerate(channel_order):
+            values = chip[5:, :, channel].astype(np.float64).ravel()
+            lower = np.percentile(values, 10, interpolation='lower')
+            upper = np.percentile(values, 90, interpolation='lower')
+            expected = np.clip(
+                (chip[:, :, channel] - lower) / (upper - lower), 0, 1) * 255
+            expected = expected.astype(np.uint8)
+            expected[0:5] = 0
+            np.testing.assert_equal(out_chip[:, :, i], expected)
+
+        chips = np.stack([chip, chip])[:, :, :, channel_order]
+        np.testing.assert_equal(
+            transformer.transform_batch(chips, channel_order),
+            np.stack([out_chip, out_chip]))
+        out = np.empty(chips.shape, dtype=np.uint8)
+        self.assertIs(
+            transformer.transform_batch(chips, channel_order, out=out), out)
+        np.testing.assert_equal(out, np.stack([out_chip, out_chip]))
+
+    def test_percentile_transformer_float(self):
+        chip = (np.random.rand(20, 20, 1) * 100 - 50).astype(np.float32)
+        raster_histogram = RasterHistogram()
+        raster_histogram.update(chip)
+        transformer = PercentileTransformer(raster_histogram, 0, 100)
+
+        out_chip = transformer.transform(chip)
+        expected = (chip - chip.min()) / (chip.max() - chip.min()) * 255
+        # Float values are rounded to float16 in the lookup table.
+        np.testing.assert_allclose(out_chip, expected, atol=2)
+
+    def test_invalid_percentiles(self):
+        with self.assertRaises(rv.ConfigError):
+            rv.RasterTransformerConfig.builder(rv.PERCENTILE_TRANSFORMER) \
+                                      .with_percentiles(98, 2) \
+                                      .build()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from rastervision.data.utils import (geojson_to_shapes, map_to_pixel_bounds,
+                                     map_to_pixel_rings)
+
+from tests.data.mock_crs_transformer import DoubleCRSTransformer
+
+
+class TestUtils(unittest.TestCase):
+    def setUp(self):
+        self.crs_transformer = DoubleCRSTransformer()
+        self.rings = [[[0., 0.], [0., 1.], [1., 1.], [0., 0.]],
+                      [[2., 1.], [3., 2.], [2., 3.], [1., 2.], [2., 1.]]]
+
+    def test_map_to_pixel_rings(self):
+        pixel_rings = map_to_pixel_rings(self.rings, self.crs_transformer)
+        self.assertEqual(len(pixel_rings), 2)
+        for ring, pixel_ring in zip(self.rings, pixel_rings):
+            np.testing.assert_array_equal(pixel_ring, np.array(ring) * 2)
+        self.assertEqual(map_to_pixel_rings([], self.crs_transformer), [])
+
+    def test_map_to_pixel_bounds(self):
+        bounds = map_to_pixel_bounds(self.rings, self.crs_transformer)
+        np.testing.assert_array_equal(bounds, [[0, 0, 2, 2], [2, 2, 6, 6]])
+        bounds = map_to_pixel_bounds([], self.crs_transformer)
+        self.assertEqual(bounds.shape, (0, 4))
+
+    def test_geojson_to_shapes_batches_points(self):
+        geojson = {
+            'type':
+            'FeatureCollection',
+            'features': [{
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'MultiPolygon',
+                    'coordinates': [[self.rings[0]], [self.rings[1]]]
+                },
+                'properties': {
+                    'class_id': 1
+                }
+            }, {
+                'type': 'Feature',
+                'geometry': {
+                    'type': 'LineString',
+                    'coordinates': [[0., 0.], [1., 1.]]
+                },
+                'properties': {
+                    'class_id': 2
+                }
+            }]
+        }
+        with patch.object(
+                DoubleCRSTransformer,
+                'map_to_pixel_many',
+                wraps=self.crs_transformer.map_to_pixel_many) as mock:
+            shapes = geojson_to_shapes(geojson, self.crs_transformer)
+            self.assertEqual(mock.call_count, 1)
+
+        self.assertEqual([class_id for _, class_id in shapes], [1, 1, 2])
+        self.assertEqual(shapes[0][0].bounds, (0, 0, 2, 2))
+        self.assertEqual(shapes[1][0].bounds, (2, 2, 6, 6))
+        self.assertEqual(shapes[2][0].geom_type, 'LineString')
+        self.assertEqual(shapes[2][0].bounds, (0, 0, 2, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
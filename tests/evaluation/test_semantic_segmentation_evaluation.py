@@ -9,6 +9,7 @@ from rastervision.data.label_source.semantic_segmentation_raster_source import (
     SemanticSegmentationRasterSource)
 from rastervision.data.raster_source.raster_source import RasterSource
 from rastervision.core.box import Box
+from rastervision.data.label import SemanticSegmentationLabels
 
 # from ..data.label_source.test_semantic_segmentation_raster_source import (
 #    MockRasterSource)
@@ -101,6 +102,32 @@ class TestSemanticSegmentationEvaluation(unittest.TestCase):
         self.assertEqual(precision2, eval.class_to_eval_item[2].precision)
         self.assertAlmostEqual(recall2, eval.class_to_eval_item[2].recall)
 
+    def test_compute_tiles(self):
+        class_map = ClassMap([
+            ClassItem(id=1, name='one', color='#010101'),
+            ClassItem(id=2, name='two', color='#020202')
+        ])
+        random_state = np.random.RandomState(0)
+        gt_array = random_state.randint(0, 3, size=(10, 7))
+        p_array = random_state.randint(0, 3, size=(10, 7))
+        window = Box(0, 0, 10, 7)
+
+        eval = SemanticSegmentationEvaluation(class_map)
+        eval.compute(
+            SemanticSegmentationLabels([(window, gt_array)], tile_size=3),
+            SemanticSegmentationLabels([(window, p_array)], tile_size=4))
+
+        for class_id in [1, 2]:
+            gt = gt_array == class_id
+            pred = p_array == class_id
+            tp = (gt & pred).sum()
+            fp = ((gt_array != 0) & ~gt & pred).sum()
+            fn = (gt & ~pred).sum()
+            item = eval.class_to_eval_item[class_id]
+            self.assertAlmostEqual(item.precision, tp / (tp + fp))
+            self.assertAlmostEqual(item.recall, tp / (tp + fn))
+            self.assertEqual(item.gt_count, gt.sum())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -70,6 +70,31 @@ class TestChipClassificationConfig(unittest.TestCase):
 
         self.assertDictEqual(actual_class_items, expected_class_items)
 
+    def test_coverage_index_round_trip(self):
+        t = rv.TaskConfig.builder(rv.CHIP_CLASSIFICATION) \
+                         .with_classes(['car', 'boat']) \
+                         .build()
+        self.assertTrue(t.use_coverage_index)
+        self.assertIsNone(t.coverage_index_uri)
+
+        t = t.to_builder().with_coverage_index(False).build()
+        self.assertFalse(
+            rv.TaskConfig.from_proto(t.to_proto()).use_coverage_index)
+
+        t = t.to_builder().with_coverage_index() \
+                          .with_coverage_index_uri('/coverage') \
+                          .build()
+        t = rv.TaskConfig.from_proto(t.to_proto())
+        self.assertTrue(t.use_coverage_index)
+        self.assertEqual(t.coverage_index_uri, '/coverage')
+        self.assertEqual(
+            t.get_coverage_index_uri('scene'), '/coverage/scene.npz')
+
+        # The coverage indexes of the experiment are not used for prediction.
+        bundled_t, _ = t.save_bundle_files('/bundle')
+        self.assertIsNone(bundled_t.coverage_index_uri)
+        self.assertIsNone(bundled_t.get_coverage_index_uri('scene'))
+
     def test_missing_config_class_map(self):
         with self.assertRaises(rv.ConfigError):
             rv.TaskConfig.builder(rv.CHIP_CLASSIFICATION).build()
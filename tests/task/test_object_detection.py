@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+import rastervision as rv
+from rastervision.core import Box
+from rastervision.data import ObjectDetectionLabels
+from rastervision.task import ObjectDetection
+
+
+class TestNMSPredictionsMerger(unittest.TestCase):
+    def setUp(self):
+        task_config = rv.TaskConfig.builder(rv.OBJECT_DETECTION) \
+                                   .with_classes(['car', 'boat']) \
+                                   .with_chip_size(100) \
+                                   .with_predict_options(merge_thresh=0.3,
+                                                         score_thresh=0.2) \
+                                   .build()
+        self.task = ObjectDetection(task_config, None)
+        self.scene = MagicMock()
+        self.scene.prediction_label_store.empty_labels.return_value = \
+            ObjectDetectionLabels.make_empty()
+
+    def make_window_labels(self, window, nb_boxes, random_state):
+        """Make random boxes within a window, with many overlapping ones."""
+        mins = random_state.uniform(0, 80, size=(nb_boxes, 2))
+        sizes = random_state.uniform(5, 20, size=(nb_boxes, 2))
+        npboxes = np.concatenate([mins, mins + sizes], axis=1)
+        npboxes = ObjectDetectionLabels.local_to_global(npboxes, window)
+        # Use few distinct scores to check that ties are broken the same way.
+        scores = random_state.randint(0, 10, size=nb_boxes) / 10
+        class_ids = random_state.randint(1, 3, size=nb_boxes)
+        return ObjectDetectionLabels(npboxes, class_ids, scores)
+
+    def test_same_as_global_nms(self):
+        random_state = np.random.RandomState(0)
+        windows = Box.make_square(0, 0, 400).get_windows(100, 50)
+        merger = self.task.get_predictions_merger(self.scene)
+        all_labels = ObjectDetectionLabels.make_empty()
+        for i in range(0, len(windows), 3):
+            batch_windows = windows[i:i + 3]
+            labels = ObjectDetectionLabels.make_empty()
+            for window in batch_windows:
+                labels += self.make_window_labels(window, 20, random_state)
+            merger.add(labels, batch_windows)
+            all_labels += labels
+
+        labels = merger.get_labels()
+        expected_labels = self.task.post_process_predictions(
+            all_labels, self.scene)
+        self.assertGreater(len(expected_labels), 0)
+        self.assertLess(len(expected_labels), len(all_labels))
+        self.assertEqual(labels.to_dict(), expected_labels.to_dict())
+
+    def test_prunes_before_the_end(self):
+        random_state = np.random.RandomState(1)
+        windows = Box.make_square(0, 0, 400).get_windows(100, 50)
+        merger = self.task.get_predictions_merger(self.scene)
+        for window in windows:
+            merger.add(
+                self.make_window_labels(window, 20, random_state), [window])
+            # Only the boxes of the last rows of windows are pending.
+            pending_ymins = merger.pending.get_npboxes()[:, 0]
+            if len(pending_ymins):
+                self.assertGreaterEqual(pending_ymins.min(), window.ymin - 100)
+        self.assertGreater(len(merger.done), 1)
+
+    def test_empty(self):
+        merger = self.task.get_predictions_merger(self.scene)
+        merger.add(ObjectDetectionLabels.make_empty(), [Box(0, 0, 100, 100)])
+        self.assertEqual(len(merger.get_labels()), 0)
+
+    def test_overridden_post_process_predictions(self):
+        class CustomObjectDetection(ObjectDetection):
+            def post_process_predictions(self, labels, scene):
+                return labels.get_subset(labels.get_class_ids() == 1)
+
+        task = CustomObjectDetection(self.task.config, None)
+        merger = task.get_predictions_merger(self.scene)
+        window = Box(0, 0, 100, 100)
+        labels = self.make_window_labels(window, 20, np.random.RandomState(2))
+        merger.add(labels, [window])
+
+        expected_labels = task.post_process_predictions(labels, self.scene)
+        self.assertEqual(merger.get_labels().to_dict(),
+                         expected_labels.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
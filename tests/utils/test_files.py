@@ -10,7 +10,7 @@ import rastervision as rv
 from rastervision.utils.files import (
     file_to_str, str_to_file, download_if_needed, upload_or_copy,
     load_json_config, ProtobufParseException, make_dir, get_local_path,
-    file_exists, sync_from_dir, sync_to_dir, list_paths)
+    file_exists, sync_from_dir, sync_to_dir, list_paths, get_vsi_path)
 from rastervision.filesystem import (NotReadableError, NotWritableError, GCSFileSystem)
 from rastervision.filesystem.filesystem import FileSystem
 from rastervision.protos.task_pb2 import TaskConfig as TaskConfigMsg
@@ -141,6 +141,27 @@ class TestGetLocalPath(unittest.TestCase):
         self.assertEqual(path, '/download_dir/gs/bucket/my/file.txt')
 
 
+class TestGetVsiPath(unittest.TestCase):
+    def test_local(self):
+        uri = '/my/file.tif'
+        self.assertEqual(get_vsi_path(uri), uri)
+
+    def test_s3(self):
+        uri = 's3://bucket/my/file.tif'
+        self.assertEqual(get_vsi_path(uri), '/vsis3/bucket/my/file.tif')
+
+    def test_gcs(self):
+        uri = 'gs://bucket/my/file.tif'
+        self.assertEqual(get_vsi_path(uri), '/vsigs/bucket/my/file.tif')
+
+    def test_http(self):
+        uri = 'https://bucket/my/file.tif'
+        self.assertEqual(
+            get_vsi_path(uri), '/vsicurl/https://bucket/my/file.tif')
+
+    def test_unsupported(self):
+        self.assertIsNone(get_vsi_path('ftp://bucket/my/file.tif'))
+
 
 class TestFileToStr(unittest.TestCase):
     """Test file_to_str and str_to_file."""